@@ -0,0 +1,303 @@
+"""Banc de mesure des performances des calculs hydrauliques.
+
+Chaque cas (frottement scalaire et en lot, calcul complet, courbe du réseau, courbe de
+pompe, tracés, rapport PDF, export Excel) est chronométré sur des entrées de petite et
+de grande taille : le nombre de boucles est calibré pour qu'un échantillon dure au
+moins quelques dizaines de millisecondes, puis plusieurs échantillons donnent la
+distribution du temps par appel (minimum, médiane, p95, maximum).
+
+Les médianes sont comparées aux références enregistrées dans
+references_performances.json : le contrôle échoue (code de sortie 1) si un cas ralentit
+au-delà de la tolérance. Les références dépendent de la machine ; elles se
+régénèrent avec --enregistrer.
+
+Les tracés et le rapport PDF sont mesurés sur les fonctions de rapport_pdf appelées par
+l'application (dessiner_schema_installation, dessiner_courbe_reseau_pompes et
+exporter_pdf n'en sont que des adaptateurs à la session Streamlit), sans le cache des
+figures.
+
+Exemple :
+    python banc_performances.py
+    python banc_performances.py --filtre friction --repetitions 15
+    python banc_performances.py --rapide --tolerance 0.5
+    python banc_performances.py --enregistrer
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from itertools import cycle, islice
+
+from moteur_hydraulique import (
+    MoteurHydraulique, Installation, PointSingulier, RegistreSinguliers, COEFFICIENTS_SINGULIERS
+)
+
+
+REFERENCES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'references_performances.json')
+
+# Durée minimale d'un échantillon (s) : en deçà, la résolution de l'horloge et le bruit dominent
+DUREE_ECHANTILLON = 0.05
+
+
+def installation_type(nombre_points=0, registre=False):
+    """Installation par défaut avec nombre_points points singuliers répartis aspiration / refoulement
+
+    Les points sont une liste, ou un RegistreSinguliers (totaux tenus à jour) si registre.
+    """
+    types = cycle(COEFFICIENTS_SINGULIERS)
+    emplacements = cycle(('aspiration', 'refoulement', 'refoulement'))
+    points = [
+        PointSingulier(type_point, 1, emplacement)
+        for type_point, emplacement in islice(zip(types, emplacements), nombre_points)
+    ]
+    return Installation(points_singuliers=RegistreSinguliers(points) if registre else points)
+
+
+def courbe_pompe_type():
+    """Courbe de pompe centrifuge type (débit m³/h, HMT m, rendement)"""
+    from courbe_pompe import CourbePompe
+
+    return CourbePompe(
+        debits=[0, 10, 20, 30, 40, 50, 60],
+        hauteurs=[32, 31.5, 30, 27.5, 24, 19.5, 14],
+        rendements=[0, 0.38, 0.58, 0.69, 0.72, 0.68, 0.57]
+    )
+
+
+def cas_mesures():
+    """Cas du banc : liste de (identifiant, grande taille, préparation)
+
+    La préparation (hors chronométrage) construit les données et retourne la fonction
+    mesurée.
+    """
+    import numpy as np
+
+    moteur = MoteurHydraulique()
+    cas = []
+
+    def ajouter(identifiant, grand=False):
+        def enregistrer(preparation):
+            cas.append((identifiant, grand, preparation))
+            return preparation
+        return enregistrer
+
+    # Coefficient de friction
+    for Re, regime in ((1500.0, 'laminaire'), (1e5, 'turbulent')):
+        @ajouter(f'friction_scalaire_{regime}')
+        def preparer(Re=Re):
+            return lambda: moteur.calculer_coefficient_friction(Re, 4.5e-4)
+
+    for nombre in (1, 1000, 1000000):
+        @ajouter(f'friction_lot_{nombre}', grand=nombre >= 1000000)
+        def preparer(nombre=nombre):
+            Re = np.geomspace(500.0, 1e7, nombre)
+            rugosite_relative = np.full(nombre, 4.5e-4)
+            return lambda: moteur.calculer_coefficient_friction_lot(Re, rugosite_relative)
+
+    # Calcul complet, points singuliers en liste puis en registre (page et fichiers de projet)
+    for nombre_points in (0, 10, 1000):
+        @ajouter(f'pertes_totales_{nombre_points}_points')
+        def preparer(nombre_points=nombre_points):
+            installation = installation_type(nombre_points)
+            return lambda: moteur.calculer_pertes_totales(installation)
+
+    for nombre_points in (10, 1000, 100000):
+        @ajouter(f'pertes_totales_{nombre_points}_points_registre', grand=nombre_points >= 100000)
+        def preparer(nombre_points=nombre_points):
+            installation = installation_type(nombre_points, registre=True)
+            return lambda: moteur.calculer_pertes_totales(installation)
+
+    # Courbe du réseau
+    for nombre in (1, 1000, 1000000):
+        @ajouter(f'courbe_reseau_{nombre}', grand=nombre >= 1000000)
+        def preparer(nombre=nombre):
+            installation = installation_type(10)
+            debits_m3h = np.linspace(0.0, 60.0, nombre)
+            return lambda: moteur.calculer_courbe_reseau(installation, debits_m3h)
+
+    @ajouter('courbe_reseau_1_registre_1000_points')
+    def preparer():
+        installation = installation_type(1000, registre=True)
+        debits_m3h = np.linspace(0.0, 60.0, 1)
+        return lambda: moteur.calculer_courbe_reseau(installation, debits_m3h)
+
+    # Courbe de pompe transposée
+    @ajouter('courbe_pompe_frequence')
+    def preparer():
+        courbe_pompe = courbe_pompe_type()
+        return lambda: moteur.calculer_courbe_pompe_frequence(courbe_pompe, 40.0)
+
+    # Tracés, rapport PDF et export Excel
+    def preparer_rapport(nombre_points):
+        import matplotlib
+        matplotlib.use('Agg')
+
+        installation = installation_type(nombre_points)
+        return installation, moteur.calculer_pertes_totales(installation).en_dict()
+
+    for nombre_points in (0, 1000):
+        grand = nombre_points >= 1000
+
+        @ajouter(f'trace_schema_{nombre_points}_points', grand=grand)
+        def preparer(nombre_points=nombre_points):
+            from rapport_pdf import tracer_schema_installation, figure_en_png
+
+            installation, resultats = preparer_rapport(nombre_points)
+            return lambda: figure_en_png(tracer_schema_installation(installation, resultats))
+
+        @ajouter(f'trace_courbe_reseau_{nombre_points}_points', grand=grand)
+        def preparer(nombre_points=nombre_points):
+            from rapport_pdf import tracer_courbe_reseau_pompes, figure_en_png
+
+            installation, resultats = preparer_rapport(nombre_points)
+            courbe_pompe = courbe_pompe_type()
+            return lambda: figure_en_png(tracer_courbe_reseau_pompes(moteur, installation, resultats, courbe_pompe))
+
+        @ajouter(f'rapport_pdf_{nombre_points}_points', grand=grand)
+        def preparer(nombre_points=nombre_points):
+            from rapport_pdf import images_rapport, construire_rapport
+
+            installation, resultats = preparer_rapport(nombre_points)
+            courbe_pompe = courbe_pompe_type()
+            return lambda: construire_rapport(
+                installation, resultats, images_rapport(moteur, installation, resultats, courbe_pompe)
+            )
+
+        @ajouter(f'rapport_excel_{nombre_points}_points', grand=grand)
+        def preparer(nombre_points=nombre_points):
+            import io
+            from export_excel import rapport_excel
+
+            installation, resultats = preparer_rapport(nombre_points)
+            return lambda: rapport_excel(installation, resultats, io.BytesIO())
+
+    for nombre in (100, 5000):
+        @ajouter(f'export_excel_{nombre}_lignes', grand=nombre >= 5000)
+        def preparer(nombre=nombre):
+            import io
+            from export_excel import exporter_resultats
+
+            resultats = moteur.calculer_pertes_totales(installation_type(10))
+            return lambda: exporter_resultats(islice(cycle([resultats]), nombre), io.BytesIO())
+
+    return cas
+
+
+def chronometrer(fonction, nombre):
+    """Durée (s) de nombre appels, ramasse-miettes suspendu comme dans timeit"""
+    gc_actif = gc.isenabled()
+    gc.disable()
+    try:
+        debut = time.perf_counter()
+        for i in range(nombre):
+            fonction()
+        return time.perf_counter() - debut
+    finally:
+        if gc_actif:
+            gc.enable()
+
+
+def mesurer(fonction, repetitions=7, duree_echantillon=DUREE_ECHANTILLON):
+    """Distribution du temps par appel (s) : dictionnaire min, mediane, p95, max, boucles"""
+    # Calibrage : le premier appel sert aussi d'échauffement (imports, caches)
+    nombre = 1
+    duree = chronometrer(fonction, nombre)
+    while duree < duree_echantillon:
+        nombre = max(nombre + 1, int(nombre * min(10.0, 1.2 * duree_echantillon / max(duree, 1e-9))))
+        duree = chronometrer(fonction, nombre)
+
+    echantillons = sorted(chronometrer(fonction, nombre) / nombre for i in range(repetitions))
+    return {
+        'min': echantillons[0],
+        'mediane': statistics.median(echantillons),
+        'p95': echantillons[min(len(echantillons) - 1, int(round(0.95 * (len(echantillons) - 1))))],
+        'max': echantillons[-1],
+        'boucles': nombre
+    }
+
+
+def machine():
+    """Description de la machine de mesure, enregistrée avec les références"""
+    return {
+        'plateforme': platform.platform(),
+        'processeur': platform.processor() or platform.machine(),
+        'python': platform.python_version(),
+        'coeurs': os.cpu_count()
+    }
+
+
+def lire_references(chemin):
+    """Références enregistrées ({'machine': ..., 'cas': {identifiant: mesure}}), vides si absentes"""
+    if not os.path.exists(chemin):
+        return {'machine': None, 'cas': {}}
+    with open(chemin, encoding='utf-8') as fichier:
+        return json.load(fichier)
+
+
+def formater_duree(secondes):
+    """Durée lisible (ns, µs, ms ou s)"""
+    for unite, facteur in (('s', 1.0), ('ms', 1e-3), ('µs', 1e-6)):
+        if secondes >= facteur:
+            return f"{secondes / facteur:.3g} {unite}"
+    return f"{secondes * 1e9:.3g} ns"
+
+
+def main(arguments=None):
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Banc de mesure des performances des calculs hydrauliques")
+    parser.add_argument('--filtre', action='append',
+                        help="Ne mesurer que les cas dont l'identifiant contient ce texte")
+    parser.add_argument('--rapide', action='store_true', help="Écarter les cas de grande taille")
+    parser.add_argument('--repetitions', type=int, default=7, help="Nombre d'échantillons par cas")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Ralentissement relatif toléré de la médiane (0.25 : +25 %%)")
+    parser.add_argument('--references', default=REFERENCES, help="Fichier JSON des références")
+    parser.add_argument('--enregistrer', action='store_true',
+                        help="Enregistrer les mesures comme nouvelles références au lieu de comparer")
+    args = parser.parse_args(arguments)
+
+    references = lire_references(args.references)
+    if not args.enregistrer and references['machine'] not in (None, machine()):
+        print("Attention : références enregistrées sur une autre machine", file=sys.stderr)
+
+    problemes = []
+    print(f"{'cas':<36}{'min':>11}{'médiane':>11}{'p95':>11}{'max':>11}{'référence':>12}")
+    for identifiant, grand, preparation in cas_mesures():
+        if args.filtre and not any(filtre in identifiant for filtre in args.filtre):
+            continue
+        if args.rapide and grand:
+            continue
+
+        mesure = mesurer(preparation(), args.repetitions)
+        reference = references['cas'].get(identifiant)
+        ecart = ''
+        if reference is not None:
+            rapport = mesure['mediane'] / reference['mediane']
+            ecart = f"{(rapport - 1) * 100:+.0f} %"
+            if not args.enregistrer and rapport > 1 + args.tolerance:
+                problemes.append(f"{identifiant} : {formater_duree(mesure['mediane'])} "
+                                 f"> {formater_duree(reference['mediane'])} {args.tolerance:+.0%}")
+        print(f"{identifiant:<36}" + ''.join(
+            f"{formater_duree(mesure[cle]):>11}" for cle in ('min', 'mediane', 'p95', 'max')
+        ) + f"{ecart:>12}", flush=True)
+        references['cas'][identifiant] = mesure
+
+    if args.enregistrer:
+        references['machine'] = machine()
+        with open(args.references, 'w', encoding='utf-8') as fichier:
+            json.dump(references, fichier, indent=2, ensure_ascii=False)
+        print(f"Références enregistrées dans {args.references}")
+        return 0
+
+    for probleme in problemes:
+        print(f"ÉCHEC - {probleme}", file=sys.stderr)
+    return 1 if problemes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""Mémoïsation des calculs entre les réexécutions Streamlit.
+
+Les résultats sont indexés par une empreinte canonique des données d'entrée : deux
+jeux de données identiques (y compris après un retour en arrière de l'utilisateur)
+donnent la même clé. Les caches sont partagés par toutes les sessions du processus,
+bornés en nombre d'entrées (et en octets pour les images) avec éviction LRU, et
+comptent leurs succès et leurs échecs.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, is_dataclass
+
+
+def _serialiser(objet):
+    """Convertit les objets non JSON (dataclasses, DataFrames, tableaux NumPy) en valeurs sérialisables"""
+    if hasattr(objet, 'empreinte_contenu'):
+        return objet.empreinte_contenu()
+    if is_dataclass(objet):
+        return asdict(objet)
+    if hasattr(objet, 'columns'):
+        return objet.to_dict(orient='split')
+    if hasattr(objet, 'tolist'):
+        return objet.tolist()
+    raise TypeError(f"Type non sérialisable pour l'empreinte : {type(objet).__name__}")
+
+
+def empreinte(*objets):
+    """Calcule l'empreinte canonique (SHA-256) d'un ensemble de données d'entrée"""
+    texte = json.dumps(objets, sort_keys=True, ensure_ascii=False, default=_serialiser)
+    return hashlib.sha256(texte.encode('utf-8')).hexdigest()
+
+
+def taille_octets(objet):
+    """Taille approchée en octets d'un résultat (tableaux NumPy et bytes des dataclasses et conteneurs)"""
+    if hasattr(objet, 'nbytes'):
+        return int(objet.nbytes)
+    if isinstance(objet, (bytes, bytearray)):
+        return len(objet)
+    if is_dataclass(objet):
+        return sum(taille_octets(valeur) for valeur in vars(objet).values())
+    if isinstance(objet, dict):
+        return sum(taille_octets(valeur) for valeur in objet.values())
+    if isinstance(objet, (list, tuple)):
+        return sum(taille_octets(valeur) for valeur in objet)
+    return 64
+
+
+class CacheLRU:
+    """Cache de taille bornée avec éviction du moins récemment utilisé
+
+    Avec octets_max, la somme des tailles des valeurs est également bornée : la taille
+    d'une valeur est donnée par la fonction taille (len par défaut, pour des bytes).
+    """
+
+    def __init__(self, taille_max=256, octets_max=None, taille=len):
+        self.taille_max = taille_max
+        self.octets_max = octets_max
+        self.taille = taille
+        self.octets = 0
+        self.succes = 0
+        self.echecs = 0
+        self._entrees = OrderedDict()
+        self._verrou = threading.Lock()
+
+    def __len__(self):
+        return len(self._entrees)
+
+    def __contains__(self, cle):
+        return cle in self._entrees
+
+    def obtenir(self, cle, calcul):
+        """Retourne la valeur associée à la clé, en la calculant en cas d'absence"""
+        with self._verrou:
+            if cle in self._entrees:
+                self._entrees.move_to_end(cle)
+                self.succes += 1
+                return self._entrees[cle]
+            self.echecs += 1
+
+        # Le calcul est fait hors verrou pour ne pas bloquer les autres sessions
+        valeur = calcul()
+
+        with self._verrou:
+            if cle in self._entrees:
+                self._retirer(cle)
+            self._entrees[cle] = valeur
+            if self.octets_max is not None:
+                self.octets += self.taille(valeur)
+            while len(self._entrees) > self.taille_max or (
+                self.octets_max is not None and self.octets > self.octets_max and len(self._entrees) > 1
+            ):
+                self._retirer(next(iter(self._entrees)))
+        return valeur
+
+    def _retirer(self, cle):
+        valeur = self._entrees.pop(cle)
+        if self.octets_max is not None:
+            self.octets -= self.taille(valeur)
+
+    def vider(self):
+        """Vide le cache et remet les compteurs à zéro"""
+        with self._verrou:
+            self._entrees.clear()
+            self.octets = 0
+            self.succes = 0
+            self.echecs = 0
+
+    def statistiques(self):
+        """Retourne la taille et les compteurs du cache"""
+        total = self.succes + self.echecs
+        return {
+            'entrees': len(self._entrees),
+            'taille_max': self.taille_max,
+            'octets': self.octets,
+            'succes': self.succes,
+            'echecs': self.echecs,
+            'taux_succes': self.succes / total if total else 0.0
+        }
+
+
+# Cache des résultats de calculer_pertes_totales, partagé par toutes les sessions
+cache_resultats = CacheLRU(taille_max=512)
+
+# Cache des simulations (transitoires, périodes prolongées, analyses d'incertitude, réseaux maillés) :
+# résultats volumineux, bornés en octets
+cache_simulations = CacheLRU(taille_max=32, octets_max=256 * 1024 * 1024, taille=taille_octets)
+
+# Cache des figures rendues en PNG (page et rapport PDF)
+cache_figures = CacheLRU(taille_max=128, octets_max=64 * 1024 * 1024)
@@ -1,21 +1,30 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from math import pi, log10, exp, sqrt
 import io
 from datetime import datetime
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from matplotlib.patches import Circle, Rectangle, Polygon, FancyBboxPatch
-import matplotlib.lines as mlines
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Image, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-import tempfile
-import os
+import copy
+from dataclasses import asdict
+from moteur_hydraulique import (
+    MoteurHydraulique, Installation, DonneesBase, Geometrie, RegistreSinguliers, libelle_emplacement,
+    lire_nomenclature, charger_nomenclature, lire_emplacement_troncon, MATERIAUX, FLUIDES, COEFFICIENTS_SINGULIERS, lire_fluides
+)
+from cache_calculs import cache_resultats, cache_simulations, cache_figures, empreinte
+from courbe_pompe import CourbePompe
+from optimisation_conduite import optimiser_conduite, ParametresEconomiques, Contraintes
+from reseau_maille import Reseau, resoudre_reseau
+from transitoire import LoiFermeture, ClapetAntiRetour, simuler_fermeture_vanne, simuler_arret_pompe
+from simulation_prolongee import simuler_periode, lire_profil, profil_type
+from incertitudes import Loi, Incertitudes, analyser_incertitudes
+from export_excel import rapport_excel
+from projet import Projet, projet_en_octets, charger_projet, EXTENSION_PROJET
+from instrumentation import (
+    instrumenter_page, instrumenter_fragment, instrumenter_methodes, jalon, suivre_compteurs, statistiques_journal
+)
+from rapport_pdf import (
+    tracer_schema_installation, tracer_courbe_reseau_pompes, figure_en_png, reduire_png, construire_rapport,
+    generer_rapports
+)
 
 # Configuration de la page
 st.set_page_config(
@@ -88,607 +97,261 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Champs de donnees_base dont dépendent les pertes de charge
+CHAMPS_HYDRAULIQUES = ('diametre', 'materiau', 'debit_m3h', 'fluide', 'temperature')
+
+# Champs de donnees_base lus par chaque bloc de la page en plus des champs hydrauliques, de la
+# géométrie, des points singuliers, des tronçons et des tables : le résultat d'un bloc est mémoïsé
+# par l'empreinte de ses seules dépendances (un rendement modifié ne redessine pas la courbe du réseau)
+DEPENDANCES = {
+    'courbe_reseau': (),
+    'points_fonctionnement': ('rendement_mecanique', 'rendement_electrique'),
+    'transitoire': ('epaisseur_conduite', 'module_young_materiau'),
+    'arret_pompe': ('epaisseur_conduite', 'module_young_materiau', 'hauteur_geodesique_aspiration',
+                    'pression_amont', 'rendement_mecanique'),
+}
+
+# Largeur maximale (px) des images de la page : au-delà, Streamlit les redimensionne à chaque exécution
+LARGEUR_IMAGE_PAGE = 1460
+
+# Processus de génération des rapports en lot lancés par un clic (serveur partagé entre les sessions)
+PROCESSUS_RAPPORTS_LOT = 2
+
+# Plage de température (°C) d'un fluide sans table : les corrections approchées s'appliquent
+PLAGE_TEMPERATURES_FORMULES = (-50.0, 300.0)
+
+@instrumenter_methodes
 class CalculateurPertesCharge:
+    """Adaptateur Streamlit : lit st.session_state et délègue les calculs au MoteurHydraulique"""
     def __init__(self):
         self.initialiser_donnees()
+        self.moteur = MoteurHydraulique(
+            st.session_state.materiaux,
+            st.session_state.fluides,
+            st.session_state.coefficients_singuliers
+        )
+        suivre_compteurs(self.moteur, 'appels_colebrook', 'iterations_colebrook')
     
     def initialiser_donnees(self):
         """Initialise les données par défaut"""
         # Matériaux et rugosités (en mètres)
         if 'materiaux' not in st.session_state:
-            st.session_state.materiaux = {
-                'Acier': 0.000045,
-                'PVC': 0.0000015,
-                'PEHD': 0.000007,
-                'Fonte': 0.00026,
-                'Béton': 0.0003,
-                'Cuivre': 0.0000015,
-                'Acier galvanisé': 0.00015
-            }
+            st.session_state.materiaux = copy.deepcopy(MATERIAUX)
         
         # Fluides et propriétés
         if 'fluides' not in st.session_state:
-            st.session_state.fluides = {
-                'Eau': {
-                    'masse_volumique_20c': 998.2,
-                    'viscosite_cinematique_20c': 1.004e-6,
-                    'pression_vapeur_20c': 2337.0,
-                    'coefficient_temp': 0.0002,
-                    'module_elasticite': 2.15e9
-                },
-                'Eau glycolée 30%': {
-                    'masse_volumique_20c': 1050.0,
-                    'viscosite_cinematique_20c': 2.5e-6,
-                    'pression_vapeur_20c': 2337.0,
-                    'coefficient_temp': 0.0003,
-                    'module_elasticite': 2.5e9
-                },
-                'Fuel léger': {
-                    'masse_volumique_20c': 850.0,
-                    'viscosite_cinematique_20c': 3.0e-6,
-                    'pression_vapeur_20c': 500.0,
-                    'coefficient_temp': 0.0007,
-                    'module_elasticite': 1.5e9
-                },
-                'Huile hydraulique': {
-                    'masse_volumique_20c': 870.0,
-                    'viscosite_cinematique_20c': 46.0e-6,
-                    'pression_vapeur_20c': 100.0,
-                    'coefficient_temp': 0.0006,
-                    'module_elasticite': 1.8e9
-                },
-                'Ammoniac': {
-                    'masse_volumique_20c': 610.0,
-                    'viscosite_cinematique_20c': 0.36e-6,
-                    'pression_vapeur_20c': 857000.0,
-                    'coefficient_temp': 0.0025,
-                    'module_elasticite': 1.2e9
-                }
-            }
+            st.session_state.fluides = copy.deepcopy(FLUIDES)
         
         # Coefficients de pertes de charge singulières
         if 'coefficients_singuliers' not in st.session_state:
-            st.session_state.coefficients_singuliers = {
-                'Vanne pleine ouverture': 0.2,
-                'Vanne 1/2 ouverture': 4.0,
-                'Clapet de retenue': 2.5,
-                'Clapet anti-retour': 10.0,
-                'Coudes 90° standard': 0.3,
-                'Coudes 90° rayon long': 0.2,
-                'Coudes 45°': 0.2,
-                'Té droit': 0.9,
-                'Té latéral': 1.8,
-                'Rétrécissement brusque': 0.5,
-                'Élargissement brusque': 1.0,
-                'Entrée de réservoir': 0.5,
-                'Sortie de réservoir': 1.0,
-                'Crépine': 2.0,
-                'Robinet vanne': 0.2
-            }
+            st.session_state.coefficients_singuliers = copy.deepcopy(COEFFICIENTS_SINGULIERS)
         
         # Données de base
         if 'donnees_base' not in st.session_state:
-            st.session_state.donnees_base = {
-                'diametre': 0.1,
-                'materiau': 'Acier',
-                'debit_m3h': 36.0,
-                'fluide': 'Eau',
-                'temperature': 20.0,
-                'pression_amont': 101325.0,
-                'hauteur_geodesique_aspiration': 2.0,
-                'npsh_requis': 2.0,
-                'rendement_mecanique': 0.95,
-                'rendement_electrique': 0.92,
-                'epaisseur_conduite': 0.005,
-                'module_young_materiau': 200e9
-            }
+            st.session_state.donnees_base = asdict(DonneesBase())
         
         # Longueurs et hauteurs
         if 'geometrie' not in st.session_state:
-            st.session_state.geometrie = {
-                'longueur_totale': 100.0,
-                'hauteur_montee': 10.0,
-                'hauteur_descente': 5.0,
-                'longueur_aspiration': 5.0,
-                'longueur_refoulement': 95.0
-            }
+            st.session_state.geometrie = asdict(Geometrie())
         
-        # Points singuliers
+        # Points singuliers (registre tenant les ΣK par emplacement à jour)
         if 'points_singuliers' not in st.session_state:
-            st.session_state.points_singuliers = []
+            st.session_state.points_singuliers = RegistreSinguliers()
+        
+        # Tronçons de conduite (vide : conduite simple décrite par la géométrie)
+        if 'segments' not in st.session_state:
+            st.session_state.segments = []
         
         # Données de pompe
         if 'donnees_pompe' not in st.session_state:
             st.session_state.donnees_pompe = pd.DataFrame()
+        if 'courbe_pompe' not in st.session_state:
+            st.session_state.courbe_pompe = None
 
-    def convertir_debit_m3h_vers_m3s(self, debit_m3h):
-        """Convertit le débit de m³/h vers m³/s"""
-        return debit_m3h / 3600.0
-
-    def convertir_debit_m3s_vers_m3h(self, debit_m3s):
-        """Convertit le débit de m³/s vers m³/h"""
-        return debit_m3s * 3600.0
+    def installation(self):
+        """Construit les données d'entrée du moteur à partir de la session"""
+        return Installation.depuis_dicts(
+            st.session_state.donnees_base,
+            st.session_state.geometrie,
+            st.session_state.points_singuliers,
+            st.session_state.segments
+        )
 
-    def calculer_proprietes_fluide(self, fluide, temperature):
-        """Calcule les propriétés du fluide en fonction de la température"""
-        proprietes_20c = st.session_state.fluides[fluide]
-        
-        # Correction pour la température (approximation linéaire)
-        delta_temp = temperature - 20.0
-        coeff_temp = proprietes_20c['coefficient_temp']
-        
-        masse_volumique = proprietes_20c['masse_volumique_20c'] * (1.0 - coeff_temp * delta_temp)
-        
-        # Pour la viscosité, utilisation d'une approximation exponentielle
-        viscosite_cinematique = proprietes_20c['viscosite_cinematique_20c'] * exp(-0.02 * delta_temp)
-        
-        # Pour la pression de vapeur, approximation avec formule d'Antoine simplifiée
-        if fluide == 'Eau':
-            # Formule d'Antoine pour l'eau (P en Pa, T en °C)
-            pression_vapeur = 610.94 * exp((17.625 * temperature) / (temperature + 243.04))
-        else:
-            # Approximation linéaire pour autres fluides
-            pression_vapeur = proprietes_20c['pression_vapeur_20c'] * exp(0.05 * delta_temp)
-        
-        return {
-            'masse_volumique': max(masse_volumique, 500.0),
-            'viscosite_cinematique': max(viscosite_cinematique, 0.1e-6),
-            'pression_vapeur': pression_vapeur,
-            'module_elasticite': proprietes_20c['module_elasticite']
-        }
+    def projet(self):
+        """Projet regroupant toutes les données d'entrée de la session"""
+        return Projet(
+            donnees_base=st.session_state.donnees_base,
+            geometrie=st.session_state.geometrie,
+            materiaux=st.session_state.materiaux,
+            fluides=st.session_state.fluides,
+            coefficients_singuliers=st.session_state.coefficients_singuliers,
+            points_singuliers=st.session_state.points_singuliers,
+            segments=st.session_state.segments,
+            donnees_pompe=st.session_state.donnees_pompe
+        )
 
-    def calculer_nombre_reynolds(self, vitesse, diametre, viscosite_cinematique):
-        """Calcule le nombre de Reynolds"""
-        if viscosite_cinematique == 0:
-            return 0.0
-        return (vitesse * diametre) / viscosite_cinematique
+    def empreinte_donnees(self):
+        """Empreinte canonique de toutes les données d'entrée du calcul (identique à celle des fichiers de projet)"""
+        return self.projet().empreinte_calcul()
 
-    def calculer_rugosite_relative(self, rugosite, diametre):
-        """Calcule la rugosité relative"""
-        if diametre == 0:
-            return 0.0
-        return rugosite / diametre
+    def empreinte_bloc(self, bloc):
+        """Empreinte des seules données d'entrée dont dépend un bloc de la page (DEPENDANCES)"""
+        donnees_base = st.session_state.donnees_base
+        return empreinte(
+            bloc,
+            {champ: donnees_base[champ] for champ in CHAMPS_HYDRAULIQUES + DEPENDANCES[bloc]},
+            st.session_state.geometrie,
+            st.session_state.points_singuliers,
+            st.session_state.segments,
+            st.session_state.materiaux,
+            st.session_state.fluides,
+            st.session_state.coefficients_singuliers
+        )
+    
+    def calculer_pertes_totales(self):
+        """Calcule toutes les pertes de charge et le NPSH (résultats mémoïsés par empreinte des données)"""
+        resultats = cache_resultats.obtenir(
+            self.empreinte_donnees(),
+            lambda: self.moteur.calculer_pertes_totales(self.installation())
+        )
+        return resultats.en_dict()
 
-    def calculer_coefficient_friction(self, Re, rugosite_relative):
-        """Calcule le coefficient de friction avec la formule de Colebrook-White"""
-        if Re == 0:
-            return 0.0
-        
-        # Pour un écoulement laminaire
-        if Re < 2000:
-            return 64.0 / Re
-        
-        # Estimation initiale pour turbulent
-        f = 0.02
-        
-        # Résolution itérative de Colebrook-White
-        for i in range(50):
-            f_new = 1.0 / (-2.0 * log10((rugosite_relative / 3.7) + (2.51 / (Re * f**0.5))))**2
-            if abs(f_new - f) < 1e-8:
-                return f_new
-            f = f_new
-        
-        return f
+    def image_schema_installation(self, resultats, dpi=150, largeur_max=None):
+        """Retourne le schéma de l'installation en PNG, depuis le cache si ses données n'ont pas changé"""
+        cle = empreinte(
+            'schema', dpi,
+            st.session_state.points_singuliers.empreinte_contenu(),
+            f"{st.session_state.donnees_base['debit_m3h']:.1f}",
+            f"{resultats['hauteur_manometrique']:.1f}"
+        )
+        return self._image(cle, lambda: figure_en_png(self.dessiner_schema_installation(), dpi), largeur_max)
 
-    def calculer_pertes_lineaires(self, f, L, D, vitesse, g=9.81):
-        """Calcule les pertes de charge linéaires (formule de Darcy-Weisbach)"""
-        if D == 0:
-            return 0.0
-        return f * (L / D) * (vitesse**2 / (2.0 * g))
+    def image_courbe_reseau_pompes(self, resultats, dpi=150, largeur_max=None):
+        """Retourne la courbe du réseau en PNG, depuis le cache si ses dépendances n'ont pas changé"""
+        cle = empreinte('courbe', dpi, self.empreinte_bloc('courbe_reseau'), st.session_state.donnees_pompe)
+        return self._image(cle, lambda: figure_en_png(self.dessiner_courbe_reseau_pompes(resultats), dpi), largeur_max)
 
-    def calculer_pertes_singulieres(self, coefficients_singuliers, vitesse, g=9.81):
-        """Calcule les pertes de charge singulières"""
-        pertes_totales = 0.0
-        details = []
-        
-        for nom, coefficient in coefficients_singuliers.items():
-            perte = coefficient * (vitesse**2 / (2.0 * g))
-            pertes_totales += perte
-            details.append({
-                'nom': nom,
-                'coefficient': coefficient,
-                'perte': perte
-            })
-        
-        return pertes_totales, details
+    def _image(self, cle, rendre, largeur_max=None):
+        """Image PNG du cache des figures, réduite une fois pour toutes à largeur_max pour la page"""
+        image = cache_figures.obtenir(cle, rendre)
+        if largeur_max is None:
+            return image
+        return cache_figures.obtenir(empreinte(cle, largeur_max), lambda: reduire_png(image, largeur_max))
 
-    def calculer_section(self, diametre):
-        """Calcule la section de la conduite"""
-        return pi * (diametre**2) / 4.0
+    def dessiner_schema_installation(self):
+        """Dessine un schéma schématique de l'installation"""
+        return tracer_schema_installation(self.installation(), self.calculer_pertes_totales())
 
-    def calculer_vitesse(self, debit, section):
-        """Calcule la vitesse d'écoulement"""
-        if section == 0:
-            return 0.0
-        return debit / section
+    def dessiner_courbe_reseau_pompes(self, resultats):
+        """Dessine la courbe du réseau avec les courbes de pompes"""
+        return tracer_courbe_reseau_pompes(self.moteur, self.installation(), resultats, st.session_state.courbe_pompe)
 
-    def calculer_npsh_disponible(self, pression_amont, hauteur_geodesique, pertes_aspiration, 
-                               pression_vapeur, masse_volumique, g=9.81):
-        """Calcule le NPSH disponible"""
-        terme_pression = (pression_amont - pression_vapeur) / (masse_volumique * g)
-        npsh_disponible = terme_pression + hauteur_geodesique - pertes_aspiration
-        
-        return max(npsh_disponible, 0.0)
+def ajouter_point_singulier():
+    """Ajoute le point singulier saisi (rappel du bouton, exécuté avant la page : pas de st.rerun)"""
+    st.session_state.points_singuliers.ajouter(
+        st.session_state.type_singulier,
+        st.session_state.quantite_singulier,
+        st.session_state.emplacement_singulier
+    )
 
-    def calculer_coup_belier(self, resultats):
-        """Calcule les paramètres du coup de bélier"""
-        donnees = st.session_state.donnees_base
-        proprietes_fluide = resultats['proprietes_fluide']
-        
-        # Célérité de l'onde
-        K = proprietes_fluide['module_elasticite']  # Module d'élasticité du fluide
-        E = donnees['module_young_materiau']  # Module d'Young du matériau
-        D = donnees['diametre']
-        e = donnees['epaisseur_conduite']
-        
-        # Calcul de la célérité (formule d'Allievi)
-        a = sqrt(K / proprietes_fluide['masse_volumique']) / sqrt(1 + (K * D) / (E * e))
-        
-        # Temps de parcours de l'onde
-        L = st.session_state.geometrie['longueur_refoulement']
-        T_parcours = 2 * L / a
-        
-        # Pente des droites de Bergeron
-        pente_bergeron = a / (9.81 * resultats['section'])
-        
-        # Surpression maximale lors de l'arrêt brusque
-        delta_v = resultats['vitesse']  # Variation de vitesse (arrêt complet)
-        delta_p = proprietes_fluide['masse_volumique'] * a * delta_v
-        
-        # Dépression au réservoir
-        depression_reservoir = delta_p / (proprietes_fluide['masse_volumique'] * 9.81)
-        
-        return {
-            'celerite_onde': a,
-            'temps_parcours': T_parcours,
-            'pente_bergeron': pente_bergeron,
-            'surpression_max': delta_p,
-            'depression_reservoir': depression_reservoir
-        }
+def afficher_editeur_singuliers():
+    """Tableau éditable des points singuliers ; les modifications sont appliquées en une fois à la validation"""
+    registre = st.session_state.points_singuliers
+    colonnes = registre.en_colonnes()
+    emplacements = list(dict.fromkeys([
+        'aspiration', 'refoulement', *map(libelle_emplacement, range(len(st.session_state.segments))),
+        *map(libelle_emplacement, registre.emplacements)
+    ]))
+    with st.form('editeur_points_singuliers', border=False):
+        # Clé liée au contenu : le tableau repart du registre dès qu'il change (ajout, import, validation)
+        tableau = st.data_editor(
+            pd.DataFrame({
+                'Type': colonnes['type'],
+                'Quantité': colonnes['quantite'],
+                'Emplacement': [libelle_emplacement(emplacement) for emplacement in colonnes['emplacement']]
+            }),
+            column_config={
+                'Type': st.column_config.SelectboxColumn(
+                    options=list(st.session_state.coefficients_singuliers), required=True
+                ),
+                'Quantité': st.column_config.NumberColumn(min_value=1, step=1, default=1, required=True),
+                'Emplacement': st.column_config.SelectboxColumn(options=emplacements, default='aspiration',
+                                                                required=True)
+            },
+            num_rows='dynamic',
+            use_container_width=True,
+            key=f"editeur_singuliers_{registre.empreinte_contenu()[:16]}"
+        )
+        if st.form_submit_button("Appliquer les modifications"):
+            try:
+                st.session_state.points_singuliers = lire_nomenclature(
+                    tableau, st.session_state.coefficients_singuliers
+                )
+            except ValueError as e:
+                st.error(f"❌ {e}")
 
-    def calculer_puissances(self, resultats):
-        """Calcule les puissances mécanique et électrique"""
-        donnees = st.session_state.donnees_base
-        
-        # Puissance hydraulique (déjà calculée)
-        P_hydraulique = resultats['puissance_hydraulique']
-        
-        # Puissance mécanique
-        P_mecanique = P_hydraulique / donnees['rendement_mecanique']
-        
-        # Puissance électrique
-        P_electrique = P_mecanique / donnees['rendement_electrique']
-        
-        return {
-            'puissance_hydraulique': P_hydraulique,
-            'puissance_mecanique': P_mecanique,
-            'puissance_electrique': P_electrique
-        }
+def appliquer_projet(projet):
+    """Remplace en une fois les données de la session par celles d'un projet chargé"""
+    st.session_state.donnees_base = projet.donnees_base
+    st.session_state.geometrie = projet.geometrie
+    st.session_state.materiaux = projet.materiaux
+    st.session_state.fluides = projet.fluides
+    st.session_state.coefficients_singuliers = projet.coefficients_singuliers
+    st.session_state.points_singuliers = projet.points_singuliers
+    st.session_state.segments = projet.segments
+    if projet.donnees_pompe is None:
+        st.session_state.donnees_pompe = pd.DataFrame()
+        st.session_state.courbe_pompe = None
+    else:
+        st.session_state.donnees_pompe = projet.donnees_pompe
+        st.session_state.courbe_pompe = CourbePompe.depuis_dataframe(projet.donnees_pompe)
 
-    def calculer_courbe_pompe_frequence(self, donnees_pompe_50Hz, frequence):
-        """Calcule les courbes de pompe pour différentes fréquences"""
-        if donnees_pompe_50Hz.empty:
-            return pd.DataFrame()
-        
-        ratio = frequence / 50.0
-        
-        # Lois de similitude pour les pompes
-        donnees_pompe = donnees_pompe_50Hz.copy()
-        
-        # Vérification et normalisation des noms de colonnes
-        colonnes_disponibles = donnees_pompe.columns.str.lower().tolist()
-        
-        # Recherche des colonnes avec différentes orthographes possibles
-        colonne_debit = None
-        colonne_hmt = None
-        
-        for col in donnees_pompe.columns:
-            col_lower = col.lower()
-            if 'débit' in col_lower or 'debit' in col_lower or 'q' in col_lower:
-                colonne_debit = col
-            elif 'hmt' in col_lower or 'hauteur' in col_lower or 'h' in col_lower:
-                colonne_hmt = col
-            elif 'pression' in col_lower:
-                colonne_hmt = col  # On considère que la pression peut être convertie en HMT
-        
-        # Application des lois de similitude
-        if colonne_debit and colonne_hmt:
-            donnees_pompe[colonne_debit] = donnees_pompe[colonne_debit] * ratio
-            donnees_pompe[colonne_hmt] = donnees_pompe[colonne_hmt] * (ratio ** 2)
-        
-        return donnees_pompe
+def ouvrir_projet():
+    """Ouverture d'un fichier de projet, appliqué à la session une fois par fichier"""
+    with st.sidebar:
+        st.subheader("Projet")
+        fichier_projet = st.file_uploader("Ouvrir un projet", type=[EXTENSION_PROJET.lstrip('.')])
+        if fichier_projet is not None:
+            identifiant = getattr(fichier_projet, 'file_id', None) or (fichier_projet.name, fichier_projet.size)
+            if st.session_state.get('fichier_projet') != identifiant:
+                try:
+                    projet = charger_projet(fichier_projet)
+                    appliquer_projet(projet)
+                    st.session_state.fichier_projet = identifiant
+                    reprise = " (résultats repris du cache)" if projet.empreinte_calcul() in cache_resultats else ""
+                    st.success(f"✅ Projet chargé: {fichier_projet.name}{reprise}")
+                except Exception as e:
+                    st.error(f"❌ Erreur lecture projet: {e}")
 
-    def calculer_pertes_totales(self):
-        """Calcule toutes les pertes de charge et le NPSH"""
-        donnees = st.session_state.donnees_base
-        geometrie = st.session_state.geometrie
-        materiaux = st.session_state.materiaux
-        
-        # Conversion du débit
-        debit_m3s = self.convertir_debit_m3h_vers_m3s(donnees['debit_m3h'])
-        
-        # Calcul des propriétés du fluide
-        proprietes_fluide = self.calculer_proprietes_fluide(donnees['fluide'], donnees['temperature'])
-        
-        # Calculs géométriques de base
-        diametre = donnees['diametre']
-        section = self.calculer_section(diametre)
-        vitesse = self.calculer_vitesse(debit_m3s, section)
-        
-        # Nombre de Reynolds
-        Re = self.calculer_nombre_reynolds(
-            vitesse, diametre, proprietes_fluide['viscosite_cinematique']
-        )
-        
-        # Rugosité relative
-        rugosite = materiaux[donnees['materiau']]
-        rugosite_relative = self.calculer_rugosite_relative(rugosite, diametre)
-        
-        # Coefficient de friction
-        f = self.calculer_coefficient_friction(Re, rugosite_relative)
-        
-        # Pertes linéaires totales
-        pertes_lineaires_totales = self.calculer_pertes_lineaires(
-            f, geometrie['longueur_totale'], diametre, vitesse
-        )
-        
-        # Pertes linéaires d'aspiration seulement
-        pertes_lineaires_aspiration = self.calculer_pertes_lineaires(
-            f, geometrie['longueur_aspiration'], diametre, vitesse
-        )
-        
-        # Pertes singulières
-        coefficients_singuliers = {}
-        for point in st.session_state.points_singuliers:
-            nom = point['type']
-            quantite = point['quantite']
-            coefficient = st.session_state.coefficients_singuliers.get(nom, 0.0)
-            coefficients_singuliers[f"{nom} (x{quantite})"] = coefficient * float(quantite)
-        
-        pertes_singulieres_totales, details_singuliers = self.calculer_pertes_singulieres(
-            coefficients_singuliers, vitesse
-        )
-        
-        # Estimation des pertes singulières d'aspiration (50% des pertes totales par défaut)
-        pertes_singulieres_aspiration = pertes_singulieres_totales * 0.5
-        
-        # Pertes de charge totales
-        pertes_totales = pertes_lineaires_totales + pertes_singulieres_totales
-        
-        # Pertes d'aspiration totales
-        pertes_aspiration_totales = pertes_lineaires_aspiration + pertes_singulieres_aspiration
-        
-        # Hauteur manométrique totale
-        hauteur_manometrique = (
-            geometrie['hauteur_montee'] - 
-            geometrie['hauteur_descente'] + 
-            pertes_totales
-        )
-        
-        # Puissance hydraulique
-        puissance_hydraulique = (
-            proprietes_fluide['masse_volumique'] * 9.81 * debit_m3s * hauteur_manometrique
-        ) / 1000.0  # en kW
-        
-        # NPSH disponible
-        npsh_disponible = self.calculer_npsh_disponible(
-            donnees['pression_amont'],
-            donnees['hauteur_geodesique_aspiration'],
-            pertes_aspiration_totales,
-            proprietes_fluide['pression_vapeur'],
-            proprietes_fluide['masse_volumique']
+def afficher_enregistrement_projet(calculateur):
+    """Bouton d'enregistrement du projet ; l'archive n'est produite qu'au clic"""
+    projet = calculateur.projet()
+    with st.sidebar:
+        st.download_button(
+            label="💾 Enregistrer le projet",
+            data=lambda: projet_en_octets(projet),
+            file_name=f"projet_pompage_{datetime.now().strftime('%Y%m%d_%H%M')}{EXTENSION_PROJET}",
+            mime="application/zip",
+            on_click='ignore'
         )
-        
-        # Marge de NPSH
-        marge_npsh = npsh_disponible - donnees['npsh_requis']
-        
-        # Calcul des puissances
-        puissances = self.calculer_puissances({
-            'puissance_hydraulique': puissance_hydraulique
-        })
-        
-        # Calcul du coup de bélier
-        coup_belier = self.calculer_coup_belier({
-            'vitesse': vitesse,
-            'section': section,
-            'proprietes_fluide': proprietes_fluide
-        })
-        
-        return {
-            'diametre': diametre,
-            'section': section,
-            'vitesse': vitesse,
-            'nombre_reynolds': Re,
-            'rugosite': rugosite,
-            'rugosite_relative': rugosite_relative,
-            'coefficient_friction': f,
-            'pertes_lineaires': pertes_lineaires_totales,
-            'pertes_singulieres': pertes_singulieres_totales,
-            'pertes_totales': pertes_totales,
-            'pertes_aspiration': pertes_aspiration_totales,
-            'hauteur_manometrique': hauteur_manometrique,
-            'puissance_hydraulique': puissance_hydraulique,
-            'proprietes_fluide': proprietes_fluide,
-            'npsh_disponible': npsh_disponible,
-            'marge_npsh': marge_npsh,
-            'details_singuliers': details_singuliers,
-            'debit_m3s': debit_m3s,
-            'regime_ecoulement': 'Turbulent' if Re > 4000 else 'Laminaire' if Re < 2000 else 'Transition',
-            'puissances': puissances,
-            'coup_belier': coup_belier
-        }
 
-    def dessiner_schema_installation(self):
-        """Dessine un schéma schématique de l'installation"""
-        fig, ax = plt.subplots(figsize=(14, 6))
-        
-        # Configuration du graphique
-        ax.set_xlim(0, 12)
-        ax.set_ylim(0, 8)
-        ax.set_aspect('equal')
-        ax.axis('off')
-        
-        # Couleurs
-        couleur_conduite = '#4682B4'
-        couleur_reservoir = '#87CEEB'
-        couleur_pompe = '#FF6B6B'
-        couleur_vanne = '#32CD32'
-        couleur_clapet = '#FFA500'
-        
-        # Réservoir amont (aspiration)
-        reservoir_amont = Rectangle((1, 2), 0.5, 2, facecolor=couleur_reservoir, edgecolor='black')
-        ax.add_patch(reservoir_amont)
-        ax.text(0.5, 3.5, 'Réservoir\nAspiration', ha='center', va='center', fontsize=10, weight='bold')
-        
-        # Conduite d'aspiration
-        ax.plot([1.5, 3], [3, 3], color=couleur_conduite, linewidth=3)
-        
-        # Points singuliers sur aspiration
-        x_aspiration = 2.0
-        for point in st.session_state.points_singuliers:
-            if 'aspiration' in point.get('emplacement', 'aspiration'):
-                if 'vanne' in point['type'].lower():
-                    ax.plot([x_aspiration, x_aspiration], [2.8, 3.2], color=couleur_vanne, linewidth=3)
-                    ax.text(x_aspiration, 2.5, 'V', ha='center', va='center', fontsize=8, weight='bold')
-                elif 'clapet' in point['type'].lower():
-                    triangle = Polygon([[x_aspiration, 2.8], [x_aspiration-0.2, 3.2], [x_aspiration+0.2, 3.2]], 
-                                     facecolor=couleur_clapet)
-                    ax.add_patch(triangle)
-                    ax.text(x_aspiration, 2.5, 'C', ha='center', va='center', fontsize=8, weight='bold')
-                x_aspiration += 0.3
-        
-        # Pompe
-        cercle_pompe = Circle((3.5, 3), 0.4, facecolor=couleur_pompe, edgecolor='black')
-        ax.add_patch(cercle_pompe)
-        ax.text(3.5, 3, 'P', ha='center', va='center', fontsize=12, weight='bold', color='white')
-        ax.text(3.5, 2.3, 'POMPE', ha='center', va='center', fontsize=9, weight='bold')
-        
-        # Conduite refoulement horizontale
-        ax.plot([3.9, 7], [3, 3], color=couleur_conduite, linewidth=3)
-        
-        # Points singuliers sur refoulement
-        x_refoulement = 4.5
-        for point in st.session_state.points_singuliers:
-            if point.get('emplacement', 'aspiration') == 'refoulement':
-                if 'vanne' in point['type'].lower():
-                    ax.plot([x_refoulement, x_refoulement], [2.8, 3.2], color=couleur_vanne, linewidth=3)
-                    ax.text(x_refoulement, 2.5, 'V', ha='center', va='center', fontsize=8, weight='bold')
-                elif 'clapet' in point['type'].lower():
-                    triangle = Polygon([[x_refoulement, 2.8], [x_refoulement-0.2, 3.2], [x_refoulement+0.2, 3.2]], 
-                                     facecolor=couleur_clapet)
-                    ax.add_patch(triangle)
-                    ax.text(x_refoulement, 2.5, 'C', ha='center', va='center', fontsize=8, weight='bold')
-                elif 'coude' in point['type'].lower():
-                    ax.plot([x_refoulement, x_refoulement+0.2], [3, 3.2], color='red', linewidth=2)
-                    ax.text(x_refoulement, 2.5, '⟳', ha='center', va='center', fontsize=10)
-                x_refoulement += 0.3
-        
-        # Montée vers réservoir aval
-        ax.plot([7, 7], [3, 5], color=couleur_conduite, linewidth=3)
-        
-        # Réservoir aval (refoulement)
-        reservoir_aval = Rectangle((6.5, 5), 0.5, 2, facecolor=couleur_reservoir, edgecolor='black')
-        ax.add_patch(reservoir_aval)
-        ax.text(8, 6, 'Réservoir\nRefoulement', ha='center', va='center', fontsize=10, weight='bold')
-        
-        # Flèches d'écoulement
-        ax.annotate('', xy=(2.5, 3), xytext=(2.0, 3),
-                   arrowprops=dict(arrowstyle='->', color='red', lw=2))
-        ax.annotate('', xy=(5, 3), xytext=(4.5, 3),
-                   arrowprops=dict(arrowstyle='->', color='red', lw=2))
-        
-        # Textes informatifs
-        resultats = self.calculer_pertes_totales()
-        ax.text(5, 0.8, f"Débit: {st.session_state.donnees_base['debit_m3h']:.1f} m³/h", 
-               ha='center', va='center', fontsize=11, weight='bold', 
-               bbox=dict(boxstyle="round,pad=0.3", facecolor="lightblue"))
-        ax.text(5, 0.4, f"HMT: {resultats['hauteur_manometrique']:.1f} m", 
-               ha='center', va='center', fontsize=11, weight='bold',
-               bbox=dict(boxstyle="round,pad=0.3", facecolor="lightgreen"))
-        
-        ax.text(5, 7.5, "SCHEMA DE L'INSTALLATION", 
-               ha='center', va='center', fontsize=14, weight='bold')
-        
-        # Légende
-        legend_elements = [
-            mlines.Line2D([], [], color=couleur_conduite, linewidth=3, label='Conduite'),
-            mlines.Line2D([], [], color=couleur_vanne, linewidth=3, label='Vanne'),
-            mlines.Line2D([], [], color=couleur_clapet, marker='^', markersize=10, label='Clapet', linewidth=0),
-            mlines.Line2D([], [], color='red', marker='>', markersize=10, label='Sens écoulement', linewidth=0)
-        ]
-        ax.legend(handles=legend_elements, loc='upper left', bbox_to_anchor=(0, 1))
-        
-        plt.tight_layout()
-        return fig
+def plage_temperatures(fluide):
+    """Plage de température (°C) admise pour un fluide de la session : celle de sa table s'il en a une"""
+    table = st.session_state.fluides[fluide].get('table')
+    if not table:
+        return PLAGE_TEMPERATURES_FORMULES
+    return float(min(table['temperature'])), float(max(table['temperature']))
 
-    def dessiner_courbe_reseau_pompes(self, resultats):
-        """Dessine la courbe du réseau avec les courbes de pompes"""
-        fig, ax = plt.subplots(figsize=(12, 8))
-        
-        # Calcul de la courbe du réseau pour différents débits
-        debits = np.linspace(0.1, st.session_state.donnees_base['debit_m3h'] * 2, 50)
-        hmt_reseau = []
-        
-        for debit in debits:
-            debit_m3s = self.convertir_debit_m3h_vers_m3s(debit)
-            vitesse = self.calculer_vitesse(debit_m3s, resultats['section'])
-            
-            pertes_lineaires = self.calculer_pertes_lineaires(
-                resultats['coefficient_friction'],
-                st.session_state.geometrie['longueur_totale'],
-                resultats['diametre'],
-                vitesse
-            )
-            
-            hmt = (st.session_state.geometrie['hauteur_montee'] - 
-                  st.session_state.geometrie['hauteur_descente'] + 
-                  pertes_lineaires)
-            hmt_reseau.append(hmt)
-        
-        # Courbe du réseau
-        ax.plot(debits, hmt_reseau, 'b-', linewidth=3, label='Courbe du réseau')
-        
-        # Courbes de pompes si disponibles
-        if not st.session_state.donnees_pompe.empty:
-            frequences = [50, 45, 40, 35, 30, 25]
-            couleurs = ['red', 'orange', 'green', 'purple', 'brown', 'pink']
-            
-            for freq, couleur in zip(frequences, couleurs):
-                pompe_freq = self.calculer_courbe_pompe_frequence(st.session_state.donnees_pompe, freq)
-                if not pompe_freq.empty:
-                    # Recherche des colonnes de débit et HMT
-                    colonne_debit = None
-                    colonne_hmt = None
-                    
-                    for col in pompe_freq.columns:
-                        col_lower = col.lower()
-                        if 'débit' in col_lower or 'debit' in col_lower or 'q' in col_lower:
-                            colonne_debit = col
-                        elif 'hmt' in col_lower or 'hauteur' in col_lower or 'h' in col_lower:
-                            colonne_hmt = col
-                        elif 'pression' in col_lower:
-                            colonne_hmt = col
-                    
-                    if colonne_debit and colonne_hmt:
-                        # Trier par débit pour une courbe propre
-                        pompe_freq = pompe_freq.sort_values(by=colonne_debit)
-                        ax.plot(pompe_freq[colonne_debit], pompe_freq[colonne_hmt], 
-                               color=couleur, linestyle='--', linewidth=2, 
-                               label=f'Pompe {freq}Hz')
-        
-        # Point de fonctionnement actuel
-        ax.plot(st.session_state.donnees_base['debit_m3h'], 
-               resultats['hauteur_manometrique'], 
-               'ro', markersize=10, label='Point de fonctionnement')
-        
-        ax.set_xlabel('Débit (m³/h)', fontsize=12, weight='bold')
-        ax.set_ylabel('Hauteur Manométrique Totale (m)', fontsize=12, weight='bold')
-        ax.set_title('Courbe du Réseau et Courbes de Pompes', fontsize=14, weight='bold')
-        ax.grid(True, alpha=0.3)
-        ax.legend()
-        
-        plt.tight_layout()
-        return fig
+def revenir_conduite_simple():
+    """Abandonne les tronçons importés et les points singuliers placés sur ces tronçons (rappel du bouton)"""
+    st.session_state.segments = []
+    registre = st.session_state.points_singuliers
+    retires = sum(registre.nombre(emplacement) for emplacement in registre.totaux if isinstance(emplacement, int))
+    if retires:
+        st.session_state.points_singuliers = RegistreSinguliers(
+            point for point in registre if not isinstance(point.emplacement, int)
+        )
+        st.session_state.singuliers_retires = retires
 
 def afficher_sidebar():
     """Affiche la barre latérale avec les paramètres"""
@@ -725,6 +388,23 @@ def afficher_sidebar():
         
         # Propriétés du fluide
         st.subheader("Propriétés du fluide")
+        
+        # Fluides supplémentaires : tables de propriétés en température
+        fichier_fluides = st.file_uploader(
+            "Importer des fluides (CSV)", type=['csv'],
+            help="Une ligne par fluide et par température : fluide, temperature (°C), masse_volumique (kg/m³), "
+                 "viscosite_cinematique (m²/s), pression_vapeur (Pa), module_elasticite (Pa)"
+        )
+        if fichier_fluides is not None:
+            try:
+                identifiant = getattr(fichier_fluides, 'file_id', None) or (fichier_fluides.name, fichier_fluides.size)
+                if st.session_state.get('fichier_fluides') != identifiant:
+                    fluides = lire_fluides(pd.read_csv(fichier_fluides))
+                    st.session_state.fluides.update({nom: asdict(fluide) for nom, fluide in fluides.items()})
+                    st.session_state.fichier_fluides = identifiant
+            except Exception as e:
+                st.error(f"❌ Erreur lecture fichier: {e}")
+        
         st.session_state.donnees_base['fluide'] = st.selectbox(
             "Nature du fluide",
             options=list(st.session_state.fluides.keys()),
@@ -733,13 +413,21 @@ def afficher_sidebar():
             )
         )
         
+        # Température bornée à la table du fluide : hors de la table, les propriétés ne sont pas connues
+        temperature_min, temperature_max = plage_temperatures(st.session_state.donnees_base['fluide'])
+        temperature = float(st.session_state.donnees_base['temperature'])
+        if not temperature_min <= temperature <= temperature_max:
+            st.warning(f"⚠️ {temperature:g} °C est hors de la table du fluide : température ramenée "
+                       f"dans la plage {temperature_min:g} à {temperature_max:g} °C")
+            temperature = min(max(temperature, temperature_min), temperature_max)
         st.session_state.donnees_base['temperature'] = st.number_input(
             "Température (°C)",
-            value=float(st.session_state.donnees_base['temperature']),
-            min_value=-50.0,
-            max_value=300.0,
+            value=temperature,
+            min_value=temperature_min,
+            max_value=temperature_max,
             step=1.0,
-            format="%.1f"
+            format="%.1f",
+            help=f"Plage de la table du fluide : {temperature_min:g} à {temperature_max:g} °C"
         )
         
         # Rendements
@@ -797,6 +485,38 @@ def afficher_sidebar():
             step=1.0
         )
         
+        # Tronçons relevés (longueur, diamètre, matériau, emplacement par tronçon)
+        fichier_segments = st.file_uploader(
+            "Importer les tronçons de conduite (CSV : longueur, diametre, materiau, emplacement)", type=['csv']
+        )
+        if fichier_segments is not None:
+            identifiant = getattr(fichier_segments, 'file_id', None) or (fichier_segments.name, fichier_segments.size)
+            if st.session_state.get('fichier_segments') != identifiant:
+                try:
+                    donnees_segments = pd.read_csv(fichier_segments)
+                    if 'emplacement' not in donnees_segments.columns:
+                        donnees_segments['emplacement'] = 'refoulement'
+                    donnees_segments = donnees_segments[['longueur', 'diametre', 'materiau', 'emplacement']].copy()
+                    donnees_segments['emplacement'] = donnees_segments['emplacement'].map(lire_emplacement_troncon)
+                    inconnus = set(donnees_segments['materiau']) - set(st.session_state.materiaux)
+                    if inconnus:
+                        raise ValueError(f"matériaux inconnus : {', '.join(map(str, inconnus))}")
+                    st.session_state.segments = donnees_segments.astype(
+                        {'longueur': float, 'diametre': float, 'materiau': str, 'emplacement': str}
+                    ).to_dict('records')
+                    st.session_state.fichier_segments = identifiant
+                except Exception as e:
+                    st.error(f"❌ Erreur lecture tronçons: {e}")
+        
+        if st.session_state.segments:
+            longueur_segments = sum(segment['longueur'] for segment in st.session_state.segments)
+            st.success(f"✅ {len(st.session_state.segments)} tronçons ({longueur_segments:.1f} m) : "
+                       "la longueur totale, la longueur d'aspiration, le diamètre et le matériau ci-dessus sont remplacés")
+            st.button("Revenir à la conduite simple", on_click=revenir_conduite_simple)
+        if st.session_state.get('singuliers_retires'):
+            st.warning(f"⚠️ {st.session_state.pop('singuliers_retires')} points singuliers placés sur des tronçons "
+                       "ont été retirés avec les tronçons")
+        
         # Paramètres NPSH
         st.subheader("Paramètres NPSH")
         st.session_state.donnees_base['pression_amont'] = st.number_input(
@@ -866,7 +586,13 @@ def afficher_sidebar():
         fichier_pompe = st.file_uploader("Importer courbe pompe 50Hz (CSV)", type=['csv'])
         if fichier_pompe is not None:
             try:
-                st.session_state.donnees_pompe = pd.read_csv(fichier_pompe)
+                # Lecture et compilation de la courbe une seule fois par fichier importé
+                identifiant = getattr(fichier_pompe, 'file_id', None) or (fichier_pompe.name, fichier_pompe.size)
+                if st.session_state.get('fichier_pompe') != identifiant:
+                    donnees_pompe = pd.read_csv(fichier_pompe)
+                    st.session_state.courbe_pompe = CourbePompe.depuis_dataframe(donnees_pompe)
+                    st.session_state.donnees_pompe = donnees_pompe
+                    st.session_state.fichier_pompe = identifiant
                 st.success(f"✅ Données pompe chargées: {len(st.session_state.donnees_pompe)} points")
                 
                 # Aperçu des données importées
@@ -883,323 +609,615 @@ def afficher_sidebar():
         col1, col2, col3 = st.columns([2, 1, 1])
         
         with col1:
-            type_singulier = st.selectbox(
+            st.selectbox(
                 "Type de point singulier",
-                options=list(st.session_state.coefficients_singuliers.keys())
+                options=list(st.session_state.coefficients_singuliers.keys()),
+                key='type_singulier'
             )
         
         with col2:
-            quantite = st.number_input("Quantité", min_value=1, max_value=100, value=1, step=1)
+            st.number_input("Quantité", min_value=1, max_value=100, value=1, step=1, key='quantite_singulier')
         
         with col3:
-            emplacement = st.selectbox(
+            st.selectbox(
                 "Emplacement",
-                options=['aspiration', 'refoulement']
+                options=['aspiration', 'refoulement', *range(len(st.session_state.segments))],
+                format_func=libelle_emplacement,
+                key='emplacement_singulier'
             )
         
-        if st.button("➕ Ajouter point singulier"):
-            st.session_state.points_singuliers.append({
-                'type': type_singulier,
-                'quantite': quantite,
-                'emplacement': emplacement
-            })
-            st.rerun()
-        
-        # Afficher la liste des points singuliers
+        st.button("➕ Ajouter point singulier", on_click=ajouter_point_singulier)
+        
+        # Nomenclature importée : remplace la liste en une seule mise à jour, une fois par fichier
+        fichier_nomenclature = st.file_uploader("Importer une nomenclature (CSV ou Excel)", type=['csv', 'xlsx'],
+                                                help="Colonnes : type, quantité, emplacement "
+                                                     "(aspiration, refoulement ou tronçon N)")
+        if fichier_nomenclature is not None:
+            identifiant = (getattr(fichier_nomenclature, 'file_id', None)
+                           or (fichier_nomenclature.name, fichier_nomenclature.size))
+            if st.session_state.get('fichier_nomenclature') != identifiant:
+                try:
+                    st.session_state.points_singuliers = charger_nomenclature(
+                        fichier_nomenclature, st.session_state.coefficients_singuliers
+                    )
+                    st.session_state.fichier_nomenclature = identifiant
+                    st.success(f"✅ Nomenclature chargée: {len(st.session_state.points_singuliers)} points")
+                except Exception as e:
+                    st.error(f"❌ Erreur lecture nomenclature: {e}")
+        
+        # Liste des points singuliers : un seul tableau éditable, appliqué d'un bloc (construit une fois ouvert)
+        nombre_points = st.empty()
         if st.session_state.points_singuliers:
-            st.write("**Points singuliers ajoutés:**")
-            for i, point in enumerate(st.session_state.points_singuliers):
-                col1, col2 = st.columns([3, 1])
-                with col1:
-                    st.write(f"• {point['type']} (x{point['quantite']}) - {point['emplacement']}")
-                with col2:
-                    if st.button("🗑️", key=f"del_{i}"):
-                        st.session_state.points_singuliers.pop(i)
-                        st.rerun()
+            liste = st.expander("Liste des points singuliers", expanded=len(st.session_state.points_singuliers) <= 20,
+                                key='liste_points_singuliers', on_change='rerun')
+            with liste:
+                if liste.open:
+                    afficher_editeur_singuliers()
+        if st.session_state.points_singuliers:
+            nombre_points.write(f"**Points singuliers ajoutés:** {len(st.session_state.points_singuliers)}")
+        
+        # Débogage
+        st.subheader("Débogage")
+        st.checkbox("Afficher les temps d'exécution par étape", key='afficher_instrumentation')
 
 
 def exporter_pdf(resultats, calculateur):
     """Exporte les résultats en PDF avec graphiques"""
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-    styles = getSampleStyleSheet()
-    
-    # Créer un style personnalisé pour les titres
-    titre_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=16,
-        spaceAfter=30,
-        textColor=colors.HexColor('#1f77b4')
-    )
+    # Graphiques partagés avec la page via le cache
+    try:
+        images = [
+            ("Schéma de l'installation", calculateur.image_schema_installation(resultats), 3),
+            ("Courbe du réseau et caractéristiques pompes", calculateur.image_courbe_reseau_pompes(resultats), 4)
+        ]
+        erreur_graphiques = None
+    except Exception as e:
+        images = []
+        erreur_graphiques = str(e)
     
-    story = []
+    return io.BytesIO(construire_rapport(calculateur.installation(), resultats, images,
+                                         erreur_graphiques=erreur_graphiques))
+
+def afficher_instrumentation(chronometre):
+    """Affiche les temps de l'exécution et les centiles du journal (case de débogage cochée)"""
+    if not st.session_state.get('afficher_instrumentation'):
+        return
     
-    # Fonction pour ajouter le filigrane en arrière-plan
-    def add_watermark(canvas, doc):
-        canvas.saveState()
-        
-        # Configuration du filigrane
-        watermark_text = "By Viveleau 2025 - https://viveleau-services.com/ is the owner"
-        
-        # Positionner le filigrane en diagonale au centre de la page
-        # Utiliser setFillColorRGB avec alpha pour la transparence
-        canvas.setFillColorRGB(0, 0, 0, alpha=0.1)  # Noir avec transparence
-        canvas.setFont("Helvetica", 16)
+    with st.expander("🐞 Temps d'exécution par étape", expanded=True):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Exécution complète", f"{chronometre.duree_totale:.0f} ms")
+        with col2:
+            st.metric("Résolutions de Colebrook", f"{chronometre.compteurs.get('appels_colebrook', 0)}")
+        with col3:
+            st.metric("Itérations de Colebrook", f"{chronometre.compteurs.get('iterations_colebrook', 0)}")
+        
+        st.write("**Étapes de la page et méthodes du calculateur (exécution courante):**")
+        st.dataframe(pd.DataFrame([
+            {'Étape': nom, 'Durée (ms)': etape['ms'], 'Appels': etape['appels']}
+            for nom, etape in chronometre.etapes.items()
+        ]).style.format({'Durée (ms)': '{:.1f}'}), use_container_width=True)
+        
+        statistiques = statistiques_journal()
+        if statistiques:
+            st.write("**Centiles sur les dernières exécutions journalisées:**")
+            st.dataframe(pd.DataFrame([
+                {'Étape': nom, 'Exécutions': valeurs['executions'], 'p50 (ms)': valeurs['p50'], 'p95 (ms)': valeurs['p95']}
+                for nom, valeurs in statistiques.items()
+            ]).style.format({'p50 (ms)': '{:.1f}', 'p95 (ms)': '{:.1f}'}), use_container_width=True)
+
+@st.fragment
+@instrumenter_fragment()
+def afficher_proprietes_temperature(calculateur):
+    """Balayage des propriétés du fluide en température (fragment repliable : calculé seulement une fois ouvert)"""
+    expander = st.expander("Propriétés du fluide en fonction de la température", key='section_proprietes_temperature', on_change='rerun')
+    with expander:
+        if not expander.open:
+            return
+        debut, fin = plage_temperatures(st.session_state.donnees_base['fluide'])
+        col1, col2 = st.columns(2)
+        with col1:
+            temperature_min = st.number_input("Température minimale (°C)", value=min(max(debut, 0.0), fin),
+                                              min_value=debut, max_value=fin, step=5.0)
+        with col2:
+            temperature_max = st.number_input("Température maximale (°C)", value=max(min(fin, 100.0), debut),
+                                              min_value=debut, max_value=fin, step=5.0)
+        
+        if temperature_max > temperature_min:
+            # Un seul appel vectorisé pour tout le balayage
+            temperatures = np.linspace(temperature_min, temperature_max, 101)
+            proprietes = calculateur.moteur.calculer_proprietes_fluide(st.session_state.donnees_base['fluide'], temperatures)
+            df_proprietes = pd.DataFrame({
+                'Température (°C)': temperatures,
+                'Masse volumique (kg/m³)': proprietes.masse_volumique,
+                'Viscosité cinématique (mm²/s)': proprietes.viscosite_cinematique * 1e6,
+                'Pression de vapeur (kPa)': proprietes.pression_vapeur / 1000,
+                'Module d\'élasticité (GPa)': proprietes.module_elasticite / 1e9
+            }).set_index('Température (°C)')
+            col1, col2 = st.columns(2)
+            with col1:
+                st.line_chart(df_proprietes[['Viscosité cinématique (mm²/s)']])
+            with col2:
+                st.line_chart(df_proprietes[['Pression de vapeur (kPa)']])
+            st.dataframe(df_proprietes.iloc[::10].style.format(precision=3), use_container_width=True)
+        else:
+            st.warning("La température maximale doit être supérieure à la température minimale")
+
+
+@st.fragment
+@instrumenter_fragment()
+def afficher_simulation_prolongee(calculateur):
+    """Simulation sur une période prolongée (fragment repliable : calculé seulement une fois ouvert)"""
+    expander = st.expander("Simulation sur une période prolongée (profil de demande journalier ou annuel)", key='section_simulation_prolongee', on_change='rerun')
+    with expander:
+        if not expander.open:
+            return
+        st.write("**Profil (CSV):** demande_m3h, et optionnellement niveau_aval, niveau_aspiration (m), "
+                 "prix_energie (€/kWh), une ligne par pas de temps. Sans fichier, le profil journalier type "
+                 "est appliqué au débit nominal.")
+        col1, col2, col3, col4 = st.columns(4)
         
-        # Rotation de 45 degrés
-        canvas.rotate(45)
+        with col1:
+            fichier_profil = st.file_uploader("Profil de demande", type=['csv'])
+        with col2:
+            pas_temps_h = st.number_input("Pas de temps (h)", value=1.0, min_value=0.01, step=0.25)
+            jours_type = st.number_input("Jours du profil type", value=1, min_value=1, max_value=365, step=1)
+        with col3:
+            prix_periode = st.number_input("Prix de l'énergie (€/kWh)", value=0.15, min_value=0.0, step=0.01, format="%.3f",
+                                           key='prix_energie_periode')
+        with col4:
+            frequence_min = st.number_input("Fréquence minimale (Hz)", value=25.0, min_value=1.0, max_value=50.0, step=1.0)
+            frequence_max = st.number_input("Fréquence maximale (Hz)", value=50.0, min_value=1.0, max_value=70.0, step=1.0)
+        
+        try:
+            if fichier_profil is not None:
+                profil = lire_profil(pd.read_csv(fichier_profil))
+            else:
+                profil = {'demande_m3h': profil_type(st.session_state.donnees_base['debit_m3h'], int(jours_type))}
+            profil.setdefault('prix_energie', prix_periode)
+            periode = cache_simulations.obtenir(
+                empreinte('periode', calculateur.empreinte_donnees(), st.session_state.donnees_pompe,
+                          profil, pas_temps_h, frequence_min, frequence_max),
+                lambda: simuler_periode(calculateur.moteur, calculateur.installation(), courbe_pompe=st.session_state.courbe_pompe,
+                                        pas_temps_h=pas_temps_h, frequence_min=frequence_min,
+                                        frequence_max=frequence_max, **profil)
+            )
+            
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Énergie consommée", f"{periode.energie_totale:,.0f} kWh")
+            with col2:
+                st.metric("Coût de l'énergie", f"{periode.cout_total:,.0f} €")
+            with col3:
+                st.metric("Énergie spécifique moyenne", f"{periode.energie_specifique:.2f} Wh/m³")
+            with col4:
+                st.metric("Marge NPSH minimale", f"{periode.marge_npsh_min:.2f} m")
+            
+            if periode.heures_deficit > 0:
+                st.warning(f"⚠️ Demande non satisfaite pendant {periode.heures_deficit:.1f} h "
+                           f"(HMT hors d'atteinte à {frequence_max:.0f} Hz)")
+            
+            st.line_chart(pd.DataFrame({
+                'Demande (m³/h)': periode.demande_m3h,
+                'Fréquence (Hz)': periode.frequence,
+                'Puissance électrique (kW)': periode.puissance_electrique
+            }, index=pd.Index(periode.temps_h, name='Temps (h)')))
+        except Exception as e:
+            st.error(f"❌ Erreur simulation période: {e}")
+
+
+@st.fragment
+@instrumenter_fragment()
+def afficher_fermeture_vanne(calculateur):
+    """Simulation transitoire de fermeture de vanne (fragment repliable : calculé seulement une fois ouvert)"""
+    expander = st.expander("Simulation transitoire de fermeture de vanne (méthode des caractéristiques)", key='section_fermeture_vanne', on_change='rerun')
+    with expander:
+        if not expander.open:
+            return
+        col1, col2, col3, col4 = st.columns(4)
         
-        # Positionner le filigrane au centre de la page
-        # Répéter le filigrane sur toute la page
-        for i in range(-3, 4):
-            for j in range(-3, 4):
-                canvas.drawCentredString(
-                    x=100 + i * 200, 
-                    y=100 + j * 150, 
-                    text=watermark_text
+        with col1:
+            duree_fermeture = st.number_input("Durée de fermeture (s)", value=2.0, min_value=0.0, step=0.5)
+        with col2:
+            exposant_fermeture = st.number_input("Exposant de la loi de fermeture", value=1.0, min_value=0.1, step=0.1)
+        with col3:
+            nombre_troncons = st.number_input("Nombre de tronçons", value=200, min_value=2, max_value=20000, step=50)
+        with col4:
+            extremite_aval = st.selectbox("Extrémité aval", ['vanne', 'fermee', 'reservoir'],
+                                          format_func={'vanne': 'Vanne', 'fermee': 'Fermeture instantanée',
+                                                       'reservoir': 'Réservoir'}.get)
+        
+        try:
+            loi_fermeture = LoiFermeture(duree=duree_fermeture, exposant=exposant_fermeture)
+            transitoire = cache_simulations.obtenir(
+                empreinte('transitoire', calculateur.empreinte_bloc('transitoire'), loi_fermeture,
+                          int(nombre_troncons), extremite_aval),
+                lambda: simuler_fermeture_vanne(calculateur.moteur, calculateur.installation(), loi_fermeture,
+                                                int(nombre_troncons), extremite_aval=extremite_aval)
+            )
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Surpression max (MOC)", f"{transitoire.surpression_max:.2f} m")
+            with col2:
+                st.metric("Dépression max (MOC)", f"{transitoire.depression_max:.2f} m")
+            with col3:
+                st.metric("Pas de temps", f"{transitoire.pas_temps * 1000:.2f} ms")
+            
+            st.write("**Enveloppes de charge le long du refoulement (m)**")
+            st.line_chart(pd.DataFrame({
+                'Régime permanent': transitoire.charge_initiale,
+                'Charge max': transitoire.charge_max,
+                'Charge min': transitoire.charge_min
+            }, index=pd.Index(transitoire.positions, name='Position (m)')))
+            st.write("**Charge à la vanne (m)**")
+            st.line_chart(pd.DataFrame({
+                'Charge aval': transitoire.charge_aval
+            }, index=pd.Index(transitoire.temps, name='Temps (s)')))
+        except Exception as e:
+            st.error(f"❌ Erreur simulation transitoire: {e}")
+
+
+@st.fragment
+@instrumenter_fragment()
+def afficher_arret_pompe(calculateur):
+    """Simulation de la disjonction de la pompe (fragment repliable : calculé seulement une fois ouvert)"""
+    expander = st.expander("Disjonction de la pompe (ralentissement, clapet anti-retour)", key='section_arret_pompe', on_change='rerun')
+    with expander:
+        if not expander.open:
+            return
+        if st.session_state.courbe_pompe is None:
+            st.info("Importez une courbe de pompe pour simuler la disjonction")
+        else:
+            col1, col2, col3, col4 = st.columns(4)
+            
+            with col1:
+                inertie = st.number_input("Inertie moteur + roue (kg·m²)", value=0.5, min_value=0.001, step=0.1, format="%.3f")
+            with col2:
+                vitesse_nominale = st.number_input("Vitesse nominale (tr/min)", value=1450.0, min_value=100.0, step=50.0)
+            with col3:
+                delai_clapet = st.number_input("Délai de fermeture du clapet (s)", value=0.0, min_value=0.0, step=0.1)
+            with col4:
+                troncons_arret = st.number_input("Tronçons", value=100, min_value=2, max_value=5000, step=50)
+            
+            balayage = st.checkbox("Balayer les inerties de 0,1× à 10× la valeur saisie")
+            
+            try:
+                inerties = np.geomspace(inertie / 10.0, inertie * 10.0, 21) if balayage else inertie
+                clapet = ClapetAntiRetour(delai_fermeture=delai_clapet)
+                arret = cache_simulations.obtenir(
+                    empreinte('arret_pompe', calculateur.empreinte_bloc('arret_pompe'), st.session_state.donnees_pompe,
+                              inerties, vitesse_nominale, clapet, int(troncons_arret)),
+                    lambda: simuler_arret_pompe(calculateur.moteur, calculateur.installation(),
+                                                st.session_state.courbe_pompe, inerties, vitesse_nominale,
+                                                clapet, nombre_troncons=int(troncons_arret))
                 )
+                
+                if balayage:
+                    st.dataframe(pd.DataFrame({
+                        'Inertie (kg·m²)': arret.inertie,
+                        'Surpression max (m)': arret.surpression_max,
+                        'Pression min (m)': arret.pression_minimale,
+                        'Rupture de veine': arret.separation_colonne,
+                        'Fermeture clapet (s)': arret.temps_fermeture_clapet,
+                        'Débit inverse (m³/h)': arret.debit_inversion_m3h
+                    }).style.format(precision=2, na_rep='-'), use_container_width=True)
+                else:
+                    col1, col2, col3, col4 = st.columns(4)
+                    with col1:
+                        st.metric("Surpression max", f"{arret.surpression_max:.2f} m")
+                    with col2:
+                        st.metric("Pression min", f"{arret.pression_minimale:.2f} m")
+                    with col3:
+                        st.metric("Fermeture clapet", "Non fermé" if np.isnan(arret.temps_fermeture_clapet)
+                                  else f"{arret.temps_fermeture_clapet:.2f} s")
+                    with col4:
+                        st.metric("Débit inverse au claquement", f"{arret.debit_inversion_m3h:.2f} m³/h")
+                    
+                    if arret.separation_colonne:
+                        st.error("⚠️ Risque de rupture de veine liquide : la pression atteint la tension de vapeur")
+                    
+                    st.write("**Ralentissement du groupe**")
+                    st.line_chart(pd.DataFrame({
+                        'Vitesse (tr/min)': arret.vitesse_rotation,
+                        'Débit pompe (m³/h)': arret.debit_pompe_m3h
+                    }, index=pd.Index(arret.temps, name='Temps (s)')))
+                    st.write("**Pressions extrêmes le long du refoulement (m de colonne relative)**")
+                    st.line_chart(pd.DataFrame({
+                        'Pression max': arret.ligne.charge_max - arret.altitudes,
+                        'Pression min': arret.pression_min,
+                        'Tension de vapeur': np.full(arret.altitudes.size, arret.pression_vaporisation)
+                    }, index=pd.Index(arret.ligne.positions, name='Position (m)')))
+            except Exception as e:
+                st.error(f"❌ Erreur simulation disjonction: {e}")
+
+
+@st.fragment
+@instrumenter_fragment()
+def afficher_incertitudes(calculateur):
+    """Analyse d'incertitude Monte-Carlo (fragment repliable : calculé seulement une fois ouvert)"""
+    expander = st.expander("Analyse d'incertitude (Monte-Carlo) sur la marge NPSH et la HMT", key='section_incertitudes', on_change='rerun')
+    with expander:
+        if not expander.open:
+            return
+        st.write("Rugosité (par matériau), débit, température et NPSH requis sont tirés autour de leurs valeurs "
+                 "nominales ; la chaîne pertes / NPSH / puissance est évaluée sur chaque échantillon.")
+        col1, col2, col3 = st.columns(3)
         
-        canvas.restoreState()
-    
-    # Titre principal
-    title = Paragraph("RAPPORT D'ANALYSE HYDRAULIQUE COMPLET", styles['Title'])
-    story.append(title)
-    story.append(Spacer(1, 20))
-    
-    # Date et informations générales
-    date_rapport = Paragraph(f"<b>Date du rapport:</b> {datetime.now().strftime('%d/%m/%Y %H:%M')}", styles['Normal'])
-    story.append(date_rapport)
-    story.append(Spacer(1, 20))
-    
-    # Section 1: Données de base
-    story.append(Paragraph("1. DONNÉES DE BASE DU SYSTÈME", titre_style))
-    
-    data_base = [
-        ['Paramètre', 'Valeur', 'Unité'],
-        ['Diamètre intérieur', f"{resultats['diametre']:.3f}", 'm'],
-        ['Matériau de la conduite', st.session_state.donnees_base['materiau'], ''],
-        ['Débit nominal', f"{st.session_state.donnees_base['debit_m3h']:.1f}", 'm³/h'],
-        ['Fluide', st.session_state.donnees_base['fluide'], ''],
-        ['Température', f"{st.session_state.donnees_base['temperature']:.1f}", '°C'],
-        ['Longueur totale conduite', f"{st.session_state.geometrie['longueur_totale']:.1f}", 'm'],
-        ['Hauteur de montée', f"{st.session_state.geometrie['hauteur_montee']:.1f}", 'm'],
-        ['Hauteur de descente', f"{st.session_state.geometrie['hauteur_descente']:.1f}", 'm']
-    ]
-    
-    table_base = Table(data_base, colWidths=[200, 100, 50])
-    table_base.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f77b4')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f8f9fa')),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('FONTSIZE', (0, 1), (-1, -1), 9)
-    ]))
-    story.append(table_base)
-    story.append(Spacer(1, 20))
-    
-    # Section 2: Graphiques
-    story.append(Paragraph("2. SCHÉMA ET COURBES CARACTÉRISTIQUES", titre_style))
-    
-    # Sauvegarder les graphiques dans des buffers mémoire
-    try:
-        # Graphique 1: Schéma de l'installation
-        fig_schema = calculateur.dessiner_schema_installation()
-        img_buffer1 = io.BytesIO()
-        fig_schema.savefig(img_buffer1, format='png', dpi=150, bbox_inches='tight')
-        img_buffer1.seek(0)
-        
-        story.append(Paragraph("<b>Schéma de l'installation:</b>", styles['Normal']))
-        img_schema = Image(img_buffer1, width=6*inch, height=3*inch)
-        story.append(img_schema)
-        story.append(Spacer(1, 10))
+        with col1:
+            ecart_rugosite = st.number_input("Rugosité : écart-type log (-)", value=0.3, min_value=0.0, step=0.05)
+            ecart_debit = st.number_input("Débit : écart-type (%)", value=5.0, min_value=0.0, step=1.0)
+        with col2:
+            ecart_temperature = st.number_input("Température : écart-type (°C)", value=5.0, min_value=0.0, step=1.0)
+            ecart_npsh = st.number_input("NPSH requis : écart-type (%)", value=10.0, min_value=0.0, step=1.0)
+        with col3:
+            nombre_echantillons = st.number_input("Nombre d'échantillons", value=100000, min_value=1000,
+                                                  max_value=10000000, step=10000)
+            processus_incertitudes = st.number_input("Processus de calcul", value=1, min_value=1, max_value=64, step=1,
+                                                     help="Plus d'un processus pour les très grands tirages")
+        
+        incertitudes = Incertitudes(
+            rugosite=Loi('lognormale', ecart_rugosite),
+            debit=Loi('normale', ecart_debit / 100.0),
+            temperature=Loi('normale', ecart_temperature, absolu=True),
+            npsh_requis=Loi('normale', ecart_npsh / 100.0)
+        )
+        try:
+            analyse = cache_simulations.obtenir(
+                empreinte('incertitudes', calculateur.empreinte_donnees(), incertitudes, int(nombre_echantillons)),
+                lambda: analyser_incertitudes(calculateur.moteur, calculateur.installation(), incertitudes,
+                                              nombre_echantillons=int(nombre_echantillons),
+                                              processus=int(processus_incertitudes))
+            )
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("P(marge NPSH < 0)", f"{analyse.probabilite_cavitation:.2%}",
+                          help=f"Erreur type : {analyse.erreur_probabilite:.2%}")
+            with col2:
+                st.metric("Marge NPSH au centile 5", f"{analyse.distributions['marge_npsh'].centile(5):.2f} m")
+            with col3:
+                st.metric("HMT au centile 95", f"{analyse.distributions['hauteur_manometrique'].centile(95):.2f} m")
+            
+            libelles = {
+                'marge_npsh': 'Marge NPSH (m)',
+                'npsh_disponible': 'NPSH disponible (m)',
+                'hauteur_manometrique': 'HMT (m)',
+                'puissance_electrique': 'Puissance électrique (kW)'
+            }
+            st.dataframe(pd.DataFrame([
+                {
+                    'Grandeur': libelles[nom],
+                    'Nominal': analyse.nominal[nom],
+                    'Moyenne': distribution.moyenne,
+                    'Écart-type': distribution.ecart_type,
+                    **{f'P{pourcentage}': distribution.centile(pourcentage) for pourcentage in (1, 5, 50, 95, 99)}
+                }
+                for nom, distribution in analyse.distributions.items()
+            ]).set_index('Grandeur').style.format(precision=3), use_container_width=True)
+            
+            col1, col2 = st.columns(2)
+            for colonne, nom in ((col1, 'marge_npsh'), (col2, 'hauteur_manometrique')):
+                bornes, effectifs = analyse.distributions[nom].histogramme()
+                with colonne:
+                    st.write(f"**{libelles[nom]}**")
+                    st.bar_chart(pd.DataFrame(
+                        {'Échantillons': effectifs},
+                        index=pd.Index(np.round((bornes[:-1] + bornes[1:]) / 2.0, 3), name=libelles[nom])
+                    ))
+        except Exception as e:
+            st.error(f"❌ Erreur analyse d'incertitude: {e}")
+
+
+@st.fragment
+@instrumenter_fragment()
+def afficher_optimisation(calculateur):
+    """Optimisation du diamètre et du matériau (fragment repliable : calculé seulement une fois ouvert)"""
+    expander = st.expander("Classement des conduites par coût global (investissement + énergie actualisée)", key='section_optimisation', on_change='rerun')
+    with expander:
+        if not expander.open:
+            return
+        if st.session_state.segments:
+            st.warning("⚠️ L'optimisation porte sur la conduite simple (un diamètre, un matériau) : "
+                       "revenez à la conduite simple pour classer les conduites")
+            return
+        col1, col2, col3, col4 = st.columns(4)
         
-        # Graphique 2: Courbe du réseau
-        fig_courbe = calculateur.dessiner_courbe_reseau_pompes(resultats)
-        img_buffer2 = io.BytesIO()
-        fig_courbe.savefig(img_buffer2, format='png', dpi=150, bbox_inches='tight')
-        img_buffer2.seek(0)
+        with col1:
+            prix_energie = st.number_input("Prix de l'énergie (€/kWh)", value=0.15, min_value=0.0, step=0.01, format="%.3f")
+            vitesse_min = st.number_input("Vitesse minimale (m/s)", value=0.5, min_value=0.0, step=0.1)
         
-        story.append(Paragraph("<b>Courbe du réseau et caractéristiques pompes:</b>", styles['Normal']))
-        img_courbe = Image(img_buffer2, width=6*inch, height=4*inch)
-        story.append(img_courbe)
+        with col2:
+            heures_fonctionnement = st.number_input("Fonctionnement (h/an)", value=4000.0, min_value=0.0, max_value=8760.0, step=100.0)
+            vitesse_max = st.number_input("Vitesse maximale (m/s)", value=3.0, min_value=0.1, step=0.1)
         
-        # Fermer les figures pour libérer la mémoire
-        plt.close(fig_schema)
-        plt.close(fig_courbe)
+        with col3:
+            duree_vie = st.number_input("Durée de vie (ans)", value=30.0, min_value=1.0, step=1.0)
+            marge_npsh_min = st.number_input("Marge NPSH minimale (m)", value=0.5, step=0.1)
+        
+        with col4:
+            taux_actualisation = st.number_input("Taux d'actualisation", value=0.05, min_value=0.0, max_value=0.5, step=0.01, format="%.3f")
+            surpression_max = st.number_input("Surpression max (kPa, 0 = sans limite)", value=0.0, min_value=0.0, step=100.0)
+        
+        optimisation = optimiser_conduite(
+            calculateur.moteur,
+            calculateur.installation(),
+            economie=ParametresEconomiques(
+                prix_energie=prix_energie,
+                heures_fonctionnement=heures_fonctionnement,
+                duree_vie=duree_vie,
+                taux_actualisation=taux_actualisation
+            ),
+            contraintes=Contraintes(
+                vitesse_min=vitesse_min,
+                vitesse_max=vitesse_max,
+                marge_npsh_min=marge_npsh_min,
+                surpression_max=surpression_max * 1000 if surpression_max > 0 else None
+            )
+        )
         
-    except Exception as e:
-        story.append(Paragraph(f"<b>Erreur lors de la génération des graphiques:</b> {str(e)}", styles['Normal']))
-    
-    story.append(Spacer(1, 20))
+        meilleurs = optimisation.meilleurs(10)
+        if meilleurs:
+            df_optimisation = pd.DataFrame([{
+                'Diamètre (m)': candidat['diametre'],
+                'Matériau': candidat['materiau'],
+                'Vitesse (m/s)': candidat['vitesse'],
+                'HMT (m)': candidat['hauteur_manometrique'],
+                'Puissance électrique (kW)': candidat['puissance_electrique'],
+                'Énergie (€/an)': candidat['cout_energie_annuel'],
+                'Investissement (€)': candidat['cout_investissement'],
+                'Coût global (€)': candidat['cout_global'],
+                'Marge NPSH (m)': candidat['marge_npsh'],
+                'Surpression (kPa)': candidat['surpression'] / 1000
+            } for candidat in meilleurs])
+            st.dataframe(df_optimisation.style.format(precision=2), use_container_width=True)
+            st.caption(f"{int(optimisation.admissible.sum())} candidats admissibles sur {optimisation.diametre.size} évalués ; "
+                       "surpression calculée avec le module d'Young et l'épaisseur de paroi indicatifs de chaque matériau")
+        else:
+            st.warning("⚠️ Aucune combinaison diamètre / matériau ne respecte les contraintes")
+
 
+@st.fragment
+@instrumenter_fragment()
+def afficher_reseau_maille(calculateur):
+    """Calcul d'un réseau maillé (fragment repliable : calculé seulement une fois ouvert)"""
+    expander = st.expander("Calcul d'un réseau de distribution (gradient global)", key='section_reseau_maille', on_change='rerun')
+    with expander:
+        if not expander.open:
+            return
+        st.write("**Nœuds (CSV):** nom, altitude, demande_m3h, charge_imposee (renseignée pour les réservoirs)")
+        st.write("**Liens (CSV):** nom, amont, aval, longueur, diametre, materiau, points_singuliers "
+                 "(Type:quantité séparés par ';'), pompe (fréquence en Hz pour une pompe, qui utilise la courbe importée)")
+        col1, col2 = st.columns(2)
+        with col1:
+            fichier_noeuds = st.file_uploader("Nœuds du réseau", type=['csv'])
+        with col2:
+            fichier_liens = st.file_uploader("Liens du réseau", type=['csv'])
         
+        if fichier_noeuds is not None and fichier_liens is not None:
+            try:
+                noeuds = pd.read_csv(fichier_noeuds)
+                liens = pd.read_csv(fichier_liens)
+                cle = empreinte(
+                    'reseau', noeuds, liens, st.session_state.donnees_pompe,
+                    st.session_state.donnees_base['fluide'], st.session_state.donnees_base['temperature'],
+                    st.session_state.materiaux, st.session_state.fluides, st.session_state.coefficients_singuliers
+                )
+                reseau = cache_simulations.obtenir(cle, lambda: resoudre_reseau(
+                    calculateur.moteur,
+                    Reseau.depuis_dataframes(noeuds, liens, st.session_state.courbe_pompe),
+                    st.session_state.donnees_base['fluide'],
+                    st.session_state.donnees_base['temperature']
+                ))
+                
+                if reseau.converge:
+                    st.success(f"✅ Réseau équilibré en {reseau.iterations} itérations")
+                else:
+                    st.warning(f"⚠️ Pas de convergence après {reseau.iterations} itérations "
+                               f"(écart relatif {reseau.ecart_relatif:.1e})")
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.dataframe(pd.DataFrame({
+                        'Nœud': reseau.noms_noeuds,
+                        'Charge (m)': reseau.charges,
+                        'Pression (m)': reseau.pressions
+                    }).style.format(precision=2), use_container_width=True)
+                with col2:
+                    st.dataframe(pd.DataFrame({
+                        'Lien': reseau.noms_liens,
+                        'Pompe': reseau.est_pompe,
+                        'Débit (m³/h)': reseau.debits_m3h,
+                        'Vitesse (m/s)': reseau.vitesses,
+                        'Perte de charge (m)': reseau.pertes_charge
+                    }).style.format(precision=3, na_rep='-'), use_container_width=True)
+            except Exception as e:
+                st.error(f"❌ Erreur calcul réseau: {e}")
+
+
+@st.fragment
+@instrumenter_fragment()
+def afficher_rapports_lot(calculateur):
+    """Rapports PDF en lot (fragment repliable : calculé seulement une fois ouvert)"""
+    expander = st.expander("Rapports PDF en lot (fichier de cas)", key='section_rapports_lot', on_change='rerun')
+    with expander:
+        if not expander.open:
+            return
+        st.write("**Cas (CSV):** une ligne par installation, colonnes des données de base et de la géométrie "
+                 "(diametre, materiau, debit_m3h, longueur_totale...), points_singuliers et nom optionnels")
+        fichier_cas = st.file_uploader("Fichier de cas", type=['csv'])
+        graphiques_lot = st.checkbox("Inclure le schéma et la courbe du réseau", value=True)
+        
+        if fichier_cas is not None and st.button("📚 Générer les rapports"):
+            archive = io.BytesIO()
+            with st.spinner("Génération des rapports..."):
+                erreurs = generer_rapports(
+                    pd.read_csv(fichier_cas).to_dict('records'), archive, graphiques=graphiques_lot,
+                    processus=PROCESSUS_RAPPORTS_LOT, moteur=calculateur.moteur,
+                    courbe_pompe=st.session_state.courbe_pompe, rapport=None
+                )
+            for nom, erreur in erreurs:
+                st.error(f"❌ {nom}: {erreur}")
+            st.download_button(
+                label="📥 Télécharger l'archive des rapports",
+                data=archive.getvalue(),
+                file_name=f"rapports_hydrauliques_{datetime.now().strftime('%Y%m%d_%H%M')}.zip",
+                mime="application/zip"
+            )
+
+
+@st.fragment
+@instrumenter_fragment()
+def afficher_export(calculateur, resultats):
+    """Boutons d'export Excel et PDF (fragment : un clic ne réexécute pas la page)"""
+    col1, col2 = st.columns(2)
     
-    # Section 3: Résultats détaillés
-    story.append(Paragraph("3. RÉSULTATS DES CALCULS DÉTAILLÉS", titre_style))
-    
-    # Sous-section 3.1: Propriétés du fluide
-    story.append(Paragraph("3.1 Propriétés du fluide", styles['Heading2']))
-    data_fluide = [
-        ['Paramètre', 'Valeur', 'Unité'],
-        ['Masse volumique', f"{resultats['proprietes_fluide']['masse_volumique']:.1f}", 'kg/m³'],
-        ['Viscosité cinématique', f"{resultats['proprietes_fluide']['viscosite_cinematique']:.2e}", 'm²/s'],
-        ['Pression de vapeur', f"{resultats['proprietes_fluide']['pression_vapeur']/1000:.1f}", 'kPa'],
-        ['Régime d\'écoulement', resultats['regime_ecoulement'], '']
-    ]
-    
-    table_fluide = Table(data_fluide, colWidths=[200, 100, 50])
-    table_fluide.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#28a745')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#e8f5e8')),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('FONTSIZE', (0, 0), (-1, -1), 9)
-    ]))
-    story.append(table_fluide)
-    story.append(Spacer(1, 10))
-    
-    # Sous-section 3.2: Caractéristiques d'écoulement
-    story.append(Paragraph("3.2 Caractéristiques d'écoulement", styles['Heading2']))
-    data_ecoulement = [
-        ['Paramètre', 'Valeur', 'Unité'],
-        ['Vitesse d\'écoulement', f"{resultats['vitesse']:.2f}", 'm/s'],
-        ['Section d\'écoulement', f"{resultats['section']*10000:.1f}", 'cm²'],
-        ['Nombre de Reynolds', f"{resultats['nombre_reynolds']:.0f}", ''],
-        ['Coefficient de friction', f"{resultats['coefficient_friction']:.4f}", '']
-    ]
-    
-    table_ecoulement = Table(data_ecoulement, colWidths=[200, 100, 50])
-    table_ecoulement.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#17a2b8')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#e3f2fd')),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('FONTSIZE', (0, 0), (-1, -1), 9)
-    ]))
-    story.append(table_ecoulement)
-    story.append(Spacer(1, 10))
-    
-    # Sous-section 3.3: Pertes de charge
-    story.append(Paragraph("3.3 Pertes de charge", styles['Heading2']))
-    data_pertes = [
-        ['Type de pertes', 'Valeur', 'Unité'],
-        ['Pertes linéaires totales', f"{resultats['pertes_lineaires']:.2f}", 'm'],
-        ['Pertes singulières totales', f"{resultats['pertes_singulieres']:.2f}", 'm'],
-        ['Pertes d\'aspiration', f"{resultats['pertes_aspiration']:.2f}", 'm'],
-        ['Pertes totales', f"{resultats['pertes_totales']:.2f}", 'm'],
-        ['Hauteur manométrique totale', f"{resultats['hauteur_manometrique']:.2f}", 'm']
-    ]
-    
-    table_pertes = Table(data_pertes, colWidths=[200, 100, 50])
-    table_pertes.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#ffc107')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#fff3cd')),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('FONTSIZE', (0, 0), (-1, -1), 9)
-    ]))
-    story.append(table_pertes)
-    story.append(Spacer(1, 10))
-    
-    # Sous-section 3.4: Puissances
-    story.append(Paragraph("3.4 Calcul des puissances", styles['Heading2']))
-    data_puissances = [
-        ['Type de puissance', 'Valeur', 'Unité'],
-        ['Puissance hydraulique', f"{resultats['puissances']['puissance_hydraulique']:.2f}", 'kW'],
-        ['Puissance mécanique', f"{resultats['puissances']['puissance_mecanique']:.2f}", 'kW'],
-        ['Puissance électrique', f"{resultats['puissances']['puissance_electrique']:.2f}", 'kW'],
-        ['Rendement mécanique', f"{st.session_state.donnees_base['rendement_mecanique']*100:.1f}", '%'],
-        ['Rendement électrique', f"{st.session_state.donnees_base['rendement_electrique']*100:.1f}", '%'],
-        ['Rendement global', f"{(st.session_state.donnees_base['rendement_mecanique'] * st.session_state.donnees_base['rendement_electrique'])*100:.1f}", '%']
-    ]
-    
-    table_puissances = Table(data_puissances, colWidths=[200, 100, 50])
-    table_puissances.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#6f42c1')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f0e6ff')),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('FONTSIZE', (0, 0), (-1, -1), 9)
-    ]))
-    story.append(table_puissances)
-    story.append(Spacer(1, 10))
-    
-    # Sous-section 3.5: Analyse NPSH
-    story.append(Paragraph("3.5 Analyse NPSH", styles['Heading2']))
-    statut_npsh = "✅ SUFFISANT" if resultats['marge_npsh'] >= 0.5 else "⚠️ FAIBLE" if resultats['marge_npsh'] >= 0 else "❌ INSUFFISANT"
-    
-    data_npsh = [
-        ['Paramètre NPSH', 'Valeur', 'Unité'],
-        ['NPSH requis', f"{st.session_state.donnees_base['npsh_requis']:.2f}", 'm'],
-        ['NPSH disponible', f"{resultats['npsh_disponible']:.2f}", 'm'],
-        ['Marge NPSH', f"{resultats['marge_npsh']:.2f}", 'm'],
-        ['Statut', statut_npsh, '']
-    ]
-    
-    table_npsh = Table(data_npsh, colWidths=[200, 100, 50])
-    table_npsh.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#dc3545')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f8d7da')),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('FONTSIZE', (0, 0), (-1, -1), 9)
-    ]))
-    story.append(table_npsh)
-    story.append(Spacer(1, 10))
-    
-    # Sous-section 3.6: Analyse coup de bélier
-    story.append(Paragraph("3.6 Analyse coup de bélier", styles['Heading2']))
-    risque_belier = "ÉLEVÉ" if resultats['coup_belier']['surpression_max'] > 500000 else "MODÉRÉ" if resultats['coup_belier']['surpression_max'] > 200000 else "FAIBLE"
-    
-    data_belier = [
-        ['Paramètre coup de bélier', 'Valeur', 'Unité'],
-        ['Célérité de l\'onde', f"{resultats['coup_belier']['celerite_onde']:.0f}", 'm/s'],
-        ['Temps de parcours', f"{resultats['coup_belier']['temps_parcours']:.2f}", 's'],
-        ['Surpression maximale', f"{resultats['coup_belier']['surpression_max']/1000:.1f}", 'kPa'],
-        ['Dépression au réservoir', f"{resultats['coup_belier']['depression_reservoir']:.2f}", 'm'],
-        ['Niveau de risque', risque_belier, '']
-    ]
-    
-    table_belier = Table(data_belier, colWidths=[200, 100, 50])
-    table_belier.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#fd7e14')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#ffe5d0')),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('FONTSIZE', (0, 0), (-1, -1), 9)
-    ]))
-    story.append(table_belier)
+    with col1:
+        # Export Excel
+        if st.button("💾 Générer Rapport Excel Détaillé"):
+            output = io.BytesIO()
+            rapport_excel(calculateur.installation(), resultats, output)
+            
+            st.download_button(
+                label="📥 Télécharger le Rapport Excel",
+                data=output.getvalue(),
+                file_name=f"analyse_hydraulique_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
     
-    # Construire le document avec le filigrane
-    doc.build(story, onFirstPage=add_watermark, onLaterPages=add_watermark)
-    buffer.seek(0)
-    return buffer
-# Le reste du code (fonction main()) reste inchangé...
+    with col2:
+        # Export PDF amélioré
+        if st.button("📄 Générer Rapport PDF Complet"):
+            pdf_buffer = exporter_pdf(resultats, calculateur)
+            st.download_button(
+                label="📥 Télécharger le Rapport PDF Complet",
+                data=pdf_buffer.getvalue(),
+                file_name=f"rapport_hydraulique_complet_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
+                mime="application/pdf"
+            )
 
+
+@instrumenter_page(afficher=afficher_instrumentation)
 def main():
     """Fonction principale de l'application"""
+    jalon('initialisation')
     
     st.markdown('<h1 class="main-header">🌊 Note de calcul pompage - By ViveLeau</h1>', 
                 unsafe_allow_html=True)
     
+    # Projet ouvert : appliqué avant la création du calculateur, dont le moteur reprend les tables de la session
+    jalon('projet')
+    ouvrir_projet()
+    
     # Initialisation du calculateur
     calculateur = CalculateurPertesCharge()
+    afficher_enregistrement_projet(calculateur)
     
     # Barre latérale
+    jalon('barre_laterale')
     afficher_sidebar()
     
     # Calculs
+    jalon('calcul')
     try:
         resultats = calculateur.calculer_pertes_totales()
     except Exception as e:
@@ -1212,14 +1230,36 @@ def main():
     col1, col2 = st.columns(2)
     
     with col1:
-        fig_schema = calculateur.dessiner_schema_installation()
-        st.pyplot(fig_schema)
+        jalon('schema')
+        st.image(calculateur.image_schema_installation(resultats, largeur_max=LARGEUR_IMAGE_PAGE))
     
     with col2:
-        fig_courbe = calculateur.dessiner_courbe_reseau_pompes(resultats)
-        st.pyplot(fig_courbe)
+        jalon('courbe_reseau')
+        st.image(calculateur.image_courbe_reseau_pompes(resultats, largeur_max=LARGEUR_IMAGE_PAGE))
+    
+    # Points de fonctionnement pompe / réseau par fréquence du variateur
+    jalon('points_fonctionnement')
+    if st.session_state.courbe_pompe is not None:
+        points = cache_resultats.obtenir(
+            empreinte('points_fonctionnement', calculateur.empreinte_bloc('points_fonctionnement'),
+                      st.session_state.donnees_pompe),
+            lambda: calculateur.moteur.calculer_points_fonctionnement(
+                calculateur.installation(), st.session_state.courbe_pompe, [50, 45, 40, 35, 30, 25]
+            )
+        )
+        st.markdown('<div class="section-header">🎯 Points de Fonctionnement par Fréquence</div>', unsafe_allow_html=True)
+        df_points = pd.DataFrame({
+            'Fréquence (Hz)': points.frequences,
+            'Débit (m³/h)': points.debit_m3h,
+            'HMT (m)': points.hauteur_manometrique,
+            'Rendement pompe (%)': points.rendement * 100,
+            'Puissance hydraulique (kW)': points.puissance_hydraulique,
+            'Puissance électrique (kW)': points.puissance_electrique
+        })
+        st.dataframe(df_points.style.format(precision=2, na_rep='Pas d\'intersection'), use_container_width=True)
     
     # Affichage des propriétés du fluide
+    jalon('metriques')
     st.markdown('<div class="section-header">💧 Propriétés du Fluide</div>', unsafe_allow_html=True)
     
     col1, col2, col3 = st.columns(3)
@@ -1239,6 +1279,8 @@ def main():
         st.metric("Régime d'écoulement", resultats['regime_ecoulement'])
         st.metric("Vitesse écoulement", f"{resultats['vitesse']:.2f} m/s")
     
+    afficher_proprietes_temperature(calculateur)
+    
     # Affichage des résultats principaux
     st.markdown('<div class="section-header">📊 Résultats des Calculs</div>', unsafe_allow_html=True)
     
@@ -1288,7 +1330,11 @@ def main():
         st.metric("Énergie spécifique", f"{resultats['puissances']['puissance_electrique']/st.session_state.donnees_base['debit_m3h']*1000:.2f} Wh/m³")
         st.markdown('</div>', unsafe_allow_html=True)
     
+    jalon('simulation_prolongee')
+    afficher_simulation_prolongee(calculateur)
+    
     # Analyse coup de bélier
+    jalon('coup_belier')
     st.markdown('<div class="section-header">🌊 Analyse Coup de Bélier</div>', unsafe_allow_html=True)
     
     col1, col2, col3, col4 = st.columns(4)
@@ -1313,7 +1359,13 @@ def main():
                    f'<h4 style="margin: 0; color: {couleur_risque}">Risque coup de bélier: {risque}</h4>'
                    f'</div>', unsafe_allow_html=True)
     
+    jalon('transitoires')
+    afficher_fermeture_vanne(calculateur)
+    
+    afficher_arret_pompe(calculateur)
+    
     # Résultats NPSH
+    jalon('npsh')
     st.markdown('<div class="section-header">⚡ Analyse NPSH</div>', unsafe_allow_html=True)
     
     col1, col2, col3 = st.columns(3)
@@ -1346,100 +1398,77 @@ def main():
         st.metric("Hauteur géodésique", f"{st.session_state.donnees_base['hauteur_geodesique_aspiration']:.2f} m")
         st.metric("Pression amont", f"{st.session_state.donnees_base['pression_amont']/1000:.1f} kPa")
     
+    jalon('incertitudes')
+    afficher_incertitudes(calculateur)
+    
     # Détails des pertes singulières
-    if resultats['details_singuliers']:
+    jalon('details')
+    if resultats['totaux_singuliers']:
         st.markdown('<div class="section-header">📋 Détail des Pertes Singulières</div>', unsafe_allow_html=True)
         
-        details_data = []
-        for detail in resultats['details_singuliers']:
-            details_data.append({
-                'Point singulier': detail['nom'],
-                'Coefficient K': f"{detail['coefficient']:.3f}",
-                'Perte de charge (m)': f"{detail['perte']:.4f}"
-            })
-        
-        df_details = pd.DataFrame(details_data)
-        st.dataframe(df_details, use_container_width=True)
+        # Totaux par emplacement, tenus à jour par le registre ; détail point par point construit une fois ouvert
+        st.dataframe(pd.DataFrame([
+            {
+                'Emplacement': libelle_emplacement(emplacement),
+                'Nombre de points': total['nombre'],
+                'ΣK': f"{total['coefficient']:.3f}",
+                'Perte de charge (m)': f"{total['perte']:.4f}"
+            }
+            for emplacement, total in resultats['totaux_singuliers'].items()
+        ]).set_index('Emplacement'), use_container_width=True)
+        
+        detail = st.expander("Détail par point singulier", expanded=len(resultats['details_singuliers']) <= 20,
+                             key='detail_points_singuliers', on_change='rerun')
+        with detail:
+            if detail.open:
+                details_data = []
+                for point in resultats['details_singuliers']:
+                    details_data.append({
+                        'Point singulier': point['nom'],
+                        'Emplacement': libelle_emplacement(point['emplacement']),
+                        'Coefficient K': f"{point['coefficient']:.3f}",
+                        'Perte de charge (m)': f"{point['perte']:.4f}"
+                    })
+                
+                df_details = pd.DataFrame(details_data)
+                st.dataframe(df_details, use_container_width=True)
+    
+    # Détail des pertes par tronçon
+    st.markdown('<div class="section-header">📏 Détail par Tronçon</div>', unsafe_allow_html=True)
+    df_segments = pd.DataFrame(resultats['segments'])
+    df_segments['pertes_totales'] = df_segments['pertes_lineaires'] + df_segments['pertes_singulieres']
+    st.dataframe(df_segments.rename(columns={
+        'longueur': 'Longueur (m)',
+        'diametre': 'Diamètre (m)',
+        'materiau': 'Matériau',
+        'emplacement': 'Emplacement',
+        'vitesse': 'Vitesse (m/s)',
+        'nombre_reynolds': 'Reynolds',
+        'coefficient_friction': 'Coefficient de friction',
+        'pertes_lineaires': 'Pertes linéaires (m)',
+        'pertes_singulieres': 'Pertes singulières (m)',
+        'pertes_totales': 'Pertes totales (m)'
+    }).style.format(precision=4), use_container_width=True)
+    
+    # Optimisation du diamètre et du matériau
+    jalon('optimisation')
+    st.markdown('<div class="section-header">🔧 Optimisation Diamètre / Matériau</div>', unsafe_allow_html=True)
+    
+    afficher_optimisation(calculateur)
+    
+    # Réseau maillé ou ramifié
+    jalon('reseau_maille')
+    st.markdown('<div class="section-header">🕸️ Réseau Maillé</div>', unsafe_allow_html=True)
+    
+    afficher_reseau_maille(calculateur)
     
     # Export des résultats
+    jalon('export')
     st.markdown('<div class="section-header">📤 Export des Résultats</div>', unsafe_allow_html=True)
     
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Export Excel
-        if st.button("💾 Générer Rapport Excel Détaillé"):
-            output = io.BytesIO()
-            
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                # Feuille 1: Résultats principaux
-                data_principale = {
-                    'Paramètre': [
-                        'Diamètre intérieur (m)', 'Matériau', 'Débit (m³/h)', 'Débit (m³/s)', 'Fluide',
-                        'Température (°C)', 'Longueur totale (m)', 'Longueur aspiration (m)', 
-                        'Hauteur de montée (m)', 'Hauteur de descente (m)', 'Vitesse d\'écoulement (m/s)',
-                        'Section (m²)', 'Nombre de Reynolds', 'Coefficient de friction', 'Rugosité absolue (m)',
-                        'Rugosité relative', 'Régime d\'écoulement', 'Pertes linéaires (m)', 'Pertes singulières (m)',
-                        'Pertes totales (m)', 'Pertes aspiration (m)', 'Hauteur manométrique (m)',
-                        'Puissance hydraulique (kW)', 'Puissance mécanique (kW)', 'Puissance électrique (kW)',
-                        'Rendement mécanique', 'Rendement électrique', 'NPSH requis (m)', 'NPSH disponible (m)',
-                        'Marge NPSH (m)', 'Célérité onde (m/s)', 'Temps parcours (s)', 'Surpression max (Pa)',
-                        'Dépression réservoir (m)'
-                    ],
-                    'Valeur': [
-                        f"{resultats['diametre']:.3f}", st.session_state.donnees_base['materiau'],
-                        f"{st.session_state.donnees_base['debit_m3h']:.1f}", f"{resultats['debit_m3s']:.4f}",
-                        st.session_state.donnees_base['fluide'], f"{st.session_state.donnees_base['temperature']:.1f}",
-                        f"{st.session_state.geometrie['longueur_totale']:.1f}", f"{st.session_state.geometrie['longueur_aspiration']:.1f}",
-                        f"{st.session_state.geometrie['hauteur_montee']:.1f}", f"{st.session_state.geometrie['hauteur_descente']:.1f}",
-                        f"{resultats['vitesse']:.2f}", f"{resultats['section']:.6f}", f"{resultats['nombre_reynolds']:.0f}",
-                        f"{resultats['coefficient_friction']:.4f}", f"{resultats['rugosite']:.6f}",
-                        f"{resultats['rugosite_relative']:.6f}", resultats['regime_ecoulement'],
-                        f"{resultats['pertes_lineaires']:.3f}", f"{resultats['pertes_singulieres']:.3f}",
-                        f"{resultats['pertes_totales']:.3f}", f"{resultats['pertes_aspiration']:.3f}",
-                        f"{resultats['hauteur_manometrique']:.3f}", f"{resultats['puissances']['puissance_hydraulique']:.3f}",
-                        f"{resultats['puissances']['puissance_mecanique']:.3f}", f"{resultats['puissances']['puissance_electrique']:.3f}",
-                        f"{st.session_state.donnees_base['rendement_mecanique']:.3f}", f"{st.session_state.donnees_base['rendement_electrique']:.3f}",
-                        f"{st.session_state.donnees_base['npsh_requis']:.2f}", f"{resultats['npsh_disponible']:.3f}",
-                        f"{resultats['marge_npsh']:.3f}", f"{resultats['coup_belier']['celerite_onde']:.0f}",
-                        f"{resultats['coup_belier']['temps_parcours']:.2f}", f"{resultats['coup_belier']['surpression_max']:.0f}",
-                        f"{resultats['coup_belier']['depression_reservoir']:.2f}"
-                    ]
-                }
-                
-                df_principale = pd.DataFrame(data_principale)
-                df_principale.to_excel(writer, sheet_name='Résultats Principaux', index=False)
-                
-                # Feuille 2: Points singuliers
-                if resultats['details_singuliers']:
-                    data_singuliers = []
-                    for detail in resultats['details_singuliers']:
-                        data_singuliers.append({
-                            'Point singulier': detail['nom'],
-                            'Coefficient K': f"{detail['coefficient']:.3f}",
-                            'Perte de charge (m)': f"{detail['perte']:.4f}"
-                        })
-                    
-                    df_singuliers = pd.DataFrame(data_singuliers)
-                    df_singuliers.to_excel(writer, sheet_name='Points Singuliers', index=False)
-            
-            st.download_button(
-                label="📥 Télécharger le Rapport Excel",
-                data=output.getvalue(),
-                file_name=f"analyse_hydraulique_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
-                mime="application/vnd.ms-excel"
-            )
+    afficher_export(calculateur, resultats)
     
-    with col2:
-        # Export PDF amélioré
-        if st.button("📄 Générer Rapport PDF Complet"):
-            pdf_buffer = exporter_pdf(resultats, calculateur)
-            st.download_button(
-                label="📥 Télécharger le Rapport PDF Complet",
-                data=pdf_buffer.getvalue(),
-                file_name=f"rapport_hydraulique_complet_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
-                mime="application/pdf"
-            )
+    afficher_rapports_lot(calculateur)
             
           
 if __name__ == "__main__":
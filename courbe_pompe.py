@@ -0,0 +1,131 @@
+"""Courbe de pompe compilée.
+
+La courbe à 50 Hz importée (CSV) est analysée une seule fois : les colonnes sont
+identifiées, les données converties en tableaux de flottants triés par débit, et
+des polynômes sont ajustés sur la hauteur, le rendement et la puissance. Les
+valeurs à toute fréquence s'obtiennent ensuite par les lois de similitude, en
+appels vectorisés sur des tableaux de débits et de fréquences :
+
+    H(Q, f) = r²·H50(Q/r)    η(Q, f) = η50(Q/r)    P(Q, f) = r³·P50(Q/r)    avec r = f/50
+"""
+
+import re
+import unicodedata
+
+import numpy as np
+
+
+FREQUENCE_NOMINALE = 50.0
+
+# Mots-clés reconnus dans les en-têtes, par grandeur ; les mots d'une lettre ne sont
+# reconnus que s'ils forment un mot entier de l'en-tête ("Q (m3/h)", "H [m]")
+MOTS_CLES_COLONNES = {
+    'rendement': ('rendement', 'efficacite', 'efficiency', 'eta', 'η'),
+    'puissance': ('puissance', 'power', 'kw', 'p'),
+    'debit': ('debit', 'flow', 'q', 'm3/h'),
+    'hmt': ('hmt', 'hauteur', 'head', 'pression', 'h')  # Une pression est supposée exprimée en m de colonne
+}
+
+
+def _normaliser(texte):
+    """Met un en-tête en minuscules sans accents"""
+    texte = unicodedata.normalize('NFKD', str(texte).strip().lower())
+    return ''.join(caractere for caractere in texte if not unicodedata.combining(caractere))
+
+
+def identifier_colonnes(colonnes):
+    """Associe chaque grandeur (debit, hmt, rendement, puissance) à une colonne, ou None"""
+    resolues = {grandeur: None for grandeur in MOTS_CLES_COLONNES}
+    for colonne in colonnes:
+        nom = _normaliser(colonne)
+        mots = set(re.split(r'[^\w/η]+', nom))
+        for grandeur, mots_cles in MOTS_CLES_COLONNES.items():
+            if resolues[grandeur] is not None:
+                continue
+            if any(mot_cle in mots if len(mot_cle) == 1 else mot_cle in nom for mot_cle in mots_cles):
+                resolues[grandeur] = colonne
+                break
+    return resolues
+
+
+class CourbePompe:
+    """Courbe caractéristique d'une pompe à 50 Hz, évaluable à toute fréquence"""
+
+    def __init__(self, debits, hauteurs, rendements=None, puissances=None, degre=3):
+        debits = np.asarray(debits, dtype=float)
+        ordre = np.argsort(debits, kind='stable')
+        self.debits = debits[ordre]
+        self.hauteurs = np.asarray(hauteurs, dtype=float)[ordre]
+        if self.debits.size < 2:
+            raise ValueError("La courbe de pompe doit comporter au moins deux points")
+
+        self.rendements = None
+        if rendements is not None:
+            self.rendements = np.asarray(rendements, dtype=float)[ordre]
+            if np.nanmax(self.rendements) > 1.5:
+                self.rendements = self.rendements / 100.0  # Rendement fourni en %
+        self.puissances = None if puissances is None else np.asarray(puissances, dtype=float)[ordre]
+
+        # Ajustements polynomiaux (moindres carrés) de degré limité par le nombre de points
+        degre = min(degre, self.debits.size - 1)
+        self._hauteur = np.polynomial.Polynomial.fit(self.debits, self.hauteurs, degre)
+        self._pente_hauteur = self._hauteur.deriv()
+        self._rendement = None if self.rendements is None else \
+            np.polynomial.Polynomial.fit(self.debits, self.rendements, degre)
+        self._puissance = None if self.puissances is None else \
+            np.polynomial.Polynomial.fit(self.debits, self.puissances, degre)
+
+    @classmethod
+    def depuis_dataframe(cls, donnees_pompe, degre=3):
+        """Construit la courbe à partir du tableau importé (colonnes Débit, HMT, Puissance, Rendement)"""
+        colonnes = identifier_colonnes(donnees_pompe.columns)
+        if colonnes['debit'] is None or colonnes['hmt'] is None:
+            raise ValueError("Colonnes de débit et de HMT introuvables dans la courbe de pompe")
+
+        def colonne(grandeur):
+            if colonnes[grandeur] is None:
+                return None
+            return donnees_pompe[colonnes[grandeur]].to_numpy(dtype=float)
+
+        return cls(colonne('debit'), colonne('hmt'), colonne('rendement'), colonne('puissance'), degre=degre)
+
+    @property
+    def a_rendement(self):
+        return self._rendement is not None
+
+    @property
+    def a_puissance(self):
+        return self._puissance is not None
+
+    def debit_max(self, frequence=FREQUENCE_NOMINALE):
+        """Débit maximal de la courbe mesurée à la fréquence donnée"""
+        return self.debits[-1] * (np.asarray(frequence, dtype=float) / FREQUENCE_NOMINALE)
+
+    def points(self, frequence=FREQUENCE_NOMINALE):
+        """Points mesurés transposés à la fréquence donnée : (débits, hauteurs)"""
+        ratio = frequence / FREQUENCE_NOMINALE
+        return self.debits * ratio, self.hauteurs * ratio**2
+
+    def hauteur(self, debits, frequence=FREQUENCE_NOMINALE):
+        """HMT (m) aux débits (m³/h) et fréquences (Hz) donnés"""
+        ratio = np.asarray(frequence, dtype=float) / FREQUENCE_NOMINALE
+        return ratio**2 * self._hauteur(np.asarray(debits, dtype=float) / ratio)
+
+    def pente_hauteur(self, debits, frequence=FREQUENCE_NOMINALE):
+        """Dérivée dH/dQ (m par m³/h) aux débits et fréquences donnés"""
+        ratio = np.asarray(frequence, dtype=float) / FREQUENCE_NOMINALE
+        return ratio * self._pente_hauteur(np.asarray(debits, dtype=float) / ratio)
+
+    def rendement(self, debits, frequence=FREQUENCE_NOMINALE):
+        """Rendement de la pompe (fraction) aux débits et fréquences donnés"""
+        if self._rendement is None:
+            raise ValueError("La courbe de pompe ne comporte pas de rendement")
+        ratio = np.asarray(frequence, dtype=float) / FREQUENCE_NOMINALE
+        return self._rendement(np.asarray(debits, dtype=float) / ratio)
+
+    def puissance(self, debits, frequence=FREQUENCE_NOMINALE):
+        """Puissance absorbée (kW) aux débits et fréquences donnés"""
+        if self._puissance is None:
+            raise ValueError("La courbe de pompe ne comporte pas de puissance")
+        ratio = np.asarray(frequence, dtype=float) / FREQUENCE_NOMINALE
+        return ratio**3 * self._puissance(np.asarray(debits, dtype=float) / ratio)
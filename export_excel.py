@@ -0,0 +1,241 @@
+"""Export Excel en flux, à mémoire constante.
+
+Les classeurs sont écrits avec openpyxl en mode écriture seule : chaque ligne est
+sérialisée dès son ajout dans un fichier temporaire, si bien que la mémoire ne dépend
+pas du nombre de lignes. Les valeurs sont écrites comme des nombres, avec un format
+d'affichage par colonne, et non comme des chaînes préformatées : le classeur reste
+exploitable (tris, filtres, formules).
+
+Exemple :
+    with ClasseurFlux('resultats.xlsx') as classeur:
+        classeur.ecrire_feuille('Résultats', colonnes, enregistrements)
+"""
+
+import math
+from itertools import chain, islice
+
+
+FORMAT_DEFAUT = '0.000'
+
+# Format d'affichage des colonnes de résultats (noms de aplatir_resultats)
+FORMATS_RESULTATS = {
+    'ligne': '0',
+    'diametre': '0.000',
+    'section': '0.000000',
+    'vitesse': '0.00',
+    'nombre_reynolds': '0',
+    'rugosite': '0.000000',
+    'rugosite_relative': '0.000000',
+    'coefficient_friction': '0.0000',
+    'masse_volumique': '0.0',
+    'viscosite_cinematique': '0.00E+00',
+    'pression_vapeur': '0',
+    'module_elasticite': '0.00E+00',
+    'debit_m3s': '0.0000',
+    'celerite_onde': '0',
+    'temps_parcours': '0.00',
+    'pente_bergeron': '0',
+    'surpression_max': '0',
+    'depression_reservoir': '0.00',
+    'regime_ecoulement': 'General',
+    'erreur': 'General',
+}
+
+
+def _valeur_cellule(valeur):
+    """Valeur écrite dans une cellule (Excel ne connaît ni NaN ni l'infini)"""
+    if isinstance(valeur, float) and not math.isfinite(valeur):
+        return None
+    return valeur
+
+
+class FeuilleFlux:
+    """Feuille d'un ClasseurFlux, écrite ligne par ligne
+
+    Une cellule mise en forme est préparée une fois par colonne et réutilisée à chaque
+    ligne : openpyxl sérialise la ligne dès l'ajout, seule la valeur change.
+    """
+
+    def __init__(self, feuille, colonnes, formats=None, largeurs=None):
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font
+        from openpyxl.utils import get_column_letter
+
+        formats = formats or {}
+        largeurs = largeurs or {}
+        self.feuille = feuille
+        self.colonnes = list(colonnes)
+        for indice, colonne in enumerate(self.colonnes, start=1):
+            feuille.column_dimensions[get_column_letter(indice)].width = largeurs.get(colonne, max(12, len(colonne) + 2))
+        feuille.freeze_panes = 'A2'
+
+        entete = []
+        for colonne in self.colonnes:
+            cellule = WriteOnlyCell(feuille, colonne)
+            cellule.font = Font(bold=True)
+            entete.append(cellule)
+        feuille.append(entete)
+
+        self.cellule = WriteOnlyCell
+        self.cellules = []
+        for colonne in self.colonnes:
+            cellule = WriteOnlyCell(feuille)
+            cellule.number_format = formats.get(colonne, FORMAT_DEFAUT)
+            self.cellules.append(cellule)
+        self.nombre_lignes = 0
+
+    def ecrire(self, enregistrement, formats=None):
+        """Écrit une ligne : dictionnaire indexé par colonne ou séquence dans l'ordre des colonnes
+
+        formats remplace, pour cette ligne seulement, le format de certaines colonnes.
+        """
+        if isinstance(enregistrement, dict):
+            enregistrement = [enregistrement.get(colonne) for colonne in self.colonnes]
+        for cellule, valeur in zip(self.cellules, enregistrement):
+            cellule.value = _valeur_cellule(valeur)
+        if formats:
+            cellules = []
+            for colonne, cellule in zip(self.colonnes, self.cellules):
+                if colonne in formats:
+                    cellule = self.cellule(self.feuille, cellule.value)
+                    cellule.number_format = formats[colonne]
+                cellules.append(cellule)
+            self.feuille.append(cellules)
+        else:
+            self.feuille.append(self.cellules)
+        self.nombre_lignes += 1
+
+    def ecrire_lignes(self, enregistrements):
+        """Écrit toutes les lignes d'un itérable, consommé au fil de l'eau"""
+        for enregistrement in enregistrements:
+            self.ecrire(enregistrement)
+
+
+class ClasseurFlux:
+    """Classeur Excel en écriture seule, vers un chemin ou un flux binaire"""
+
+    def __init__(self, destination):
+        from openpyxl import Workbook
+
+        self.destination = destination
+        self.classeur = Workbook(write_only=True)
+
+    def feuille(self, titre, colonnes, formats=None, largeurs=None):
+        """Ajoute une feuille et retourne son FeuilleFlux (titre tronqué à 31 caractères)"""
+        return FeuilleFlux(self.classeur.create_sheet(titre[:31]), colonnes, formats, largeurs)
+
+    def ecrire_feuille(self, titre, colonnes, enregistrements, formats=None, largeurs=None):
+        """Ajoute une feuille et y écrit les enregistrements ; retourne le nombre de lignes"""
+        feuille = self.feuille(titre, colonnes, formats, largeurs)
+        feuille.ecrire_lignes(enregistrements)
+        return feuille.nombre_lignes
+
+    def fermer(self):
+        """Enregistre le classeur (une feuille vide est ajoutée s'il n'en a aucune)"""
+        if not self.classeur.worksheets:
+            self.classeur.create_sheet('Feuille1')
+        self.classeur.save(self.destination)
+
+    def abandonner(self):
+        """Abandonne le classeur sans l'enregistrer (feuilles fermées, rien n'est écrit à destination)"""
+        for feuille in self.classeur.worksheets:
+            feuille.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type_exception, exception, trace):
+        # En cas d'erreur, rien n'est enregistré : un export incomplet ne doit pas passer pour terminé
+        if type_exception is None:
+            self.fermer()
+        else:
+            self.abandonner()
+
+
+def exporter_resultats(enregistrements, destination, colonnes=None, titre='Résultats'):
+    """Écrit une suite de résultats dans un classeur, sans la charger en mémoire
+
+    Les enregistrements sont des ResultatsCalcul (aplatis comme dans lot_scenarios) ou
+    des dictionnaires ; sans colonnes explicites, celles du premier enregistrement sont
+    reprises. Retourne le nombre de lignes écrites.
+    """
+    from lot_scenarios import aplatir_resultats
+
+    lignes = (
+        enregistrement if isinstance(enregistrement, dict) else aplatir_resultats(enregistrement)
+        for enregistrement in enregistrements
+    )
+    if colonnes is None:
+        premiere = list(islice(lignes, 1))
+        colonnes = list(premiere[0]) if premiere else []
+        lignes = chain(premiere, lignes)
+
+    with ClasseurFlux(destination) as classeur:
+        return classeur.ecrire_feuille(titre, colonnes, lignes, formats=FORMATS_RESULTATS)
+
+
+def rapport_excel(installation, resultats, destination):
+    """Rapport Excel détaillé d'un calcul (dictionnaire de ResultatsCalcul.en_dict())"""
+    from moteur_hydraulique import libelle_emplacement
+
+    donnees = installation.donnees_base
+    geometrie = installation.geometrie
+    puissances = resultats['puissances']
+    coup_belier = resultats['coup_belier']
+
+    parametres = [
+        ('Diamètre intérieur (m)', resultats['diametre'], '0.000'),
+        ('Matériau', donnees.materiau, None),
+        ('Débit (m³/h)', donnees.debit_m3h, '0.0'),
+        ('Débit (m³/s)', resultats['debit_m3s'], '0.0000'),
+        ('Fluide', donnees.fluide, None),
+        ('Température (°C)', donnees.temperature, '0.0'),
+        ('Longueur totale (m)', geometrie.longueur_totale, '0.0'),
+        ('Longueur aspiration (m)', geometrie.longueur_aspiration, '0.0'),
+        ('Hauteur de montée (m)', geometrie.hauteur_montee, '0.0'),
+        ('Hauteur de descente (m)', geometrie.hauteur_descente, '0.0'),
+        ('Vitesse d\'écoulement (m/s)', resultats['vitesse'], '0.00'),
+        ('Section (m²)', resultats['section'], '0.000000'),
+        ('Nombre de Reynolds', resultats['nombre_reynolds'], '0'),
+        ('Coefficient de friction', resultats['coefficient_friction'], '0.0000'),
+        ('Rugosité absolue (m)', resultats['rugosite'], '0.000000'),
+        ('Rugosité relative', resultats['rugosite_relative'], '0.000000'),
+        ('Régime d\'écoulement', resultats['regime_ecoulement'], None),
+        ('Pertes linéaires (m)', resultats['pertes_lineaires'], '0.000'),
+        ('Pertes singulières (m)', resultats['pertes_singulieres'], '0.000'),
+        ('Pertes totales (m)', resultats['pertes_totales'], '0.000'),
+        ('Pertes aspiration (m)', resultats['pertes_aspiration'], '0.000'),
+        ('Hauteur manométrique (m)', resultats['hauteur_manometrique'], '0.000'),
+        ('Puissance hydraulique (kW)', puissances['puissance_hydraulique'], '0.000'),
+        ('Puissance mécanique (kW)', puissances['puissance_mecanique'], '0.000'),
+        ('Puissance électrique (kW)', puissances['puissance_electrique'], '0.000'),
+        ('Rendement mécanique', donnees.rendement_mecanique, '0.000'),
+        ('Rendement électrique', donnees.rendement_electrique, '0.000'),
+        ('NPSH requis (m)', donnees.npsh_requis, '0.00'),
+        ('NPSH disponible (m)', resultats['npsh_disponible'], '0.000'),
+        ('Marge NPSH (m)', resultats['marge_npsh'], '0.000'),
+        ('Célérité onde (m/s)', coup_belier['celerite_onde'], '0'),
+        ('Temps parcours (s)', coup_belier['temps_parcours'], '0.00'),
+        ('Surpression max (Pa)', coup_belier['surpression_max'], '0'),
+        ('Dépression réservoir (m)', coup_belier['depression_reservoir'], '0.00'),
+    ]
+
+    with ClasseurFlux(destination) as classeur:
+        # Feuille 1: Résultats principaux, un format par ligne
+        feuille = classeur.feuille(
+            'Résultats Principaux', ['Paramètre', 'Valeur'], formats={'Paramètre': 'General'}, largeurs={'Paramètre': 32}
+        )
+        for parametre, valeur, format_valeur in parametres:
+            feuille.ecrire((parametre, valeur), formats={'Valeur': format_valeur or 'General'})
+
+        # Feuille 2: Points singuliers
+        if resultats['details_singuliers']:
+            classeur.ecrire_feuille(
+                'Points Singuliers',
+                ['Point singulier', 'Emplacement', 'Coefficient K', 'Perte de charge (m)'],
+                ((detail['nom'], libelle_emplacement(detail['emplacement']), detail['coefficient'], detail['perte'])
+                 for detail in resultats['details_singuliers']),
+                formats={'Point singulier': 'General', 'Emplacement': 'General', 'Coefficient K': '0.000',
+                         'Perte de charge (m)': '0.0000'},
+                largeurs={'Point singulier': 28}
+            )
@@ -0,0 +1,330 @@
+"""Analyse d'incertitude par Monte-Carlo sur la marge NPSH, la HMT et la puissance.
+
+La rugosité des matériaux, le débit réel, la température du fluide et le NPSH requis
+de la pompe sont tirés selon des lois autour de leurs valeurs nominales, puis la
+chaîne pertes de charge / NPSH / puissance est évaluée en tableaux : un axe pour
+les échantillons, un axe pour les tronçons. Les échantillons sont tirés par blocs
+(taille_bloc) dont les résultats sont aussitôt réduits à des histogrammes fins et à
+des moments : la mémoire est bornée quel que soit le nombre d'échantillons, et les
+blocs peuvent être répartis sur un pool de processus. Chaque bloc a sa propre
+graine, dérivée de la graine de l'analyse : les résultats ne dépendent pas du
+nombre de processus.
+"""
+
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+
+from moteur_hydraulique import MoteurHydraulique
+
+
+# Grandeurs suivies, dans l'ordre des colonnes calculées par bloc
+GRANDEURS = ('marge_npsh', 'npsh_disponible', 'hauteur_manometrique', 'puissance_electrique')
+
+# Classes des histogrammes fins (centiles) ; les histogrammes affichés les regroupent
+CLASSES_FINES = 4096
+
+# Moteur propre à chaque processus de calcul
+_moteur = None
+
+
+@dataclass
+class Loi:
+    """Loi d'une entrée incertaine autour de sa valeur nominale
+
+    'normale' : écart-type ecart ; 'uniforme' et 'triangulaire' (mode nominal) : bornes
+    ± ecart ; 'lognormale' : facteur exp(ecart·z), de médiane la valeur nominale. ecart
+    est relatif à la valeur nominale sauf si absolu (la loi lognormale est toujours
+    relative).
+    """
+    nature: str = 'normale'
+    ecart: float = 0.0
+    absolu: bool = False
+
+    def tirer(self, generateur, nominal, taille):
+        """Tire taille valeurs (taille : entier ou forme de tableau)"""
+        import numpy as np
+
+        if self.ecart == 0:
+            return np.full(taille, float(nominal))
+        if self.nature == 'lognormale':
+            return nominal * np.exp(self.ecart * generateur.standard_normal(taille))
+        ecart = self.ecart if self.absolu else self.ecart * abs(nominal)
+        if self.nature == 'normale':
+            return nominal + ecart * generateur.standard_normal(taille)
+        if self.nature == 'uniforme':
+            return generateur.uniform(nominal - ecart, nominal + ecart, taille)
+        if self.nature == 'triangulaire':
+            return generateur.triangular(nominal - ecart, nominal, nominal + ecart, taille)
+        raise ValueError(f"Loi inconnue : {self.nature}")
+
+
+@dataclass
+class Incertitudes:
+    """Lois des entrées incertaines
+
+    La rugosité est un facteur multiplicatif tiré indépendamment pour chaque matériau ;
+    la température est en écart absolu (°C). Les débits et NPSH requis tirés négatifs
+    sont ramenés à zéro.
+    """
+    rugosite: Loi = field(default_factory=lambda: Loi('lognormale', 0.3))
+    debit: Loi = field(default_factory=lambda: Loi('normale', 0.05))
+    temperature: Loi = field(default_factory=lambda: Loi('normale', 5.0, absolu=True))
+    npsh_requis: Loi = field(default_factory=lambda: Loi('normale', 0.1))
+
+
+@dataclass
+class Distribution:
+    """Distribution d'une grandeur : moments exacts et histogramme fin sur bornes fixes
+
+    Les valeurs hors des bornes sont comptées dans la première ou la dernière classe ;
+    les centiles sont interpolés dans l'histogramme (résolution : largeur d'une classe)
+    et bornés par le minimum et le maximum observés.
+    """
+    bornes: 'np.ndarray'
+    effectifs: 'np.ndarray'
+    nombre: int = 0
+    somme: float = 0.0
+    somme_carres: float = 0.0
+    minimum: float = math.inf
+    maximum: float = -math.inf
+
+    @classmethod
+    def vide(cls, minimum, maximum, classes=CLASSES_FINES):
+        import numpy as np
+
+        if not maximum > minimum:
+            minimum, maximum = minimum - 0.5, maximum + 0.5
+        return cls(np.linspace(minimum, maximum, classes + 1), np.zeros(classes, dtype=np.int64))
+
+    def ajouter(self, valeurs):
+        """Ajoute des échantillons (les NaN sont ignorés)"""
+        import numpy as np
+
+        valeurs = valeurs[np.isfinite(valeurs)]
+        if valeurs.size == 0:
+            return
+        indices = np.clip(np.searchsorted(self.bornes, valeurs, side='right') - 1, 0, self.effectifs.size - 1)
+        self.effectifs += np.bincount(indices, minlength=self.effectifs.size)
+        self.nombre += valeurs.size
+        self.somme += float(valeurs.sum())
+        self.somme_carres += float(np.dot(valeurs, valeurs))
+        self.minimum = min(self.minimum, float(valeurs.min()))
+        self.maximum = max(self.maximum, float(valeurs.max()))
+
+    def fusionner(self, autre):
+        """Ajoute la distribution d'un autre bloc (mêmes bornes)"""
+        self.effectifs += autre.effectifs
+        self.nombre += autre.nombre
+        self.somme += autre.somme
+        self.somme_carres += autre.somme_carres
+        self.minimum = min(self.minimum, autre.minimum)
+        self.maximum = max(self.maximum, autre.maximum)
+
+    @property
+    def moyenne(self):
+        return self.somme / self.nombre if self.nombre else float('nan')
+
+    @property
+    def ecart_type(self):
+        if self.nombre < 2:
+            return float('nan')
+        variance = (self.somme_carres - self.somme**2 / self.nombre) / (self.nombre - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def centile(self, pourcentage):
+        """Centile (pourcentage entre 0 et 100) interpolé dans l'histogramme"""
+        import numpy as np
+
+        if self.nombre == 0:
+            return float('nan')
+        cumul = np.concatenate(([0], np.cumsum(self.effectifs))) / self.nombre
+        valeur = float(np.interp(pourcentage / 100.0, cumul, self.bornes))
+        return min(max(valeur, self.minimum), self.maximum)
+
+    def histogramme(self, classes=64):
+        """Histogramme regroupé sur l'étendue observée : (bornes, effectifs), classes classes au plus"""
+        import numpy as np
+
+        occupees = np.flatnonzero(self.effectifs)
+        if occupees.size == 0:
+            return self.bornes[:1], self.effectifs[:0]
+        debut, fin = occupees[0], occupees[-1] + 1
+        regroupement = math.ceil((fin - debut) / classes)
+        nombre = math.ceil((fin - debut) / regroupement)
+        effectifs = np.zeros(nombre * regroupement, dtype=self.effectifs.dtype)
+        effectifs[:fin - debut] = self.effectifs[debut:fin]
+        largeur = (self.bornes[1] - self.bornes[0]) * regroupement
+        return self.bornes[debut] + largeur * np.arange(nombre + 1), effectifs.reshape(nombre, regroupement).sum(axis=1)
+
+
+@dataclass
+class ResultatsIncertitudes:
+    """Distributions des grandeurs et probabilité de cavitation"""
+    distributions: dict  # grandeur -> Distribution
+    nombre_echantillons: int
+    nombre_cavitation: int  # échantillons de marge NPSH négative
+    nominal: dict  # grandeur -> valeur du calcul déterministe
+
+    @property
+    def probabilite_cavitation(self):
+        """P(marge NPSH < 0)"""
+        return self.nombre_cavitation / self.nombre_echantillons if self.nombre_echantillons else float('nan')
+
+    @property
+    def erreur_probabilite(self):
+        """Erreur type de l'estimation de P(marge NPSH < 0)"""
+        p = self.probabilite_cavitation
+        return math.sqrt(p * (1.0 - p) / self.nombre_echantillons) if self.nombre_echantillons else float('nan')
+
+    def centiles(self, pourcentages=(1, 5, 50, 95, 99)):
+        """Tableau {grandeur: {pourcentage: valeur}}"""
+        return {
+            nom: {pourcentage: distribution.centile(pourcentage) for pourcentage in pourcentages}
+            for nom, distribution in self.distributions.items()
+        }
+
+
+def echantillonner_bloc(moteur, installation, incertitudes, tableau, generateur, taille, g=9.81):
+    """Tire un bloc d'échantillons et évalue la chaîne ; retourne (grandeurs,) tableaux de taille taille"""
+    import numpy as np
+
+    donnees = installation.donnees_base
+    geometrie = installation.geometrie
+    D = tableau.diametre
+
+    # Entrées incertaines, un tirage par échantillon (et par matériau pour la rugosité)
+    materiaux = sorted({segment.materiau for segment in tableau.segments})
+    indice_materiau = np.array([materiaux.index(segment.materiau) for segment in tableau.segments])
+    facteur_rugosite = incertitudes.rugosite.tirer(generateur, 1.0, (taille, len(materiaux)))[:, indice_materiau]
+    debit_m3h = np.maximum(incertitudes.debit.tirer(generateur, donnees.debit_m3h, taille), 0.0)
+    temperature = incertitudes.temperature.tirer(generateur, donnees.temperature, taille)
+    npsh_requis = np.maximum(incertitudes.npsh_requis.tirer(generateur, donnees.npsh_requis, taille), 0.0)
+
+    # Propriétés du fluide : un appel vectorisé sur toutes les températures
+    proprietes = moteur.calculer_proprietes_fluide(donnees.fluide, temperature)
+
+    # Pertes par échantillon (premier axe) et par tronçon (dernier axe)
+    vitesse = debit_m3h[:, None] / (3600.0 * math.pi / 4.0 * D**2)
+    nombre_reynolds = vitesse * (D / proprietes.viscosite_cinematique[:, None])
+    f = moteur.calculer_coefficient_friction_lot(nombre_reynolds, tableau.rugosite * facteur_rugosite / D)
+    hauteur_cinetique = vitesse**2 / (2.0 * g)
+    pertes_troncons = (f * (tableau.longueur / D) + tableau.coefficient_singulier) * hauteur_cinetique
+    pertes_aspiration = pertes_troncons[:, tableau.aspiration].sum(axis=1)
+    hauteur_manometrique = geometrie.hauteur_montee - geometrie.hauteur_descente + pertes_troncons.sum(axis=1)
+
+    # NPSH et puissance, mêmes formules que calculer_pertes_totales
+    npsh_disponible = np.maximum(
+        (donnees.pression_amont - proprietes.pression_vapeur) / (proprietes.masse_volumique * g)
+        + donnees.hauteur_geodesique_aspiration - pertes_aspiration,
+        0.0
+    )
+    puissance_electrique = (
+        proprietes.masse_volumique * g * (debit_m3h / 3600.0) * hauteur_manometrique / 1000.0
+        / donnees.rendement_mecanique / donnees.rendement_electrique
+    )
+    return npsh_disponible - npsh_requis, npsh_disponible, hauteur_manometrique, puissance_electrique
+
+
+def _initialiser_processus(materiaux, fluides, coefficients_singuliers):
+    """Crée le moteur de calcul une fois par processus"""
+    global _moteur
+    _moteur = MoteurHydraulique(materiaux, fluides, coefficients_singuliers)
+
+
+def calculer_bloc(installation, incertitudes, graine, taille, bornes, g=9.81, moteur=None):
+    """Calcule un bloc et le réduit : retourne (distributions, nombre de marges négatives)"""
+    import numpy as np
+
+    moteur = moteur or _moteur or MoteurHydraulique()
+    valeurs = echantillonner_bloc(
+        moteur, installation, incertitudes, moteur.compiler_segments(installation),
+        np.random.default_rng(graine), taille, g
+    )
+    distributions = {}
+    for nom, echantillons, (minimum, maximum) in zip(GRANDEURS, valeurs, bornes):
+        distributions[nom] = Distribution.vide(minimum, maximum)
+        distributions[nom].ajouter(echantillons)
+    return distributions, int(np.count_nonzero(valeurs[0] < 0))
+
+
+def analyser_incertitudes(moteur, installation, incertitudes=None, nombre_echantillons=100000,
+                          taille_bloc=20000, processus=None, graine=0, g=9.81):
+    """Propage les incertitudes des entrées sur la marge NPSH, la HMT et la puissance
+
+    Le premier bloc, calculé sur place, fixe les bornes des histogrammes (étendue
+    observée élargie de moitié de part et d'autre) ; les blocs suivants sont calculés
+    sur place ou, si processus > 1, répartis sur un pool avec un nombre de blocs en vol
+    borné. Les processus sont lancés par forkserver (spawn à défaut) et non par fork :
+    l'appelant peut être le serveur Streamlit, dont les threads et verrous ne doivent
+    pas être dupliqués.
+    """
+    import numpy as np
+
+    incertitudes = incertitudes or Incertitudes()
+    nombre_blocs = max(1, math.ceil(nombre_echantillons / taille_bloc))
+    tailles = [min(taille_bloc, nombre_echantillons - i * taille_bloc) for i in range(nombre_blocs)]
+    graines = np.random.SeedSequence(graine).spawn(nombre_blocs)
+
+    # Premier bloc : bornes des histogrammes
+    premier = echantillonner_bloc(
+        moteur, installation, incertitudes, moteur.compiler_segments(installation),
+        np.random.default_rng(graines[0]), tailles[0], g
+    )
+    bornes = []
+    for echantillons in premier:
+        finis = echantillons[np.isfinite(echantillons)]
+        minimum, maximum = (float(finis.min()), float(finis.max())) if finis.size else (0.0, 1.0)
+        etendue = maximum - minimum
+        bornes.append((minimum - 0.5 * etendue, maximum + 0.5 * etendue))
+
+    distributions = {nom: Distribution.vide(*bornes_grandeur) for nom, bornes_grandeur in zip(GRANDEURS, bornes)}
+    for nom, echantillons in zip(GRANDEURS, premier):
+        distributions[nom].ajouter(echantillons)
+    nombre_cavitation = int(np.count_nonzero(premier[0] < 0))
+    del premier
+
+    def enregistrer(bloc):
+        nonlocal nombre_cavitation
+        distributions_bloc, cavitation = bloc
+        for nom, distribution in distributions_bloc.items():
+            distributions[nom].fusionner(distribution)
+        nombre_cavitation += cavitation
+
+    blocs = list(zip(graines[1:], tailles[1:]))
+    if processus and processus > 1 and blocs:
+        with ProcessPoolExecutor(
+            max_workers=processus,
+            mp_context=multiprocessing.get_context(
+                'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            ),
+            initializer=_initialiser_processus,
+            initargs=(moteur.materiaux, moteur.fluides, moteur.coefficients_singuliers)
+        ) as pool:
+            en_cours = set()
+            for graine_bloc, taille in blocs:
+                if len(en_cours) >= 2 * processus:
+                    termines, en_cours = wait(en_cours, return_when=FIRST_COMPLETED)
+                    for futur in termines:
+                        enregistrer(futur.result())
+                en_cours.add(pool.submit(calculer_bloc, installation, incertitudes, graine_bloc, taille, bornes, g))
+            for futur in wait(en_cours).done:
+                enregistrer(futur.result())
+    else:
+        for graine_bloc, taille in blocs:
+            enregistrer(calculer_bloc(installation, incertitudes, graine_bloc, taille, bornes, g, moteur))
+
+    resultats = moteur.calculer_pertes_totales(installation, g=g)
+    return ResultatsIncertitudes(
+        distributions=distributions,
+        nombre_echantillons=nombre_echantillons,
+        nombre_cavitation=nombre_cavitation,
+        nominal={
+            'marge_npsh': resultats.marge_npsh,
+            'npsh_disponible': resultats.npsh_disponible,
+            'hauteur_manometrique': resultats.hauteur_manometrique,
+            'puissance_electrique': resultats.puissances.puissance_electrique
+        }
+    )
+
@@ -0,0 +1,286 @@
+"""Instrumentation des temps d'exécution de la page, étape par étape.
+
+Un Chronometre est créé à chaque exécution de la page (rerun Streamlit) par
+instrumenter_page ; les étapes de main() sont délimitées par des jalons, les méthodes
+instrumentées (instrumenter_methodes) et les compteurs suivis (itérations de
+Colebrook du moteur...) s'y ajoutent ; un fragment réexécuté seul
+(instrumenter_fragment) a son propre chronomètre. Le chronomètre courant est porté
+par une ContextVar : chaque session Streamlit, exécutée dans son propre fil, a le sien.
+
+Chaque exécution est ajoutée au journal en une ligne JSON. Le journal est le fichier
+désigné par la variable d'environnement NDC_JOURNAL_PERFORMANCES (par défaut
+journal_performances.jsonl ; une valeur vide désactive la journalisation). Au-delà de
+NDC_JOURNAL_TAILLE_MAX octets (10 Mio par défaut, 0 : sans limite), le journal est
+renommé en <journal>.1, qui remplace la génération précédente : deux fichiers au plus.
+
+Exemple (médiane et p95 par étape sur les dernières exécutions) :
+    python instrumentation.py journal_performances.jsonl --dernieres 1000
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+
+
+JOURNAL = os.environ.get('NDC_JOURNAL_PERFORMANCES', 'journal_performances.jsonl')
+TAILLE_MAX_JOURNAL = int(os.environ.get('NDC_JOURNAL_TAILLE_MAX', 10 * 1024 * 1024))
+
+_chronometre_courant = ContextVar('chronometre_courant', default=None)
+_verrou_journal = threading.Lock()
+
+
+class Chronometre:
+    """Durées (ms) et nombres d'appels par étape, et compteurs d'une exécution"""
+
+    def __init__(self):
+        self.debut = time.perf_counter()
+        self.etapes = {}
+        self.compteurs = {}
+        self.suivis = []
+        self.etape_courante = None
+        self.debut_etape = None
+        self.duree_totale = None
+        self.interrompue = False
+
+    def ajouter(self, nom, duree):
+        """Ajoute une durée (s) à une étape"""
+        etape = self.etapes.setdefault(nom, {'ms': 0.0, 'appels': 0})
+        etape['ms'] += duree * 1000.0
+        etape['appels'] += 1
+
+    def jalon(self, nom=None):
+        """Termine l'étape en cours et démarre l'étape nom (aucune si None)"""
+        maintenant = time.perf_counter()
+        if self.etape_courante is not None:
+            self.ajouter(self.etape_courante, maintenant - self.debut_etape)
+        self.etape_courante, self.debut_etape = nom, maintenant
+
+    def compter(self, nom, nombre=1):
+        """Incrémente un compteur"""
+        self.compteurs[nom] = self.compteurs.get(nom, 0) + nombre
+
+    def suivre(self, objet, *attributs):
+        """Relève en fin d'exécution les compteurs portés par les attributs d'un objet"""
+        self.suivis.append((objet, attributs, {attribut: getattr(objet, attribut) for attribut in attributs}))
+
+    def terminer(self):
+        """Clôt l'étape en cours, relève les compteurs suivis et fige la durée totale"""
+        self.jalon(None)
+        for objet, attributs, initiaux in self.suivis:
+            for attribut in attributs:
+                self.compter(attribut, getattr(objet, attribut) - initiaux[attribut])
+        self.suivis = []
+        self.duree_totale = (time.perf_counter() - self.debut) * 1000.0
+
+    def enregistrement(self, **contexte):
+        """Enregistrement JSON de l'exécution"""
+        return {
+            'horodatage': datetime.now().isoformat(timespec='milliseconds'),
+            'duree_ms': round(self.duree_totale, 3) if self.duree_totale is not None else None,
+            'interrompue': self.interrompue,
+            'etapes': {nom: {'ms': round(etape['ms'], 3), 'appels': etape['appels']}
+                       for nom, etape in self.etapes.items()},
+            'compteurs': self.compteurs,
+            **contexte
+        }
+
+    def journaliser(self, chemin, **contexte):
+        """Ajoute l'exécution au journal (une ligne JSON), renommé en chemin.1 au-delà de TAILLE_MAX_JOURNAL"""
+        ligne = json.dumps(self.enregistrement(**contexte), ensure_ascii=False)
+        with _verrou_journal:
+            with open(chemin, 'a', encoding='utf-8') as journal:
+                journal.write(ligne + '\n')
+                taille = journal.tell()
+            if TAILLE_MAX_JOURNAL and taille > TAILLE_MAX_JOURNAL:
+                os.replace(chemin, f"{chemin}.1")
+
+
+def chronometre_actif():
+    """Chronomètre de l'exécution en cours, None hors d'une page instrumentée"""
+    return _chronometre_courant.get()
+
+
+def jalon(nom=None):
+    """Démarre l'étape nom de l'exécution en cours (sans effet hors instrumentation)"""
+    chronometre = _chronometre_courant.get()
+    if chronometre is not None:
+        chronometre.jalon(nom)
+
+
+def suivre_compteurs(objet, *attributs):
+    """Suit les compteurs d'un objet pendant l'exécution en cours (sans effet hors instrumentation)"""
+    chronometre = _chronometre_courant.get()
+    if chronometre is not None:
+        chronometre.suivre(objet, *attributs)
+
+
+def instrumenter_methodes(classe):
+    """Décorateur de classe : chronomètre chaque méthode publique sous le nom Classe.méthode"""
+    def instrumenter(nom, methode):
+        etape = f"{classe.__name__}.{nom}"
+
+        @wraps(methode)
+        def methode_instrumentee(*args, **kwargs):
+            chronometre = _chronometre_courant.get()
+            if chronometre is None:
+                return methode(*args, **kwargs)
+            debut = time.perf_counter()
+            try:
+                return methode(*args, **kwargs)
+            finally:
+                chronometre.ajouter(etape, time.perf_counter() - debut)
+        return methode_instrumentee
+
+    for nom, methode in list(vars(classe).items()):
+        if callable(methode) and not nom.startswith('_'):
+            setattr(classe, nom, instrumenter(nom, methode))
+    return classe
+
+
+def _executer_instrumentee(page, args, kwargs, journal, afficher=None, **contexte):
+    """Exécute page sous un nouveau chronomètre, journalisé à la fin"""
+    chronometre = Chronometre()
+    jeton = _chronometre_courant.set(chronometre)
+    try:
+        return page(*args, **kwargs)
+    except BaseException:
+        chronometre.interrompue = True
+        raise
+    finally:
+        chronometre.terminer()
+        _chronometre_courant.reset(jeton)
+        if journal:
+            try:
+                chronometre.journaliser(journal, **contexte)
+            except OSError:
+                pass  # Journal indisponible : l'instrumentation ne doit pas bloquer la page
+        if afficher is not None and not chronometre.interrompue:
+            afficher(chronometre)
+
+
+def instrumenter_page(journal=JOURNAL, afficher=None):
+    """Décorateur de la fonction de page : un chronomètre par exécution, journalisé à la fin
+
+    afficher(chronometre) est appelé après une exécution complète (panneau de débogage) ;
+    une exécution interrompue (rerun, arrêt) est journalisée sans être affichée.
+    """
+    def decorateur(page):
+        @wraps(page)
+        def page_instrumentee(*args, **kwargs):
+            return _executer_instrumentee(page, args, kwargs, journal, afficher)
+        return page_instrumentee
+    return decorateur
+
+
+def instrumenter_fragment(journal=JOURNAL):
+    """Décorateur d'un fragment Streamlit (à placer sous @st.fragment)
+
+    Appelé pendant une exécution de la page, le fragment s'y inscrit comme une étape ;
+    réexécuté seul (widget du fragment), il est journalisé comme une exécution distincte
+    portant son nom dans le champ 'fragment'.
+    """
+    def decorateur(fragment):
+        etape = f"fragment.{fragment.__name__}"
+
+        @wraps(fragment)
+        def fragment_instrumente(*args, **kwargs):
+            chronometre = _chronometre_courant.get()
+            if chronometre is None:
+                return _executer_instrumentee(fragment, args, kwargs, journal, fragment=fragment.__name__)
+            debut = time.perf_counter()
+            try:
+                return fragment(*args, **kwargs)
+            finally:
+                chronometre.ajouter(etape, time.perf_counter() - debut)
+        return fragment_instrumente
+    return decorateur
+
+
+def _centile(valeurs, fraction):
+    """Centile par interpolation linéaire d'une liste triée"""
+    position = fraction * (len(valeurs) - 1)
+    bas = int(position)
+    haut = min(bas + 1, len(valeurs) - 1)
+    return valeurs[bas] + (valeurs[haut] - valeurs[bas]) * (position - bas)
+
+
+def _dernieres_lignes(chemin, nombre, taille_bloc=64 * 1024):
+    """Dernières lignes (au plus nombre) d'un fichier texte, lues par blocs depuis la fin"""
+    with open(chemin, 'rb') as fichier:
+        position = fichier.seek(0, os.SEEK_END)
+        blocs = []
+        sauts = 0
+        # nombre + 1 sauts de ligne : la plus ancienne des lignes retenues est complète
+        while position > 0 and sauts <= nombre:
+            lecture = min(taille_bloc, position)
+            position -= lecture
+            fichier.seek(position)
+            bloc = fichier.read(lecture)
+            sauts += bloc.count(b'\n')
+            blocs.append(bloc)
+    lignes = b''.join(reversed(blocs)).split(b'\n')
+    if position > 0:
+        lignes = lignes[1:]
+    return [ligne.decode('utf-8', errors='replace') for ligne in lignes if ligne][-nombre:]
+
+
+def statistiques_journal(chemin=JOURNAL, dernieres=1000):
+    """Médiane et p95 (ms) par étape sur les dernières exécutions complètes du journal
+
+    Retourne {étape: {'executions', 'p50', 'p95'}}, l'étape 'total' portant la durée de
+    l'exécution entière et 'total fragment.<nom>' celle des réexécutions d'un fragment seul.
+    Seule la fin du journal est lue (complétée par la génération précédente, chemin.1, si
+    besoin) : le coût ne dépend pas de la taille du fichier.
+    """
+    if not chemin:
+        return {}
+    lignes = []
+    for fichier in (chemin, f"{chemin}.1"):
+        if len(lignes) < dernieres and os.path.exists(fichier):
+            lignes = _dernieres_lignes(fichier, dernieres - len(lignes)) + lignes
+
+    durees = {}
+    for ligne in lignes:
+        try:
+            execution = json.loads(ligne)
+        except ValueError:
+            continue  # Ligne tronquée par une écriture concurrente
+        if execution.get('interrompue') or execution.get('duree_ms') is None:
+            continue
+        total = f"total fragment.{execution['fragment']}" if execution.get('fragment') else 'total'
+        durees.setdefault(total, []).append(execution['duree_ms'])
+        for nom, etape in execution['etapes'].items():
+            durees.setdefault(nom, []).append(etape['ms'])
+
+    statistiques = {}
+    for nom, valeurs in durees.items():
+        valeurs.sort()
+        statistiques[nom] = {'executions': len(valeurs), 'p50': _centile(valeurs, 0.5), 'p95': _centile(valeurs, 0.95)}
+    return statistiques
+
+
+def main(arguments=None):
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Médiane et p95 des temps d'exécution par étape")
+    parser.add_argument('journal', nargs='?', default=JOURNAL, help="Journal des exécutions (JSON lines)")
+    parser.add_argument('--dernieres', type=int, default=1000, help="Nombre d'exécutions analysées")
+    args = parser.parse_args(arguments)
+
+    statistiques = statistiques_journal(args.journal, args.dernieres)
+    if not statistiques:
+        print(f"Aucune exécution dans {args.journal}", file=sys.stderr)
+        return 1
+    print(f"{'étape':<52}{'exécutions':>11}{'p50 (ms)':>11}{'p95 (ms)':>11}")
+    for nom, valeurs in sorted(statistiques.items(), key=lambda element: -element[1]['p95']):
+        print(f"{nom:<52}{valeurs['executions']:>11}{valeurs['p50']:>11.1f}{valeurs['p95']:>11.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
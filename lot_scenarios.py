@@ -0,0 +1,253 @@
+"""Calcul en lot de scénarios de dimensionnement, en ligne de commande.
+
+Chaque ligne du fichier d'entrée (CSV ou Parquet) décrit une installation : toute
+colonne portant le nom d'un champ de DonneesBase ou de Geometrie (diametre, materiau,
+debit_m3h, fluide, temperature, longueur_totale, hauteur_montee...) remplace la
+valeur par défaut, et la colonne optionnelle ``points_singuliers`` décrit les
+accessoires sous la forme ``Type:quantité:emplacement;Type:quantité:emplacement``.
+Des fluides supplémentaires (tables en température) peuvent être lus d'un fichier
+avec --fluides.
+
+Les lignes sont lues par lots, réparties sur un pool de processus, et les résultats
+sont écrits au fil de l'eau dans le fichier de sortie (CSV, Parquet ou Excel) : la
+mémoire reste constante quel que soit le nombre de cas.
+
+Exemple :
+    python lot_scenarios.py cas.csv resultats.csv --processus 8 --taille-lot 500
+"""
+
+import argparse
+import csv
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import fields, is_dataclass
+
+from moteur_hydraulique import (
+    MoteurHydraulique, Installation, DonneesBase, Geometrie, DetailsSinguliers, FLUIDES, charger_fluides,
+    lire_points_singuliers
+)
+
+
+CHAMPS_DONNEES_BASE = {champ.name: champ.type for champ in fields(DonneesBase)}
+CHAMPS_GEOMETRIE = {champ.name: champ.type for champ in fields(Geometrie)}
+
+# Moteur propre à chaque processus de calcul
+_moteur = None
+
+
+def valeur_renseignee(valeur):
+    """Indique si une cellule contient une valeur (ni vide, ni NaN)"""
+    if valeur is None:
+        return False
+    if isinstance(valeur, float) and math.isnan(valeur):
+        return False
+    return not (isinstance(valeur, str) and not valeur.strip())
+
+
+def installation_depuis_ligne(ligne):
+    """Construit une Installation à partir d'une ligne du fichier de cas"""
+    donnees_base = DonneesBase()
+    geometrie = Geometrie()
+    for nom, valeur in ligne.items():
+        if not valeur_renseignee(valeur):
+            continue
+        if nom in CHAMPS_DONNEES_BASE:
+            cible = donnees_base
+            type_champ = CHAMPS_DONNEES_BASE[nom]
+        elif nom in CHAMPS_GEOMETRIE:
+            cible = geometrie
+            type_champ = CHAMPS_GEOMETRIE[nom]
+        else:
+            continue
+        setattr(cible, nom, str(valeur) if type_champ in (str, 'str') else float(valeur))
+
+    return Installation(
+        donnees_base=donnees_base,
+        geometrie=geometrie,
+        points_singuliers=lire_points_singuliers(ligne.get('points_singuliers'))
+    )
+
+
+def aplatir_resultats(resultats):
+    """Aplatit les résultats d'un calcul en un dictionnaire de valeurs scalaires"""
+    ligne = {}
+    for nom, valeur in vars(resultats).items():
+        if is_dataclass(valeur):
+            ligne.update(vars(valeur))
+        elif not isinstance(valeur, (list, dict, DetailsSinguliers)):
+            ligne[nom] = valeur
+    return ligne
+
+
+def colonnes_resultats():
+    """Liste ordonnée des colonnes de résultats"""
+    moteur = MoteurHydraulique()
+    return list(aplatir_resultats(moteur.calculer_pertes_totales(Installation())))
+
+
+def _initialiser_processus(materiaux, fluides, coefficients_singuliers):
+    """Crée le moteur de calcul une fois par processus"""
+    global _moteur
+    _moteur = MoteurHydraulique(materiaux, fluides, coefficients_singuliers)
+
+
+def calculer_lot(lot, colonnes):
+    """Calcule un lot de cas ; retourne des tuples (ligne, valeurs..., erreur)"""
+    moteur = _moteur or MoteurHydraulique()
+    sortie = []
+    for numero, ligne in lot:
+        try:
+            resultats = aplatir_resultats(moteur.calculer_pertes_totales(installation_depuis_ligne(ligne)))
+            sortie.append((numero, *(resultats[colonne] for colonne in colonnes), ''))
+        except Exception as e:
+            sortie.append((numero, *([None] * len(colonnes)), f"{type(e).__name__}: {e}"))
+    return sortie
+
+
+def lire_cas(chemin, taille_lot):
+    """Lit le fichier de cas par lots de (numéro de ligne, dictionnaire)"""
+    numero = 0
+    if chemin.lower().endswith(('.parquet', '.pq')):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(chemin).iter_batches(batch_size=taille_lot):
+            lignes = batch.to_pylist()
+            yield list(enumerate(lignes, start=numero))
+            numero += len(lignes)
+    else:
+        import pandas as pd
+
+        for morceau in pd.read_csv(chemin, chunksize=taille_lot):
+            lignes = morceau.to_dict('records')
+            yield list(enumerate(lignes, start=numero))
+            numero += len(lignes)
+
+
+class EcrivainCSV:
+    """Écriture incrémentale des résultats en CSV"""
+
+    def __init__(self, chemin, colonnes):
+        self.fichier = open(chemin, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.fichier)
+        self.writer.writerow(colonnes)
+
+    def ecrire(self, lignes):
+        self.writer.writerows(lignes)
+
+    def fermer(self):
+        self.fichier.close()
+
+
+class EcrivainParquet:
+    """Écriture incrémentale des résultats en Parquet (un groupe de lignes par lot)"""
+
+    def __init__(self, chemin, colonnes):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        types = {'ligne': pa.int64(), 'regime_ecoulement': pa.string(), 'erreur': pa.string()}
+        self.schema = pa.schema([(colonne, types.get(colonne, pa.float64())) for colonne in colonnes])
+        self.writer = pq.ParquetWriter(chemin, self.schema)
+
+    def ecrire(self, lignes):
+        colonnes = list(zip(*lignes))
+        self.writer.write_table(self.pa.Table.from_arrays(
+            [self.pa.array(valeurs, type=champ.type) for valeurs, champ in zip(colonnes, self.schema)],
+            schema=self.schema
+        ))
+
+    def fermer(self):
+        self.writer.close()
+
+
+class EcrivainExcel:
+    """Écriture incrémentale des résultats dans un classeur Excel en écriture seule"""
+
+    def __init__(self, chemin, colonnes):
+        from export_excel import ClasseurFlux, FORMATS_RESULTATS
+
+        self.classeur = ClasseurFlux(chemin)
+        self.feuille = self.classeur.feuille('Résultats', colonnes, formats=FORMATS_RESULTATS)
+
+    def ecrire(self, lignes):
+        self.feuille.ecrire_lignes(lignes)
+
+    def fermer(self):
+        self.classeur.fermer()
+
+
+def executer(entree, sortie, processus=None, taille_lot=500, moteur=None, rapport=sys.stderr):
+    """Calcule tous les cas du fichier d'entrée et écrit les résultats au fil de l'eau"""
+    moteur = moteur or MoteurHydraulique()
+    processus = processus or os.cpu_count() or 1
+    colonnes = colonnes_resultats()
+    entete = ['ligne', *colonnes, 'erreur']
+
+    if sortie.lower().endswith(('.parquet', '.pq')):
+        ecrivain = EcrivainParquet(sortie, entete)
+    elif sortie.lower().endswith('.xlsx'):
+        ecrivain = EcrivainExcel(sortie, entete)
+    else:
+        ecrivain = EcrivainCSV(sortie, entete)
+
+    debut = time.perf_counter()
+    nombre_cas = 0
+    nombre_erreurs = 0
+
+    def enregistrer(lignes):
+        nonlocal nombre_cas, nombre_erreurs
+        ecrivain.ecrire(lignes)
+        nombre_cas += len(lignes)
+        nombre_erreurs += sum(1 for ligne in lignes if ligne[-1])
+        duree = time.perf_counter() - debut
+        print(f"\r{nombre_cas} cas calculés - {nombre_cas / max(duree, 1e-9):.0f} cas/s",
+              end='', file=rapport, flush=True)
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=processus,
+            initializer=_initialiser_processus,
+            initargs=(moteur.materiaux, moteur.fluides, moteur.coefficients_singuliers)
+        ) as pool:
+            # Nombre de lots en vol borné : la mémoire ne dépend pas de la taille du fichier
+            en_cours = set()
+            for lot in lire_cas(entree, taille_lot):
+                if len(en_cours) >= 2 * processus:
+                    termines, en_cours = wait(en_cours, return_when=FIRST_COMPLETED)
+                    for futur in termines:
+                        enregistrer(futur.result())
+                en_cours.add(pool.submit(calculer_lot, lot, colonnes))
+            for futur in wait(en_cours).done:
+                enregistrer(futur.result())
+    finally:
+        ecrivain.fermer()
+
+    duree = time.perf_counter() - debut
+    print(f"\n{nombre_cas} cas en {duree:.1f} s ({nombre_cas / max(duree, 1e-9):.0f} cas/s), "
+          f"{nombre_erreurs} en erreur", file=rapport)
+    return nombre_cas
+
+
+def main(arguments=None):
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Calcul en lot des pertes de charge et du NPSH")
+    parser.add_argument('entree', help="Fichier de cas (.csv ou .parquet)")
+    parser.add_argument('sortie', help="Fichier de résultats (.csv, .parquet ou .xlsx)")
+    parser.add_argument('--processus', type=int, default=None,
+                        help="Nombre de processus de calcul (par défaut : nombre de cœurs)")
+    parser.add_argument('--taille-lot', type=int, default=500,
+                        help="Nombre de lignes par lot envoyé à un processus")
+    parser.add_argument('--fluides', default=None,
+                        help="Fichier de fluides supplémentaires (.csv ou .json, tables en température)")
+    args = parser.parse_args(arguments)
+
+    moteur = MoteurHydraulique(fluides={**FLUIDES, **charger_fluides(args.fluides)}) if args.fluides else None
+    executer(args.entree, args.sortie, processus=args.processus, taille_lot=args.taille_lot, moteur=moteur)
+
+
+if __name__ == "__main__":
+    main()
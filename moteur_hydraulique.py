@@ -0,0 +1,1486 @@
+"""Moteur de calcul hydraulique indépendant de Streamlit.
+
+Toute la physique (pertes de charge, NPSH, puissances, coup de bélier) est ici,
+sans dépendance à l'interface : les entrées sont des objets typés et les résultats
+sont retournés sous forme de dataclasses. La conduite est décrite par une suite
+ordonnée de tronçons (longueur, diamètre, matériau, points singuliers) dont les
+pertes sont calculées en une passe vectorisée ; sans tronçons explicites, la
+géométrie simple (un diamètre, un matériau) donne un tronçon d'aspiration et un
+tronçon de refoulement. Le module n'importe que la bibliothèque
+standard au chargement (NumPy est chargé à la demande par les calculs vectorisés),
+et le moteur est sérialisable par pickle pour être envoyé à des pools de processus.
+"""
+
+import hashlib
+import json
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass, field, asdict
+from math import pi, log, log10, exp, sqrt
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+# Matériaux et rugosités (en mètres)
+MATERIAUX = {
+    'Acier': 0.000045,
+    'PVC': 0.0000015,
+    'PEHD': 0.000007,
+    'Fonte': 0.00026,
+    'Béton': 0.0003,
+    'Cuivre': 0.0000015,
+    'Acier galvanisé': 0.00015
+}
+
+# Fluides : propriétés à 20°C et tables en température (°C ; kg/m³, m²/s, Pa, Pa).
+# Les tables reprennent les valeurs à 20°C ci-dessus ; une température hors de leur
+# plage est refusée.
+FLUIDES = {
+    'Eau': {
+        'masse_volumique_20c': 998.2,
+        'viscosite_cinematique_20c': 1.004e-6,
+        'pression_vapeur_20c': 2337.0,
+        'coefficient_temp': 0.0002,
+        'module_elasticite': 2.15e9,
+        'table': {
+            'temperature': (0, 10, 20, 30, 40, 50, 60, 70, 80, 90, 100, 110, 120, 130, 140, 150),
+            'masse_volumique': (999.8, 999.7, 998.2, 995.7, 992.2, 988.0, 983.2, 977.8, 971.8, 965.3, 958.4,
+                                951.0, 943.1, 934.8, 926.1, 917.0),
+            'viscosite_cinematique': (1.787e-6, 1.307e-6, 1.004e-6, 0.801e-6, 0.658e-6, 0.553e-6, 0.474e-6,
+                                      0.413e-6, 0.365e-6, 0.326e-6, 0.294e-6, 0.268e-6, 0.248e-6, 0.230e-6,
+                                      0.214e-6, 0.201e-6),
+            'pression_vapeur': (611.2, 1228.0, 2339.0, 4246.0, 7384.0, 12350.0, 19940.0, 31190.0, 47390.0,
+                                70140.0, 101325.0, 143270.0, 198530.0, 270130.0, 361380.0, 476160.0),
+            'module_elasticite': (1.95e9, 2.07e9, 2.15e9, 2.20e9, 2.23e9, 2.24e9, 2.23e9, 2.20e9, 2.16e9, 2.11e9,
+                                  2.04e9, 1.96e9, 1.88e9, 1.79e9, 1.70e9, 1.61e9)
+        }
+    },
+    'Eau glycolée 30%': {
+        'masse_volumique_20c': 1050.0,
+        'viscosite_cinematique_20c': 2.5e-6,
+        'pression_vapeur_20c': 2337.0,
+        'coefficient_temp': 0.0003,
+        'module_elasticite': 2.5e9,
+        'table': {
+            'temperature': (-10, 0, 10, 20, 30, 40, 50, 60, 80, 100),
+            'masse_volumique': (1057.0, 1055.0, 1053.0, 1050.0, 1046.0, 1042.0, 1037.0, 1032.0, 1021.0, 1009.0),
+            'viscosite_cinematique': (6.5e-6, 4.6e-6, 3.3e-6, 2.5e-6, 1.95e-6, 1.6e-6, 1.3e-6, 1.1e-6, 0.8e-6,
+                                      0.62e-6),
+            'pression_vapeur': (260.0, 560.0, 1130.0, 2337.0, 3900.0, 6800.0, 11400.0, 18300.0, 43600.0, 93200.0),
+            'module_elasticite': (2.60e9, 2.58e9, 2.54e9, 2.50e9, 2.46e9, 2.42e9, 2.37e9, 2.32e9, 2.20e9, 2.08e9)
+        }
+    },
+    'Fuel léger': {
+        'masse_volumique_20c': 850.0,
+        'viscosite_cinematique_20c': 3.0e-6,
+        'pression_vapeur_20c': 500.0,
+        'coefficient_temp': 0.0007,
+        'module_elasticite': 1.5e9,
+        'table': {
+            'temperature': (-10, 0, 10, 20, 30, 40, 60, 80, 100),
+            'masse_volumique': (867.9, 861.9, 856.0, 850.0, 844.1, 838.1, 826.2, 814.3, 802.4),
+            'viscosite_cinematique': (8.2e-6, 5.8e-6, 4.1e-6, 3.0e-6, 2.35e-6, 1.9e-6, 1.3e-6, 0.97e-6, 0.76e-6),
+            'pression_vapeur': (90.0, 170.0, 300.0, 500.0, 800.0, 1250.0, 2700.0, 5300.0, 9500.0),
+            'module_elasticite': (1.68e9, 1.62e9, 1.56e9, 1.50e9, 1.44e9, 1.38e9, 1.27e9, 1.16e9, 1.05e9)
+        }
+    },
+    'Huile hydraulique': {
+        'masse_volumique_20c': 870.0,
+        'viscosite_cinematique_20c': 46.0e-6,
+        'pression_vapeur_20c': 100.0,
+        'coefficient_temp': 0.0006,
+        'module_elasticite': 1.8e9,
+        'table': {
+            'temperature': (-10, 0, 10, 20, 30, 40, 60, 80, 100),
+            'masse_volumique': (885.7, 880.4, 875.2, 870.0, 864.8, 859.6, 849.1, 838.7, 828.2),
+            'viscosite_cinematique': (478e-6, 198e-6, 92e-6, 46e-6, 25.5e-6, 15.6e-6, 6.5e-6, 3.3e-6, 2.3e-6),
+            'pression_vapeur': (20.0, 35.0, 60.0, 100.0, 160.0, 250.0, 560.0, 1150.0, 2200.0),
+            'module_elasticite': (1.98e9, 1.92e9, 1.86e9, 1.80e9, 1.74e9, 1.68e9, 1.57e9, 1.46e9, 1.35e9)
+        }
+    },
+    'Ammoniac': {
+        'masse_volumique_20c': 610.0,
+        'viscosite_cinematique_20c': 0.36e-6,
+        'pression_vapeur_20c': 857000.0,
+        'coefficient_temp': 0.0025,
+        'module_elasticite': 1.2e9,
+        'table': {
+            'temperature': (-40, -20, 0, 20, 40, 60),
+            'masse_volumique': (690.2, 665.1, 638.6, 610.0, 579.5, 545.2),
+            'viscosite_cinematique': (0.63e-6, 0.52e-6, 0.432e-6, 0.36e-6, 0.306e-6, 0.259e-6),
+            'pression_vapeur': (71700.0, 190200.0, 429400.0, 857000.0, 1555000.0, 2614000.0),
+            'module_elasticite': (1.75e9, 1.55e9, 1.38e9, 1.20e9, 0.98e9, 0.75e9)
+        }
+    }
+}
+
+# Colonnes d'une table de propriétés en température
+COLONNES_TABLE_FLUIDE = ('temperature', 'masse_volumique', 'viscosite_cinematique', 'pression_vapeur',
+                         'module_elasticite')
+
+# Au-delà de ce nombre de tronçons, calculer_pertes_totales passe au calcul vectorisé
+SEUIL_TRONCONS_VECTORISES = 8
+
+# Coefficients de pertes de charge singulières
+COEFFICIENTS_SINGULIERS = {
+    'Vanne pleine ouverture': 0.2,
+    'Vanne 1/2 ouverture': 4.0,
+    'Clapet de retenue': 2.5,
+    'Clapet anti-retour': 10.0,
+    'Coudes 90° standard': 0.3,
+    'Coudes 90° rayon long': 0.2,
+    'Coudes 45°': 0.2,
+    'Té droit': 0.9,
+    'Té latéral': 1.8,
+    'Rétrécissement brusque': 0.5,
+    'Élargissement brusque': 1.0,
+    'Entrée de réservoir': 0.5,
+    'Sortie de réservoir': 1.0,
+    'Crépine': 2.0,
+    'Robinet vanne': 0.2
+}
+
+
+@dataclass
+class Fluide:
+    """Propriétés d'un fluide à 20°C et, optionnellement, table en température
+
+    table associe à chaque colonne de COLONNES_TABLE_FLUIDE une suite de valeurs, une
+    par température. Les propriétés sont interpolées linéairement entre les lignes de
+    la table (en logarithme pour la viscosité et la pression de vapeur, qui varient
+    exponentiellement) ; une température hors de la table est refusée plutôt que
+    ramenée à la ligne extrême, ce qui sous-estimerait par exemple la pression de
+    vapeur, donc surestimerait le NPSH disponible. Sans table, les corrections
+    approchées à partir des valeurs à 20°C s'appliquent.
+    """
+    masse_volumique_20c: float
+    viscosite_cinematique_20c: float
+    pression_vapeur_20c: float
+    coefficient_temp: float
+    module_elasticite: float
+    table: dict = None
+
+    def __post_init__(self):
+        self._colonnes = None
+        self._tableaux = None
+        if self.table is None:
+            return
+        manquantes = [colonne for colonne in COLONNES_TABLE_FLUIDE if colonne not in self.table]
+        if manquantes:
+            raise ValueError(f"Colonnes manquantes dans la table du fluide : {', '.join(manquantes)}")
+        lignes = sorted(zip(*(map(float, self.table[colonne]) for colonne in COLONNES_TABLE_FLUIDE)))
+        if not lignes:
+            raise ValueError("La table du fluide est vide")
+        temperatures, masses_volumiques, viscosites, pressions_vapeur, modules = zip(*lignes)
+        if len(set(temperatures)) != len(temperatures):
+            raise ValueError("Températures en double dans la table du fluide")
+        if min(masses_volumiques + viscosites + pressions_vapeur + modules) <= 0:
+            raise ValueError("Les propriétés de la table du fluide doivent être strictement positives")
+        # Tables précalculées : viscosité et pression de vapeur en logarithme
+        self._colonnes = (
+            temperatures, masses_volumiques, tuple(map(log, viscosites)), tuple(map(log, pressions_vapeur)), modules
+        )
+
+    @classmethod
+    def depuis_table(cls, table):
+        """Construit un fluide à partir de sa seule table ; les valeurs à 20°C en sont interpolées
+
+        (valeurs de la ligne extrême si la table ne couvre pas 20°C : elles ne sont qu'indicatives)
+        """
+        fluide = cls(0.0, 0.0, 0.0, 0.0, 0.0, table={colonne: tuple(table[colonne]) for colonne in table})
+        debut, fin = fluide.plage_temperatures
+        fluide.masse_volumique_20c, fluide.viscosite_cinematique_20c, fluide.pression_vapeur_20c, \
+            fluide.module_elasticite = fluide.interpoler(min(max(20.0, debut), fin))
+        return fluide
+
+    @property
+    def plage_temperatures(self):
+        """(température minimale, température maximale) de la table en °C ; None sans table"""
+        if self._colonnes is None:
+            return None
+        return self._colonnes[0][0], self._colonnes[0][-1]
+
+    def _hors_table(self, minimum, maximum):
+        """Erreur pour une température hors de la table"""
+        debut, fin = self.plage_temperatures
+        temperature = minimum if minimum < debut else maximum
+        return ValueError(f"Température {temperature:g} °C hors de la table du fluide ({debut:g} à {fin:g} °C)")
+
+    def interpoler(self, temperature):
+        """Propriétés interpolées dans la table : (masse volumique, viscosité, pression de vapeur, module)
+
+        temperature est un scalaire (résultats flottants, sans NumPy) ou un tableau
+        (résultats en tableaux de même forme, en un seul appel vectorisé). Lève
+        ValueError si une température sort de la table.
+        """
+        temperatures, masses_volumiques, ln_viscosites, ln_pressions, modules = self._colonnes
+        if isinstance(temperature, (int, float)):
+            if not temperatures[0] <= temperature <= temperatures[-1]:
+                raise self._hors_table(temperature, temperature)
+            # Ligne précédente i et poids p de la ligne suivante j (la dernière ligne est exacte)
+            j = bisect_right(temperatures, temperature)
+            if j == len(temperatures):
+                i = j = j - 1
+                p = 0.0
+            else:
+                i = j - 1
+                p = (temperature - temperatures[i]) / (temperatures[j] - temperatures[i])
+            return (
+                masses_volumiques[i] + p * (masses_volumiques[j] - masses_volumiques[i]),
+                exp(ln_viscosites[i] + p * (ln_viscosites[j] - ln_viscosites[i])),
+                exp(ln_pressions[i] + p * (ln_pressions[j] - ln_pressions[i])),
+                modules[i] + p * (modules[j] - modules[i])
+            )
+
+        import numpy as np
+
+        if self._tableaux is None:
+            self._tableaux = tuple(np.asarray(colonne, dtype=float) for colonne in self._colonnes)
+        temperatures, masses_volumiques, ln_viscosites, ln_pressions, modules = self._tableaux
+        temperature = np.asarray(temperature, dtype=float)
+        if temperature.size:
+            minimum, maximum = float(temperature.min()), float(temperature.max())
+            if minimum < temperatures[0] or maximum > temperatures[-1]:
+                raise self._hors_table(minimum, maximum)
+        return (
+            np.interp(temperature, temperatures, masses_volumiques),
+            np.exp(np.interp(temperature, temperatures, ln_viscosites)),
+            np.exp(np.interp(temperature, temperatures, ln_pressions)),
+            np.interp(temperature, temperatures, modules)
+        )
+
+    def __getstate__(self):
+        # Les tableaux NumPy sont reconstruits à la demande après désérialisation
+        return {**self.__dict__, '_tableaux': None}
+
+
+def lire_fluides(tableau):
+    """Fluides définis par un tableau importé, une ligne par (fluide, température)
+
+    Colonnes : fluide, puis celles de COLONNES_TABLE_FLUIDE (°C, kg/m³, m²/s, Pa, Pa).
+    Retourne un dictionnaire nom -> Fluide.
+    """
+    colonnes = ('fluide',) + COLONNES_TABLE_FLUIDE
+    manquantes = [colonne for colonne in colonnes if colonne not in tableau.columns]
+    if manquantes:
+        raise ValueError(f"Colonnes manquantes dans le fichier de fluides : {', '.join(manquantes)}")
+    return {
+        str(nom): Fluide.depuis_table({colonne: lignes[colonne].astype(float).tolist() for colonne in COLONNES_TABLE_FLUIDE})
+        for nom, lignes in tableau.groupby('fluide', sort=False)
+    }
+
+
+def charger_fluides(chemin):
+    """Lit un fichier de fluides (.csv, ou .json au format {fluide: table}) ; retourne nom -> Fluide"""
+    if chemin.lower().endswith('.json'):
+        with open(chemin, encoding='utf-8') as fichier:
+            return {nom: Fluide.depuis_table(table) for nom, table in json.load(fichier).items()}
+
+    import pandas as pd
+
+    return lire_fluides(pd.read_csv(chemin))
+
+
+@dataclass
+class DonneesBase:
+    """Caractéristiques de base de l'installation"""
+    diametre: float = 0.1
+    materiau: str = 'Acier'
+    debit_m3h: float = 36.0
+    fluide: str = 'Eau'
+    temperature: float = 20.0
+    pression_amont: float = 101325.0
+    hauteur_geodesique_aspiration: float = 2.0
+    npsh_requis: float = 2.0
+    rendement_mecanique: float = 0.95
+    rendement_electrique: float = 0.92
+    epaisseur_conduite: float = 0.005
+    module_young_materiau: float = 200e9
+
+
+@dataclass
+class Geometrie:
+    """Longueurs et hauteurs de la conduite"""
+    longueur_totale: float = 100.0
+    hauteur_montee: float = 10.0
+    hauteur_descente: float = 5.0
+    longueur_aspiration: float = 5.0
+    longueur_refoulement: float = 95.0
+
+
+@dataclass
+class PointSingulier:
+    """Point singulier (vanne, coude, clapet...) placé sur la conduite
+
+    emplacement : 'aspiration', 'refoulement' ou indice du tronçon qui le porte.
+    """
+    type: str
+    quantite: int = 1
+    emplacement: str = 'aspiration'
+
+
+# Noms de colonnes reconnus dans une nomenclature de points singuliers (minuscules, sans accents)
+COLONNES_NOMENCLATURE = {
+    'type': ('type', 'point singulier', 'designation', 'accessoire'),
+    'quantite': ('quantite', 'qte', 'nombre'),
+    'emplacement': ('emplacement', 'localisation', 'position')
+}
+
+
+def libelle_emplacement(emplacement):
+    """Libellé d'un emplacement de point singulier ('aspiration', 'refoulement' ou indice de tronçon)"""
+    return f"tronçon {emplacement + 1}" if isinstance(emplacement, int) else emplacement
+
+
+def lire_emplacement(valeur):
+    """Emplacement d'après son libellé : 'aspiration', 'refoulement', 'tronçon N' ou N (numéroté à partir de 1)"""
+    texte = str(valeur).strip().lower()
+    if texte in ('aspiration', 'refoulement'):
+        return texte
+    numero = texte.removeprefix('tronçon').removeprefix('troncon').strip()
+    try:
+        indice = float(numero)
+    except ValueError:
+        raise ValueError(f"Emplacement inconnu : {valeur}") from None
+    if indice != int(indice) or indice < 1:
+        raise ValueError(f"Numéro de tronçon invalide : {valeur}")
+    return int(indice) - 1
+
+
+def lire_points_singuliers(texte):
+    """Décode une colonne points_singuliers (Type:quantité:emplacement séparés par ';')
+
+    Format des fichiers de cas (lot_scenarios) et des liens d'un réseau maillé.
+    La quantité doit être un entier positif ou nul ("2" ou "2.0", pas "2.5"). L'emplacement
+    est lu par lire_emplacement (aspiration, refoulement ou tronçon N). Une quantité ou un
+    emplacement invalide lève ValueError.
+    """
+    points = []
+    if not isinstance(texte, str):
+        return points
+    for element in texte.split(';'):
+        element = element.strip()
+        if not element:
+            continue
+        morceaux = [morceau.strip() for morceau in element.split(':')]
+        point = PointSingulier(type=morceaux[0])
+        if len(morceaux) > 1 and morceaux[1]:
+            try:
+                quantite = float(morceaux[1])
+            except ValueError:
+                quantite = -1.0
+            if not quantite.is_integer() or quantite < 0:
+                raise ValueError(f"Quantité invalide pour {point.type} : {morceaux[1]}")
+            point.quantite = int(quantite)
+        if len(morceaux) > 2 and morceaux[2]:
+            point.emplacement = lire_emplacement(morceaux[2])
+        points.append(point)
+    return points
+
+
+def lire_emplacement_troncon(valeur):
+    """Emplacement d'un tronçon : 'aspiration' ou 'refoulement' (casse et espaces ignorés), toute autre valeur refusée"""
+    if valeur == 'aspiration' or valeur == 'refoulement':
+        return valeur
+    texte = str(valeur).strip().lower()
+    if texte not in ('aspiration', 'refoulement'):
+        raise ValueError(f"Emplacement de tronçon inconnu : {valeur} (aspiration ou refoulement)")
+    return texte
+
+
+def _sans_accents(texte):
+    import unicodedata
+
+    return ''.join(c for c in unicodedata.normalize('NFD', texte) if not unicodedata.combining(c))
+
+
+def lire_nomenclature(tableau, coefficients=None):
+    """Registre des points singuliers d'une nomenclature importée, une ligne par point
+
+    Colonnes reconnues (voir COLONNES_NOMENCLATURE) : type, quantité (1 par défaut) et
+    emplacement ('aspiration' par défaut). Les lignes sans type sont ignorées. Avec
+    coefficients (type -> K), les types inconnus sont refusés.
+    """
+    colonnes = {}
+    for colonne in tableau.columns:
+        nom = _sans_accents(str(colonne).strip().lower())
+        for champ, noms in COLONNES_NOMENCLATURE.items():
+            if nom in noms:
+                colonnes.setdefault(champ, colonne)
+    if 'type' not in colonnes:
+        raise ValueError("Colonne du type de point singulier absente de la nomenclature")
+
+    def valeurs(champ, defaut):
+        if champ not in colonnes:
+            return [defaut] * len(tableau)
+        return [defaut if valeur != valeur or str(valeur).strip() == '' else valeur
+                for valeur in tableau[colonnes[champ]].tolist()]
+
+    registre = RegistreSinguliers()
+    for numero, (type, quantite, emplacement) in enumerate(
+        zip(valeurs('type', None), valeurs('quantite', 1), valeurs('emplacement', 'aspiration')), start=1
+    ):
+        if type is None:
+            continue
+        type = str(type).strip()
+        try:
+            if coefficients is not None and type not in coefficients:
+                raise ValueError(f"Type de point singulier inconnu : {type}")
+            registre.ajouter(type, float(quantite), lire_emplacement(emplacement))
+        except ValueError as e:
+            raise ValueError(f"Ligne {numero} de la nomenclature : {e}") from None
+    return registre
+
+
+def charger_nomenclature(source, coefficients=None):
+    """Lit une nomenclature (.csv, séparateur détecté, ou .xlsx) ; source : chemin ou fichier importé"""
+    import pandas as pd
+
+    nom = str(getattr(source, 'name', source)).lower()
+    if nom.endswith(('.xlsx', '.xls')):
+        tableau = pd.read_excel(source)
+    else:
+        tableau = pd.read_csv(source, sep=None, engine='python')
+    return lire_nomenclature(tableau, coefficients)
+
+
+class RegistreSinguliers:
+    """Registre des points singuliers d'une installation, rangé en colonnes
+
+    Type, quantité et emplacement de chaque point sont codés dans des tableaux, et les
+    quantités sont totalisées par emplacement et par type à chaque ajout ou retrait :
+    le ΣK d'un emplacement coûte O(nombre de types), quel que soit le nombre de points.
+    Le registre se parcourt comme une liste de PointSingulier, construits à la demande.
+    """
+
+    def __init__(self, points=()):
+        self.types = []  # Type de chaque code
+        self.emplacements = []  # Emplacement de chaque code
+        self._codes_types = {}
+        self._codes_emplacements = {}
+        self.codes_types = array('l')
+        self.quantites = array('q')
+        self.codes_emplacements = array('l')
+        self.totaux = {}  # emplacement -> {type: quantité totale}
+        self.nombres = {}  # emplacement -> nombre de points
+        self.revision = 0
+        self._empreinte = None
+        self.ajouter_lot(points)
+
+    @classmethod
+    def depuis(cls, points):
+        """Registre des points : lui-même si c'en est déjà un, sinon construit (PointSingulier ou dictionnaires)"""
+        return points if isinstance(points, cls) else cls(points)
+
+    @classmethod
+    def depuis_tableaux(cls, types, emplacements, codes_types, quantites, codes_emplacements):
+        """Registre restauré depuis ses colonnes codées, totaux recalculés en une seule passe"""
+        registre = cls()
+        registre.types, registre.emplacements = list(types), list(emplacements)
+        registre._codes_types = {type: code for code, type in enumerate(registre.types)}
+        registre._codes_emplacements = {emplacement: code for code, emplacement in enumerate(registre.emplacements)}
+        if (len(registre._codes_types) != len(registre.types)
+                or len(registre._codes_emplacements) != len(registre.emplacements)):
+            raise ValueError("Types ou emplacements en double dans le registre")
+        registre.codes_types = array('l', codes_types)
+        registre.quantites = array('q', quantites)
+        registre.codes_emplacements = array('l', codes_emplacements)
+        if not len(registre.codes_types) == len(registre.quantites) == len(registre.codes_emplacements):
+            raise ValueError("Colonnes du registre de longueurs différentes")
+        if registre.quantites and min(registre.quantites) < 0:
+            raise ValueError("Quantités négatives dans le registre")
+        for code_type, quantite, code_emplacement in zip(registre.codes_types, registre.quantites,
+                                                         registre.codes_emplacements):
+            if not (0 <= code_type < len(registre.types) and 0 <= code_emplacement < len(registre.emplacements)):
+                raise ValueError("Code de type ou d'emplacement hors limites dans le registre")
+            type, emplacement = registre.types[code_type], registre.emplacements[code_emplacement]
+            totaux = registre.totaux.setdefault(emplacement, {})
+            totaux[type] = totaux.get(type, 0) + quantite
+            registre.nombres[emplacement] = registre.nombres.get(emplacement, 0) + 1
+        return registre
+
+    @staticmethod
+    def _coder(valeur, valeurs, codes):
+        code = codes.get(valeur)
+        if code is None:
+            code = codes[valeur] = len(valeurs)
+            valeurs.append(valeur)
+        return code
+
+    def ajouter(self, type, quantite=1, emplacement='aspiration'):
+        """Ajoute un point ; retourne son indice"""
+        if quantite != int(quantite) or quantite < 0:
+            raise ValueError(f"Quantité invalide pour {type} : {quantite}")
+        quantite = int(quantite)
+        self.codes_types.append(self._coder(type, self.types, self._codes_types))
+        self.quantites.append(quantite)
+        self.codes_emplacements.append(self._coder(emplacement, self.emplacements, self._codes_emplacements))
+        totaux = self.totaux.setdefault(emplacement, {})
+        totaux[type] = totaux.get(type, 0) + quantite
+        self.nombres[emplacement] = self.nombres.get(emplacement, 0) + 1
+        self._modifier()
+        return len(self.quantites) - 1
+
+    def ajouter_lot(self, points):
+        """Ajoute des PointSingulier ou des dictionnaires (type, quantite, emplacement)"""
+        for point in points:
+            if isinstance(point, dict):
+                self.ajouter(**point)
+            else:
+                self.ajouter(point.type, point.quantite, point.emplacement)
+
+    def retirer(self, indice):
+        """Retire le point d'indice donné ; retourne le PointSingulier retiré"""
+        point = self[indice]
+        indice = indice % len(self)
+        del self.codes_types[indice]
+        del self.quantites[indice]
+        del self.codes_emplacements[indice]
+        totaux = self.totaux[point.emplacement]
+        totaux[point.type] -= point.quantite
+        if not totaux[point.type]:
+            del totaux[point.type]
+        self.nombres[point.emplacement] -= 1
+        if not self.nombres[point.emplacement]:
+            del self.nombres[point.emplacement]
+            del self.totaux[point.emplacement]
+        self._modifier()
+        return point
+
+    def vider(self):
+        """Retire tous les points"""
+        self.__init__()
+
+    def _modifier(self):
+        self.revision += 1
+        self._empreinte = None
+
+    def __len__(self):
+        return len(self.quantites)
+
+    def __getitem__(self, indice):
+        return PointSingulier(
+            self.types[self.codes_types[indice]],
+            self.quantites[indice],
+            self.emplacements[self.codes_emplacements[indice]]
+        )
+
+    def __iter__(self):
+        return self.points()
+
+    def points(self, emplacement=None):
+        """Parcourt les points (d'un seul emplacement si précisé)"""
+        code = self._codes_emplacements.get(emplacement) if emplacement is not None else None
+        if emplacement is not None and code is None:
+            return
+        for code_type, quantite, code_emplacement in zip(self.codes_types, self.quantites, self.codes_emplacements):
+            if code is None or code_emplacement == code:
+                yield PointSingulier(self.types[code_type], quantite, self.emplacements[code_emplacement])
+
+    def nombre(self, emplacement):
+        """Nombre de points d'un emplacement"""
+        return self.nombres.get(emplacement, 0)
+
+    def coefficient_total(self, coefficients, emplacement=None):
+        """ΣK·quantité des points d'un emplacement (de tous si None) ; coefficients : type -> K"""
+        emplacements = self.totaux if emplacement is None else (emplacement,)
+        return sum(
+            coefficients.get(type, 0.0) * quantite
+            for emplacement in emplacements for type, quantite in self.totaux.get(emplacement, {}).items()
+        )
+
+    def copie(self):
+        """Copie indépendante (instantané pour les résultats d'un calcul)"""
+        copie = RegistreSinguliers()
+        copie.types, copie.emplacements = list(self.types), list(self.emplacements)
+        copie._codes_types, copie._codes_emplacements = dict(self._codes_types), dict(self._codes_emplacements)
+        copie.codes_types, copie.quantites = array('l', self.codes_types), array('q', self.quantites)
+        copie.codes_emplacements = array('l', self.codes_emplacements)
+        copie.totaux = {emplacement: dict(totaux) for emplacement, totaux in self.totaux.items()}
+        copie.nombres = dict(self.nombres)
+        copie.revision, copie._empreinte = self.revision, self._empreinte
+        return copie
+
+    def empreinte_contenu(self):
+        """Empreinte (SHA-256) des points dans l'ordre, recalculée seulement après une modification"""
+        if self._empreinte is None:
+            empreinte = hashlib.sha256(json.dumps([self.types, self.emplacements], ensure_ascii=False).encode('utf-8'))
+            for colonne in (self.codes_types, self.quantites, self.codes_emplacements):
+                empreinte.update(colonne.tobytes())
+            self._empreinte = empreinte.hexdigest()
+        return self._empreinte
+
+    def en_dicts(self):
+        """Points sous forme de dictionnaires (format de l'interface)"""
+        return [asdict(point) for point in self]
+
+    def en_colonnes(self):
+        """Points sous forme de colonnes (type, quantite, emplacement), pour un tableau"""
+        return {
+            'type': [self.types[code] for code in self.codes_types],
+            'quantite': self.quantites.tolist(),
+            'emplacement': [self.emplacements[code] for code in self.codes_emplacements]
+        }
+
+
+@dataclass
+class Segment:
+    """Tronçon de conduite de diamètre et de matériau constants, avec ses points singuliers"""
+    longueur: float
+    diametre: float
+    materiau: str = 'Acier'
+    emplacement: str = 'refoulement'  # 'aspiration' ou 'refoulement'
+    points_singuliers: list = field(default_factory=list)
+
+    def __post_init__(self):
+        # Un emplacement mal saisi ne doit pas basculer le tronçon au refoulement (NPSH disponible surestimé)
+        self.emplacement = lire_emplacement_troncon(self.emplacement)
+
+    @classmethod
+    def depuis_dict(cls, segment):
+        """Construit un tronçon à partir d'un dictionnaire (points singuliers en dictionnaires)"""
+        segment = dict(segment)
+        points = segment.pop('points_singuliers', ())
+        return cls(**segment, points_singuliers=[
+            point if isinstance(point, PointSingulier) else PointSingulier(**point) for point in points
+        ])
+
+
+@dataclass
+class Installation:
+    """Jeu complet de données d'entrée d'un calcul
+
+    Sans segments, la conduite est modélisée par un tronçon d'aspiration et un tronçon de
+    refoulement tirés de donnees_base et geometrie. Avec segments, les points singuliers
+    de l'installation sont ajoutés au dernier tronçon d'aspiration (entrée de la pompe)
+    ou au premier tronçon de refoulement, selon leur emplacement, ou au tronçon dont
+    l'emplacement donne l'indice.
+    """
+    donnees_base: DonneesBase = field(default_factory=DonneesBase)
+    geometrie: Geometrie = field(default_factory=Geometrie)
+    points_singuliers: list = field(default_factory=list)  # Liste de PointSingulier ou RegistreSinguliers
+    segments: list = field(default_factory=list)
+
+    @classmethod
+    def depuis_dicts(cls, donnees_base, geometrie, points_singuliers=(), segments=()):
+        """Construit une installation à partir des dictionnaires de l'interface"""
+        return cls(
+            donnees_base=DonneesBase(**donnees_base),
+            geometrie=Geometrie(**geometrie),
+            points_singuliers=(points_singuliers if isinstance(points_singuliers, RegistreSinguliers)
+                               else [PointSingulier(**point) for point in points_singuliers]),
+            segments=[Segment.depuis_dict(segment) for segment in segments]
+        )
+
+
+@dataclass
+class TableauSegments:
+    """Tronçons d'une installation compilés en tableaux, un élément par tronçon"""
+    longueur: 'np.ndarray'
+    diametre: 'np.ndarray'
+    rugosite: 'np.ndarray'
+    coefficient_singulier: 'np.ndarray'  # ΣK des points singuliers du tronçon
+    aspiration: 'np.ndarray'  # Masque des tronçons côté aspiration
+    segments: list
+
+
+@dataclass
+class ProprietesFluide:
+    """Propriétés à une température (flottants) ou à un tableau de températures (tableaux)"""
+    masse_volumique: float
+    viscosite_cinematique: float
+    pression_vapeur: float
+    module_elasticite: float
+
+
+@dataclass
+class DetailSingulier:
+    nom: str
+    coefficient: float
+    perte: float
+    emplacement: str = ''
+
+
+class DetailsSinguliers:
+    """Détail des pertes singulières point par point, produit à la demande
+
+    Seuls les totaux par emplacement sont calculés avec les résultats ; le détail est
+    construit au parcours (tableau de détail, exports). Les groupes sont des triplets
+    (points, emplacement, hauteur cinétique) où points est une liste de PointSingulier
+    ou un RegistreSinguliers. Après en_dict(), les éléments sont des dictionnaires.
+    """
+
+    def __init__(self, groupes, coefficients, en_dictionnaires=False):
+        self.groupes = groupes
+        self.coefficients = coefficients
+        self.en_dictionnaires = en_dictionnaires
+
+    def __len__(self):
+        return sum(
+            points.nombre(emplacement) if isinstance(points, RegistreSinguliers) else len(points)
+            for points, emplacement, hauteur_cinetique in self.groupes
+        )
+
+    def __iter__(self):
+        for points, emplacement, hauteur_cinetique in self.groupes:
+            if isinstance(points, RegistreSinguliers):
+                points = points.points(emplacement)
+            for point in points:
+                coefficient = self.coefficients.get(point.type, 0.0) * float(point.quantite)
+                detail = DetailSingulier(
+                    nom=f"{point.type} (x{point.quantite})",
+                    coefficient=coefficient,
+                    perte=coefficient * hauteur_cinetique,
+                    emplacement=emplacement
+                )
+                yield asdict(detail) if self.en_dictionnaires else detail
+
+    def __deepcopy__(self, memo):
+        # asdict() copie les champs qui ne sont pas des dataclasses : la copie reste paresseuse
+        return DetailsSinguliers(self.groupes, self.coefficients, en_dictionnaires=True)
+
+
+@dataclass
+class DetailSegment:
+    longueur: float
+    diametre: float
+    materiau: str
+    emplacement: str
+    vitesse: float
+    nombre_reynolds: float
+    coefficient_friction: float
+    pertes_lineaires: float
+    pertes_singulieres: float
+
+
+@dataclass
+class Puissances:
+    puissance_hydraulique: float
+    puissance_mecanique: float
+    puissance_electrique: float
+
+
+@dataclass
+class CoupBelier:
+    celerite_onde: float
+    temps_parcours: float
+    pente_bergeron: float
+    surpression_max: float
+    depression_reservoir: float
+
+
+@dataclass
+class CourbeReseau:
+    """Courbe du réseau HMT(Q) échantillonnée sur un tableau de débits
+
+    vitesse, nombre_reynolds et coefficient_friction ont une dimension supplémentaire
+    (dernier axe) par tronçon ; les pertes sont sommées sur les tronçons.
+    """
+    debits_m3h: 'np.ndarray'
+    vitesse: 'np.ndarray'
+    nombre_reynolds: 'np.ndarray'
+    coefficient_friction: 'np.ndarray'
+    pertes_lineaires: 'np.ndarray'
+    pertes_singulieres: 'np.ndarray'
+    pertes_aspiration: 'np.ndarray'
+    hauteur_manometrique: 'np.ndarray'
+
+
+@dataclass
+class PointsFonctionnement:
+    """Points de fonctionnement pompe / réseau, un par fréquence du variateur"""
+    frequences: 'np.ndarray'
+    debit_m3h: 'np.ndarray'
+    hauteur_manometrique: 'np.ndarray'
+    rendement: 'np.ndarray'
+    puissance_hydraulique: 'np.ndarray'
+    puissance_electrique: 'np.ndarray'
+    trouve: 'np.ndarray'
+
+
+@dataclass
+class ResultatsCalcul:
+    """Résultats complets de calculer_pertes_totales
+
+    Les grandeurs de conduite (diamètre, vitesse, Reynolds, friction...) sont celles du
+    tronçon le plus long ; le détail par tronçon est dans segments.
+    """
+    diametre: float
+    section: float
+    vitesse: float
+    nombre_reynolds: float
+    rugosite: float
+    rugosite_relative: float
+    coefficient_friction: float
+    pertes_lineaires: float
+    pertes_singulieres: float
+    pertes_totales: float
+    pertes_aspiration: float
+    hauteur_manometrique: float
+    puissance_hydraulique: float
+    proprietes_fluide: ProprietesFluide
+    npsh_disponible: float
+    marge_npsh: float
+    details_singuliers: DetailsSinguliers
+    segments: list
+    debit_m3s: float
+    regime_ecoulement: str
+    puissances: Puissances
+    coup_belier: CoupBelier
+    totaux_singuliers: dict = field(default_factory=dict)  # emplacement -> nombre, ΣK et perte des points
+
+    def en_dict(self):
+        """Retourne les résultats sous forme de dictionnaires imbriqués (format de l'interface)"""
+        return asdict(self)
+
+
+class MoteurHydraulique:
+    """Calculs de pertes de charge, NPSH, puissances et coup de bélier"""
+
+    def __init__(self, materiaux=None, fluides=None, coefficients_singuliers=None):
+        self.materiaux = dict(MATERIAUX if materiaux is None else materiaux)
+        self.fluides = {
+            nom: proprietes if isinstance(proprietes, Fluide) else Fluide(**proprietes)
+            for nom, proprietes in (FLUIDES if fluides is None else fluides).items()
+        }
+        self.coefficients_singuliers = dict(
+            COEFFICIENTS_SINGULIERS if coefficients_singuliers is None else coefficients_singuliers
+        )
+        # Compteurs de résolutions de Colebrook-White (instrumentation), par élément calculé
+        self.appels_colebrook = 0
+        self.iterations_colebrook = 0
+
+    def convertir_debit_m3h_vers_m3s(self, debit_m3h):
+        """Convertit le débit de m³/h vers m³/s"""
+        return debit_m3h / 3600.0
+
+    def convertir_debit_m3s_vers_m3h(self, debit_m3s):
+        """Convertit le débit de m³/s vers m³/h"""
+        return debit_m3s * 3600.0
+
+    def calculer_proprietes_fluide(self, fluide, temperature):
+        """Calcule les propriétés du fluide en fonction de la température
+
+        temperature est un scalaire (°C) ou un tableau de températures : dans ce cas les
+        propriétés sont des tableaux de même forme, obtenus en un seul appel vectorisé.
+        """
+        proprietes_fluide = self.fluides[fluide]
+        if proprietes_fluide.table is not None:
+            return ProprietesFluide(*proprietes_fluide.interpoler(temperature))
+
+        # Sans table : corrections approchées à partir des valeurs à 20°C
+        if isinstance(temperature, (int, float)):
+            exponentielle, maximum = exp, max
+            module_elasticite = proprietes_fluide.module_elasticite
+        else:
+            import numpy as np
+
+            temperature = np.asarray(temperature, dtype=float)
+            exponentielle, maximum = np.exp, np.maximum
+            module_elasticite = np.full(temperature.shape, proprietes_fluide.module_elasticite)
+
+        # Correction pour la température (approximation linéaire)
+        delta_temp = temperature - 20.0
+        coeff_temp = proprietes_fluide.coefficient_temp
+
+        masse_volumique = proprietes_fluide.masse_volumique_20c * (1.0 - coeff_temp * delta_temp)
+
+        # Pour la viscosité, utilisation d'une approximation exponentielle
+        viscosite_cinematique = proprietes_fluide.viscosite_cinematique_20c * exponentielle(-0.02 * delta_temp)
+
+        # Pour la pression de vapeur, approximation avec formule d'Antoine simplifiée
+        if fluide == 'Eau':
+            # Formule d'Antoine pour l'eau (P en Pa, T en °C)
+            pression_vapeur = 610.94 * exponentielle((17.625 * temperature) / (temperature + 243.04))
+        else:
+            # Approximation linéaire pour autres fluides
+            pression_vapeur = proprietes_fluide.pression_vapeur_20c * exponentielle(0.05 * delta_temp)
+
+        return ProprietesFluide(
+            masse_volumique=maximum(masse_volumique, 500.0),
+            viscosite_cinematique=maximum(viscosite_cinematique, 0.1e-6),
+            pression_vapeur=pression_vapeur,
+            module_elasticite=module_elasticite
+        )
+
+    def calculer_nombre_reynolds(self, vitesse, diametre, viscosite_cinematique):
+        """Calcule le nombre de Reynolds"""
+        if viscosite_cinematique == 0:
+            return 0.0
+        return (vitesse * diametre) / viscosite_cinematique
+
+    def calculer_rugosite_relative(self, rugosite, diametre):
+        """Calcule la rugosité relative"""
+        if diametre == 0:
+            return 0.0
+        return rugosite / diametre
+
+    def calculer_coefficient_friction(self, Re, rugosite_relative):
+        """Calcule le coefficient de friction avec la formule de Colebrook-White"""
+        if Re == 0:
+            return 0.0
+
+        # Pour un écoulement laminaire
+        if Re < 2000:
+            return 64.0 / Re
+
+        # Estimation initiale pour turbulent
+        f = 0.02
+
+        # Résolution itérative de Colebrook-White
+        self.appels_colebrook += 1
+        for i in range(50):
+            f_new = 1.0 / (-2.0 * log10((rugosite_relative / 3.7) + (2.51 / (Re * f**0.5))))**2
+            if abs(f_new - f) < 1e-8:
+                self.iterations_colebrook += i + 1
+                return f_new
+            f = f_new
+
+        self.iterations_colebrook += 50
+        return f
+
+    def calculer_coefficient_friction_lot(self, Re, rugosite_relative, tolerance=1e-10, iterations_max=20):
+        """Calcule le coefficient de friction pour des tableaux de Reynolds et de rugosités relatives"""
+        import numpy as np
+
+        Re, rugosite_relative = np.broadcast_arrays(
+            np.asarray(Re, dtype=float), np.asarray(rugosite_relative, dtype=float)
+        )
+        f = np.zeros(Re.shape)
+
+        # Transition et turbulent : Colebrook-White (Re >= 2000, comme le calcul scalaire)
+        turbulent = Re >= 2000
+        if turbulent.all():
+            indices = slice(None)
+        else:
+            # Pour un écoulement laminaire
+            laminaire = (Re != 0) & ~turbulent
+            f[laminaire] = 64.0 / Re[laminaire]
+            indices = np.flatnonzero(turbulent)
+            if indices.size == 0:
+                return f
+
+        Re_t = Re.ravel()[indices]
+        a = rugosite_relative.ravel()[indices] / 3.7
+        b = 2.51 / Re_t
+        k = 2.0 / np.log(10.0)
+
+        # Estimation initiale explicite (Swamee-Jain), exprimée en x = 1/sqrt(f)
+        x = -2.0 * np.log10(a + 5.74 * Re_t**-0.9)
+
+        # Newton sur F(x) = x + 2·log10(a + b·x), soit dx = F·u / (u + k·b) avec u = a + b·x.
+        # La convergence étant quadratique, |dx/x| <= sqrt(tolerance) garantit une erreur
+        # relative résiduelle de l'ordre de la tolérance après la mise à jour.
+        seuil = sqrt(tolerance)
+        actifs = slice(None)
+        x_a, a_a, b_a = x, a, b
+        self.appels_colebrook += x.size
+        for i in range(iterations_max):
+            self.iterations_colebrook += x_a.size
+            u = b_a * x_a
+            u += a_a
+            dx = np.log(u)
+            dx *= k
+            dx += x_a
+            dx *= u
+            u += k * b_a
+            dx /= u
+            x_a -= dx
+            if not isinstance(actifs, slice):
+                x[actifs] = x_a
+
+            # Masque de convergence par élément : seuls les éléments non convergés sont itérés
+            np.abs(dx, out=dx)
+            non_convergence = dx > seuil * x_a
+            if not non_convergence.any():
+                break
+            if isinstance(actifs, slice):
+                actifs = np.flatnonzero(non_convergence)
+            else:
+                actifs = actifs[non_convergence]
+            x_a, a_a, b_a = x[actifs], a[actifs], b[actifs]
+
+        f.ravel()[indices] = 1.0 / x**2
+        return f
+
+    def calculer_pertes_lineaires(self, f, L, D, vitesse, g=9.81):
+        """Calcule les pertes de charge linéaires (formule de Darcy-Weisbach)"""
+        if D == 0:
+            return 0.0
+        return f * (L / D) * (vitesse**2 / (2.0 * g))
+
+    def calculer_pertes_singulieres(self, coefficients_singuliers, vitesse, g=9.81):
+        """Calcule les pertes de charge singulières"""
+        pertes_totales = 0.0
+        details = []
+
+        for nom, coefficient in coefficients_singuliers.items():
+            perte = coefficient * (vitesse**2 / (2.0 * g))
+            pertes_totales += perte
+            details.append(DetailSingulier(nom=nom, coefficient=coefficient, perte=perte))
+
+        return pertes_totales, details
+
+    def calculer_section(self, diametre):
+        """Calcule la section de la conduite"""
+        return pi * (diametre**2) / 4.0
+
+    def calculer_vitesse(self, debit, section):
+        """Calcule la vitesse d'écoulement"""
+        if section == 0:
+            return 0.0
+        return debit / section
+
+    def calculer_npsh_disponible(self, pression_amont, hauteur_geodesique, pertes_aspiration,
+                                 pression_vapeur, masse_volumique, g=9.81):
+        """Calcule le NPSH disponible"""
+        terme_pression = (pression_amont - pression_vapeur) / (masse_volumique * g)
+        npsh_disponible = terme_pression + hauteur_geodesique - pertes_aspiration
+
+        return max(npsh_disponible, 0.0)
+
+    def longueur_refoulement(self, installation):
+        """Longueur de refoulement : somme des tronçons de refoulement si la conduite est détaillée, sinon la géométrie"""
+        if installation.segments:
+            return sum(segment.longueur for segment in self.segments_installation(installation)
+                       if segment.emplacement == 'refoulement')
+        return installation.geometrie.longueur_refoulement
+
+    def calculer_coup_belier(self, installation, vitesse, section, proprietes_fluide, diametre=None):
+        """Calcule les paramètres du coup de bélier"""
+        donnees = installation.donnees_base
+
+        # Célérité de l'onde
+        K = proprietes_fluide.module_elasticite  # Module d'élasticité du fluide
+        E = donnees.module_young_materiau  # Module d'Young du matériau
+        D = donnees.diametre if diametre is None else diametre
+        e = donnees.epaisseur_conduite
+
+        # Calcul de la célérité (formule d'Allievi)
+        a = sqrt(K / proprietes_fluide.masse_volumique) / sqrt(1 + (K * D) / (E * e))
+
+        # Temps de parcours de l'onde
+        L = self.longueur_refoulement(installation)
+        T_parcours = 2 * L / a
+
+        # Pente des droites de Bergeron
+        pente_bergeron = a / (9.81 * section)
+
+        # Surpression maximale lors de l'arrêt brusque
+        delta_v = vitesse  # Variation de vitesse (arrêt complet)
+        delta_p = proprietes_fluide.masse_volumique * a * delta_v
+
+        # Dépression au réservoir
+        depression_reservoir = delta_p / (proprietes_fluide.masse_volumique * 9.81)
+
+        return CoupBelier(
+            celerite_onde=a,
+            temps_parcours=T_parcours,
+            pente_bergeron=pente_bergeron,
+            surpression_max=delta_p,
+            depression_reservoir=depression_reservoir
+        )
+
+    def calculer_puissances(self, donnees, puissance_hydraulique):
+        """Calcule les puissances mécanique et électrique"""
+        # Puissance mécanique
+        P_mecanique = puissance_hydraulique / donnees.rendement_mecanique
+
+        # Puissance électrique
+        P_electrique = P_mecanique / donnees.rendement_electrique
+
+        return Puissances(
+            puissance_hydraulique=puissance_hydraulique,
+            puissance_mecanique=P_mecanique,
+            puissance_electrique=P_electrique
+        )
+
+    def calculer_courbe_pompe_frequence(self, courbe_pompe, frequence):
+        """Points de la courbe de pompe (CourbePompe) transposés à une fréquence : (débits, hauteurs)"""
+        return courbe_pompe.points(frequence)
+
+    def calculer_points_fonctionnement(self, installation, courbe_pompe, frequences=(50, 45, 40, 35, 30, 25),
+                                       tolerance=1e-9, iterations_max=60, points_encadrement=33, g=9.81):
+        """Calcule l'intersection courbe de pompe (CourbePompe) / courbe du réseau pour chaque fréquence du variateur"""
+        import numpy as np
+
+        frequences = np.asarray(frequences, dtype=float)
+        nombre = frequences.size
+        vide = np.full(nombre, np.nan)
+        if courbe_pompe is None:
+            return PointsFonctionnement(frequences, vide, vide.copy(), vide.copy(), vide.copy(),
+                                        vide.copy(), np.zeros(nombre, dtype=bool))
+
+        ratio = frequences / 50.0
+        tableau_segments = self.compiler_segments(installation)
+
+        def ecart(debits, frequences):
+            return (courbe_pompe.hauteur(debits, frequences)
+                    - self.calculer_courbe_reseau(installation, debits, tableau_segments).hauteur_manometrique)
+
+        # Encadrement : premier passage de la pompe au-dessus du réseau à en dessous, sur la plage mesurée
+        debits_noeuds = ratio[:, None] * np.linspace(
+            courbe_pompe.debits[0], courbe_pompe.debits[-1], points_encadrement
+        )[None, :]
+        ecarts_noeuds = ecart(debits_noeuds, frequences[:, None])
+        changement = (ecarts_noeuds[:, :-1] >= 0) & (ecarts_noeuds[:, 1:] < 0)
+        trouve = changement.any(axis=1)
+        indices = np.argmax(changement, axis=1)
+        lignes = np.arange(nombre)
+        a, b = debits_noeuds[lignes, indices], debits_noeuds[lignes, indices + 1]
+        fa, fb = ecarts_noeuds[lignes, indices], ecarts_noeuds[lignes, indices + 1]
+        a, b = np.where(trouve, a, 0.0), np.where(trouve, b, 0.0)
+        fa, fb = np.where(trouve, fa, 1.0), np.where(trouve, fb, -1.0)
+
+        # Fausse position (variante Illinois), menée simultanément sur toutes les fréquences
+        for i in range(iterations_max):
+            c = (a * fb - b * fa) / (fb - fa)
+            fc = ecart(c, frequences)
+            encadre = fc * fb < 0
+            a = np.where(encadre, b, a)
+            fa = np.where(encadre, fb, fa * 0.5)
+            b, fb = c, fc
+            if np.all(np.abs(fc[trouve]) <= tolerance * (1.0 + np.abs(courbe_pompe.hauteur(c, frequences)[trouve]))):
+                break
+
+        debit_m3h = np.where(trouve, b, np.nan)
+        hauteur_manometrique = np.where(trouve, courbe_pompe.hauteur(b, frequences), np.nan)
+
+        # Puissance hydraulique au point de fonctionnement
+        donnees = installation.donnees_base
+        masse_volumique = self.calculer_proprietes_fluide(donnees.fluide, donnees.temperature).masse_volumique
+        puissance_hydraulique = masse_volumique * g * (debit_m3h / 3600.0) * hauteur_manometrique / 1000.0
+
+        # Rendement aux points homologues (inchangé par les lois de similitude)
+        rendement = vide.copy()
+        if courbe_pompe.a_rendement:
+            rendement = np.where(trouve, courbe_pompe.rendement(debit_m3h, frequences), np.nan)
+
+        # Puissance absorbée : courbe de puissance (P ∝ n³), à défaut via le rendement pompe
+        if courbe_pompe.a_puissance:
+            puissance_absorbee = courbe_pompe.puissance(debit_m3h, frequences)
+        elif courbe_pompe.a_rendement:
+            puissance_absorbee = puissance_hydraulique / np.where(rendement > 0, rendement, np.nan)
+        else:
+            puissance_absorbee = puissance_hydraulique / donnees.rendement_mecanique
+        puissance_electrique = puissance_absorbee / donnees.rendement_electrique
+
+        return PointsFonctionnement(
+            frequences=frequences,
+            debit_m3h=debit_m3h,
+            hauteur_manometrique=hauteur_manometrique,
+            rendement=rendement,
+            puissance_hydraulique=puissance_hydraulique,
+            puissance_electrique=np.where(trouve, puissance_electrique, np.nan),
+            trouve=trouve
+        )
+
+    def segments_installation(self, installation):
+        """Tronçons de l'installation ; à défaut, un tronçon d'aspiration et un de refoulement tirés de la géométrie
+
+        Les tronçons ne portent que leurs propres points singuliers : ceux de l'installation
+        leur sont rattachés par emplacement (rattacher_singuliers).
+        """
+        if installation.segments:
+            return list(installation.segments)
+        donnees = installation.donnees_base
+        geometrie = installation.geometrie
+        return [
+            Segment(geometrie.longueur_aspiration, donnees.diametre, donnees.materiau, 'aspiration'),
+            Segment(max(geometrie.longueur_totale - geometrie.longueur_aspiration, 0.0),
+                    donnees.diametre, donnees.materiau, 'refoulement')
+        ]
+
+    def regrouper_singuliers(self, points_singuliers, figer=True):
+        """Points singuliers de l'installation par emplacement : {emplacement: (points, nombre, ΣK)}
+
+        Les totaux par emplacement d'un registre sont repris ; si figer, il est d'abord
+        copié (les résultats qui le détaillent ne suivent pas ses modifications
+        ultérieures). Une liste, cas courant de quelques points, est seulement répartie par
+        emplacement : construire un registre coûterait plus que le calcul lui-même. points
+        est le registre ou la liste des points de l'emplacement (groupe de DetailsSinguliers).
+        """
+        if not points_singuliers:
+            return {}
+        coefficients = self.coefficients_singuliers
+        if isinstance(points_singuliers, RegistreSinguliers):
+            registre = points_singuliers.copie() if figer else points_singuliers
+            return {
+                emplacement: (registre, registre.nombres[emplacement],
+                              sum(coefficients.get(type, 0.0) * quantite for type, quantite in totaux.items()))
+                for emplacement, totaux in registre.totaux.items()
+            }
+
+        listes = {}
+        sommes = {}
+        for point in points_singuliers:
+            if isinstance(point, dict):
+                point = PointSingulier(**point)
+            if point.quantite != int(point.quantite) or point.quantite < 0:
+                raise ValueError(f"Quantité invalide pour {point.type} : {point.quantite}")
+            emplacement = point.emplacement
+            liste = listes.get(emplacement)
+            if liste is None:
+                liste = listes[emplacement] = []
+                sommes[emplacement] = 0.0
+            liste.append(point)
+            sommes[emplacement] += coefficients.get(point.type, 0.0) * point.quantite
+        return {emplacement: (liste, len(liste), sommes[emplacement]) for emplacement, liste in listes.items()}
+
+    def rattacher_singuliers(self, emplacements, segments, troncons_explicites=True):
+        """Emplacements de points singuliers rattachés à chaque tronçon (liste de listes, une par tronçon)
+
+        'aspiration' : dernier tronçon d'aspiration (entrée de la pompe) ; indice : ce
+        tronçon ; tout autre emplacement : premier tronçon de refoulement. Un indice est
+        refusé si les tronçons ne sont pas explicites (conduite simple) : il ne désigne
+        alors aucun tronçon relevé.
+        """
+        rattachements = [[] for segment in segments]
+        if not emplacements:
+            return rattachements
+        aspiration = [i for i, segment in enumerate(segments) if segment.emplacement == 'aspiration']
+        refoulement = [i for i, segment in enumerate(segments) if segment.emplacement != 'aspiration']
+        for emplacement in emplacements:
+            if isinstance(emplacement, int):
+                if not troncons_explicites:
+                    raise ValueError(f"Point singulier sur le tronçon {emplacement + 1} : "
+                                     "l'installation n'est pas décrite par tronçons")
+                if not 0 <= emplacement < len(segments):
+                    raise ValueError(f"Point singulier sur le tronçon {emplacement + 1} : "
+                                     f"l'installation en compte {len(segments)}")
+                indice = emplacement
+            elif emplacement == 'aspiration':
+                indice = aspiration[-1] if aspiration else 0
+            else:
+                indice = refoulement[0] if refoulement else 0
+            rattachements[indice].append(emplacement)
+        return rattachements
+
+    def coefficients_troncons(self, segments, groupes, rattachements):
+        """ΣK de chaque tronçon : ses propres points et ceux des emplacements qui lui sont rattachés
+
+        groupes : points regroupés par emplacement (regrouper_singuliers).
+        """
+        coefficients = self.coefficients_singuliers
+        return [
+            (sum(coefficients.get(point.type, 0.0) * float(point.quantite) for point in segment.points_singuliers)
+             if segment.points_singuliers else 0.0)
+            + (sum(groupes[emplacement][2] for emplacement in emplacements) if emplacements else 0.0)
+            for segment, emplacements in zip(segments, rattachements)
+        ]
+
+    def compiler_segments(self, installation):
+        """Compile les tronçons de l'installation en tableaux pour les calculs vectorisés"""
+        import numpy as np
+
+        segments = self.segments_installation(installation)
+        diametre = np.array([segment.diametre for segment in segments], dtype=float)
+        if diametre.size == 0 or np.any(diametre <= 0):
+            raise ValueError("Chaque tronçon doit avoir un diamètre strictement positif")
+
+        groupes = self.regrouper_singuliers(installation.points_singuliers, figer=False)
+        return TableauSegments(
+            longueur=np.array([segment.longueur for segment in segments], dtype=float),
+            diametre=diametre,
+            rugosite=np.array([self.materiaux[segment.materiau] for segment in segments], dtype=float),
+            coefficient_singulier=np.array(
+                self.coefficients_troncons(
+                    segments, groupes, self.rattacher_singuliers(groupes, segments, bool(installation.segments))
+                ),
+                dtype=float
+            ),
+            aspiration=np.array([segment.emplacement == 'aspiration' for segment in segments], dtype=bool),
+            segments=segments
+        )
+
+    def calculer_courbe_reseau(self, installation, debits_m3h, tableau_segments=None, g=9.81):
+        """Calcule la courbe du réseau HMT(Q) pour un tableau de débits en une passe vectorisée sur les tronçons"""
+        import numpy as np
+
+        donnees = installation.donnees_base
+        geometrie = installation.geometrie
+        debits_m3h = np.asarray(debits_m3h, dtype=float)
+        if tableau_segments is None:
+            tableau_segments = self.compiler_segments(installation)
+        D = tableau_segments.diametre
+
+        proprietes_fluide = self.calculer_proprietes_fluide(donnees.fluide, donnees.temperature)
+
+        # Vitesse, Reynolds et coefficient de friction par débit (axes en tête) et par tronçon (dernier axe)
+        vitesse = debits_m3h[..., None] / (3600.0 * pi / 4.0 * D**2)
+        nombre_reynolds = vitesse * (D / proprietes_fluide.viscosite_cinematique)
+        f = self.calculer_coefficient_friction_lot(nombre_reynolds, tableau_segments.rugosite / D)
+
+        # Darcy-Weisbach et ΣK·v²/2g, tronçon par tronçon
+        hauteur_cinetique = vitesse**2 / (2.0 * g)
+        pertes_lineaires = f * (tableau_segments.longueur / D) * hauteur_cinetique
+        pertes_singulieres = tableau_segments.coefficient_singulier * hauteur_cinetique
+        pertes_troncons = pertes_lineaires + pertes_singulieres
+
+        hauteur_manometrique = (
+            geometrie.hauteur_montee - geometrie.hauteur_descente + pertes_troncons.sum(axis=-1)
+        )
+
+        return CourbeReseau(
+            debits_m3h=debits_m3h,
+            vitesse=vitesse,
+            nombre_reynolds=nombre_reynolds,
+            coefficient_friction=f,
+            pertes_lineaires=pertes_lineaires.sum(axis=-1),
+            pertes_singulieres=pertes_singulieres.sum(axis=-1),
+            pertes_aspiration=pertes_troncons[..., tableau_segments.aspiration].sum(axis=-1),
+            hauteur_manometrique=hauteur_manometrique
+        )
+
+    def calculer_pertes_totales(self, installation, g=9.81):
+        """Calcule toutes les pertes de charge et le NPSH"""
+        donnees = installation.donnees_base
+
+        # Conversion du débit
+        debit_m3s = self.convertir_debit_m3h_vers_m3s(donnees.debit_m3h)
+
+        # Calcul des propriétés du fluide
+        proprietes_fluide = self.calculer_proprietes_fluide(donnees.fluide, donnees.temperature)
+
+        # Points singuliers par emplacement, figés : les résultats ne suivent pas les modifications ultérieures
+        groupes = self.regrouper_singuliers(installation.points_singuliers)
+
+        # Pertes par tronçon : passe vectorisée pour les conduites détaillées, boucle scalaire sinon
+        if len(installation.segments) > SEUIL_TRONCONS_VECTORISES:
+            tableau = self.compiler_segments(installation)
+            segments = tableau.segments
+            courbe = self.calculer_courbe_reseau(installation, donnees.debit_m3h, tableau, g)
+            vitesses = courbe.vitesse.tolist()
+            reynolds = courbe.nombre_reynolds.tolist()
+            frictions = courbe.coefficient_friction.tolist()
+            hauteurs_cinetiques = courbe.vitesse**2 / (2.0 * g)
+            pertes_lineaires = (courbe.coefficient_friction * (tableau.longueur / tableau.diametre)
+                                * hauteurs_cinetiques).tolist()
+            pertes_singulieres = (tableau.coefficient_singulier * hauteurs_cinetiques).tolist()
+        else:
+            segments = self.segments_installation(installation)
+            rattachements = self.rattacher_singuliers(groupes, segments, bool(installation.segments))
+            coefficients = self.coefficients_troncons(segments, groupes, rattachements)
+            vitesses, reynolds, frictions, pertes_lineaires, pertes_singulieres = [], [], [], [], []
+            for segment, coefficient in zip(segments, coefficients):
+                if segment.diametre <= 0:
+                    raise ValueError("Chaque tronçon doit avoir un diamètre strictement positif")
+                vitesse = self.calculer_vitesse(debit_m3s, self.calculer_section(segment.diametre))
+                Re = self.calculer_nombre_reynolds(vitesse, segment.diametre, proprietes_fluide.viscosite_cinematique)
+                f = self.calculer_coefficient_friction(
+                    Re, self.calculer_rugosite_relative(self.materiaux[segment.materiau], segment.diametre)
+                )
+                vitesses.append(vitesse)
+                reynolds.append(Re)
+                frictions.append(f)
+                pertes_lineaires.append(self.calculer_pertes_lineaires(f, segment.longueur, segment.diametre, vitesse, g))
+                pertes_singulieres.append(coefficient * vitesse**2 / (2.0 * g))
+
+        # Détail des pertes par tronçon ; points singuliers totalisés par emplacement, détaillés à la demande
+        details_segments = []
+        groupes_singuliers = []
+        totaux_singuliers = {}
+        if len(installation.segments) > SEUIL_TRONCONS_VECTORISES:
+            rattachements = self.rattacher_singuliers(groupes, segments, True)
+        pertes_aspiration_totales = 0.0
+        for i, segment in enumerate(segments):
+            details_segments.append(DetailSegment(
+                longueur=segment.longueur,
+                diametre=segment.diametre,
+                materiau=segment.materiau,
+                emplacement=segment.emplacement,
+                vitesse=vitesses[i],
+                nombre_reynolds=reynolds[i],
+                coefficient_friction=frictions[i],
+                pertes_lineaires=pertes_lineaires[i],
+                pertes_singulieres=pertes_singulieres[i]
+            ))
+            if segment.emplacement == 'aspiration':
+                pertes_aspiration_totales += pertes_lineaires[i] + pertes_singulieres[i]
+            hauteur_cinetique = vitesses[i]**2 / (2.0 * g)
+            if segment.points_singuliers:
+                coefficient = sum(
+                    self.coefficients_singuliers.get(point.type, 0.0) * float(point.quantite)
+                    for point in segment.points_singuliers
+                )
+                groupes_singuliers.append((segment.points_singuliers, i, hauteur_cinetique))
+                totaux_singuliers[i] = {'nombre': len(segment.points_singuliers), 'coefficient': coefficient,
+                                        'perte': coefficient * hauteur_cinetique}
+            for emplacement in rattachements[i]:
+                points, nombre, coefficient = groupes[emplacement]
+                groupes_singuliers.append((points, emplacement, hauteur_cinetique))
+                total = totaux_singuliers.setdefault(emplacement, {'nombre': 0, 'coefficient': 0.0, 'perte': 0.0})
+                total['nombre'] += nombre
+                total['coefficient'] += coefficient
+                total['perte'] += coefficient * hauteur_cinetique
+
+        # Grandeurs caractéristiques : tronçon le plus long
+        reference = max(range(len(segments)), key=lambda i: segments[i].longueur)
+        diametre = segments[reference].diametre
+        section = self.calculer_section(diametre)
+        vitesse = vitesses[reference]
+        Re = reynolds[reference]
+        rugosite = self.materiaux[segments[reference].materiau]
+
+        # Pertes de charge totales (les pertes d'aspiration ne portent que sur les tronçons côté aspiration)
+        pertes_lineaires_totales = sum(pertes_lineaires)
+        pertes_singulieres_totales = sum(pertes_singulieres)
+        pertes_totales = pertes_lineaires_totales + pertes_singulieres_totales
+
+        # Hauteur manométrique totale
+        hauteur_manometrique = (
+            installation.geometrie.hauteur_montee -
+            installation.geometrie.hauteur_descente +
+            pertes_totales
+        )
+
+        # Puissance hydraulique
+        puissance_hydraulique = (
+            proprietes_fluide.masse_volumique * g * debit_m3s * hauteur_manometrique
+        ) / 1000.0  # en kW
+
+        # NPSH disponible
+        npsh_disponible = self.calculer_npsh_disponible(
+            donnees.pression_amont,
+            donnees.hauteur_geodesique_aspiration,
+            pertes_aspiration_totales,
+            proprietes_fluide.pression_vapeur,
+            proprietes_fluide.masse_volumique
+        )
+
+        # Marge de NPSH
+        marge_npsh = npsh_disponible - donnees.npsh_requis
+
+        # Calcul des puissances
+        puissances = self.calculer_puissances(donnees, puissance_hydraulique)
+
+        # Calcul du coup de bélier
+        coup_belier = self.calculer_coup_belier(installation, vitesse, section, proprietes_fluide, diametre)
+
+        return ResultatsCalcul(
+            diametre=diametre,
+            section=section,
+            vitesse=vitesse,
+            nombre_reynolds=Re,
+            rugosite=rugosite,
+            rugosite_relative=self.calculer_rugosite_relative(rugosite, diametre),
+            coefficient_friction=frictions[reference],
+            pertes_lineaires=pertes_lineaires_totales,
+            pertes_singulieres=pertes_singulieres_totales,
+            pertes_totales=pertes_totales,
+            pertes_aspiration=pertes_aspiration_totales,
+            hauteur_manometrique=hauteur_manometrique,
+            puissance_hydraulique=puissance_hydraulique,
+            proprietes_fluide=proprietes_fluide,
+            npsh_disponible=npsh_disponible,
+            marge_npsh=marge_npsh,
+            details_singuliers=DetailsSinguliers(groupes_singuliers, self.coefficients_singuliers),
+            segments=details_segments,
+            debit_m3s=debit_m3s,
+            regime_ecoulement='Turbulent' if Re > 4000 else 'Laminaire' if Re < 2000 else 'Transition',
+            puissances=puissances,
+            coup_belier=coup_belier,
+            totaux_singuliers=totaux_singuliers
+        )
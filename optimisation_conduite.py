@@ -0,0 +1,226 @@
+"""Optimisation du diamètre et du matériau de la conduite.
+
+Toutes les combinaisons (diamètre du catalogue × matériau) sont évaluées en une seule
+passe vectorisée : pertes de charge, vitesse, puissance électrique, coût annuel de
+l'énergie, estimation de l'investissement et coût global actualisé sur la durée de
+vie. Les candidats qui ne respectent pas les contraintes (fenêtre de vitesse, marge
+NPSH, surpression de coup de bélier) sont écartés du classement. La surpression est
+calculée avec le module d'Young et l'épaisseur de paroi propres à chaque matériau
+candidat (rapport diamètre / épaisseur constant par matériau).
+"""
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+# Diamètres intérieurs standards (m), du DN20 au DN1000
+DIAMETRES_STANDARDS = (
+    0.0203, 0.0263, 0.0351, 0.0409, 0.0525, 0.0627, 0.0779, 0.1023, 0.1282, 0.1541,
+    0.2027, 0.2545, 0.3048, 0.3366, 0.3874, 0.4382, 0.4890, 0.5906, 0.7366, 0.8890, 0.9900
+)
+
+# Coût indicatif posé (€/m) d'une conduite de diamètre de référence (0,1 m)
+COUTS_MATERIAUX = {
+    'Acier': 120.0,
+    'PVC': 35.0,
+    'PEHD': 45.0,
+    'Fonte': 110.0,
+    'Béton': 90.0,
+    'Cuivre': 200.0,
+    'Acier galvanisé': 140.0
+}
+
+# Module d'Young indicatif (Pa) de la paroi, par matériau
+MODULES_YOUNG_MATERIAUX = {
+    'Acier': 210e9,
+    'PVC': 3.0e9,
+    'PEHD': 1.0e9,
+    'Fonte': 170e9,
+    'Béton': 30e9,
+    'Cuivre': 120e9,
+    'Acier galvanisé': 210e9
+}
+
+# Rapport indicatif diamètre intérieur / épaisseur de paroi, par matériau (PVC et PEHD :
+# séries PN10 courantes, SDR 21 et SDR 17)
+RAPPORTS_DIAMETRE_EPAISSEUR = {
+    'Acier': 40.0,
+    'PVC': 19.0,
+    'PEHD': 15.0,
+    'Fonte': 25.0,
+    'Béton': 10.0,
+    'Cuivre': 40.0,
+    'Acier galvanisé': 40.0
+}
+
+
+@dataclass
+class ParametresEconomiques:
+    """Hypothèses économiques du calcul de coût global"""
+    prix_energie: float = 0.15  # €/kWh
+    heures_fonctionnement: float = 4000.0  # h/an
+    duree_vie: float = 30.0  # ans
+    taux_actualisation: float = 0.05
+    couts_materiaux: dict = field(default_factory=lambda: dict(COUTS_MATERIAUX))
+    cout_materiau_defaut: float = 100.0  # €/m pour un matériau absent de couts_materiaux
+    diametre_reference: float = 0.1
+    exposant_cout: float = 1.2  # Coût ∝ (D / D_référence)^exposant
+
+    def facteur_actualisation(self):
+        """Valeur actuelle d'une dépense annuelle constante sur la durée de vie"""
+        if self.taux_actualisation == 0:
+            return self.duree_vie
+        return (1.0 - (1.0 + self.taux_actualisation) ** -self.duree_vie) / self.taux_actualisation
+
+
+@dataclass
+class Contraintes:
+    """Filtres d'admissibilité des candidats"""
+    vitesse_min: float = 0.5  # m/s
+    vitesse_max: float = 3.0  # m/s
+    marge_npsh_min: float = 0.5  # m
+    surpression_max: float = None  # Pa, pas de limite si None
+
+
+@dataclass
+class ResultatsOptimisation:
+    """Évaluation de tous les candidats, avec le classement des candidats admissibles"""
+    diametre: 'np.ndarray'
+    materiau: 'np.ndarray'
+    vitesse: 'np.ndarray'
+    coefficient_friction: 'np.ndarray'
+    pertes_charge: 'np.ndarray'
+    hauteur_manometrique: 'np.ndarray'
+    puissance_electrique: 'np.ndarray'
+    cout_energie_annuel: 'np.ndarray'
+    cout_investissement: 'np.ndarray'
+    cout_global: 'np.ndarray'
+    marge_npsh: 'np.ndarray'
+    surpression: 'np.ndarray'
+    admissible: 'np.ndarray'
+    classement: 'np.ndarray'
+
+    def meilleurs(self, nombre=10):
+        """Retourne les meilleurs candidats admissibles, du coût global le plus faible au plus élevé"""
+        colonnes = [nom for nom in self.__dataclass_fields__ if nom not in ('admissible', 'classement')]
+        meilleurs = []
+        for indice in self.classement[:nombre]:
+            valeurs = (getattr(self, nom)[indice] for nom in colonnes)
+            meilleurs.append({
+                nom: valeur.item() if hasattr(valeur, 'item') else valeur
+                for nom, valeur in zip(colonnes, valeurs)
+            })
+        return meilleurs
+
+
+def optimiser_conduite(moteur, installation, diametres=DIAMETRES_STANDARDS, materiaux=None,
+                       economie=None, contraintes=None, modules_young=None, rapports_epaisseur=None, g=9.81):
+    """Évalue toutes les combinaisons diamètre × matériau et les classe par coût global
+
+    L'optimisation porte sur la conduite simple (un diamètre, un matériau) : une
+    installation décrite par tronçons est refusée (ValueError). modules_young et
+    rapports_epaisseur (matériau -> Pa, matériau -> D / e) remplacent les valeurs
+    indicatives ; un matériau absent garde le module et l'épaisseur de l'installation.
+    """
+    import numpy as np
+
+    from moteur_hydraulique import RegistreSinguliers
+
+    if installation.segments:
+        raise ValueError("L'optimisation ne porte que sur la conduite simple : l'installation est décrite par tronçons")
+
+    economie = economie or ParametresEconomiques()
+    contraintes = contraintes or Contraintes()
+    materiaux = moteur.materiaux if materiaux is None else materiaux
+
+    donnees = installation.donnees_base
+    geometrie = installation.geometrie
+    proprietes_fluide = moteur.calculer_proprietes_fluide(donnees.fluide, donnees.temperature)
+    registre = RegistreSinguliers.depuis(installation.points_singuliers)
+    somme_coefficients = registre.coefficient_total(moteur.coefficients_singuliers)
+    somme_coefficients_aspiration = registre.coefficient_total(moteur.coefficients_singuliers, 'aspiration')
+
+    # Grille diamètres × matériaux aplatie
+    noms_materiaux = list(materiaux)
+    D = np.repeat(np.asarray(diametres, dtype=float), len(noms_materiaux))
+    indices_materiaux = np.tile(np.arange(len(noms_materiaux)), len(diametres))
+    rugosite = np.array([materiaux[nom] for nom in noms_materiaux])[indices_materiaux]
+    cout_unitaire = np.array([
+        economie.couts_materiaux.get(nom, economie.cout_materiau_defaut) for nom in noms_materiaux
+    ])[indices_materiaux]
+
+    # Paroi de chaque candidat : module du matériau, épaisseur proportionnelle au diamètre
+    modules_young = MODULES_YOUNG_MATERIAUX if modules_young is None else modules_young
+    rapports_epaisseur = RAPPORTS_DIAMETRE_EPAISSEUR if rapports_epaisseur is None else rapports_epaisseur
+    module_young = np.array([
+        modules_young.get(nom, donnees.module_young_materiau) for nom in noms_materiaux
+    ])[indices_materiaux]
+    rapport_epaisseur = np.array([rapports_epaisseur.get(nom, np.nan) for nom in noms_materiaux])[indices_materiaux]
+    epaisseur = np.where(np.isnan(rapport_epaisseur), donnees.epaisseur_conduite, D / rapport_epaisseur)
+
+    # Écoulement
+    debit_m3s = donnees.debit_m3h / 3600.0
+    vitesse = debit_m3s / (np.pi * D**2 / 4.0)
+    nombre_reynolds = vitesse * D / proprietes_fluide.viscosite_cinematique
+    f = moteur.calculer_coefficient_friction_lot(nombre_reynolds, rugosite / D)
+    hauteur_cinetique = vitesse**2 / (2.0 * g)
+
+    # Pertes de charge et HMT (conduite simple de calculer_pertes_totales, un seul diamètre et un seul matériau)
+    pertes_charge = (f * geometrie.longueur_totale / D + somme_coefficients) * hauteur_cinetique
+    hauteur_manometrique = geometrie.hauteur_montee - geometrie.hauteur_descente + pertes_charge
+    pertes_aspiration = (f * geometrie.longueur_aspiration / D + somme_coefficients_aspiration) * hauteur_cinetique
+
+    # Puissances et coûts
+    puissance_hydraulique = proprietes_fluide.masse_volumique * g * debit_m3s * hauteur_manometrique / 1000.0
+    puissance_electrique = puissance_hydraulique / (donnees.rendement_mecanique * donnees.rendement_electrique)
+    cout_energie_annuel = puissance_electrique * economie.heures_fonctionnement * economie.prix_energie
+    cout_investissement = (
+        geometrie.longueur_totale * cout_unitaire * (D / economie.diametre_reference) ** economie.exposant_cout
+    )
+    cout_global = cout_investissement + cout_energie_annuel * economie.facteur_actualisation()
+
+    # NPSH disponible
+    masse_volumique = proprietes_fluide.masse_volumique
+    npsh_disponible = np.maximum(
+        (donnees.pression_amont - proprietes_fluide.pression_vapeur) / (masse_volumique * g)
+        + donnees.hauteur_geodesique_aspiration - pertes_aspiration,
+        0.0
+    )
+    marge_npsh = npsh_disponible - donnees.npsh_requis
+
+    # Surpression de Joukowsky (célérité d'Allievi fonction du diamètre et de la paroi du matériau)
+    K = proprietes_fluide.module_elasticite
+    celerite = np.sqrt(K / masse_volumique) / np.sqrt(1.0 + (K * D) / (module_young * epaisseur))
+    surpression = masse_volumique * celerite * vitesse
+
+    # Contraintes
+    admissible = (
+        (vitesse >= contraintes.vitesse_min)
+        & (vitesse <= contraintes.vitesse_max)
+        & (marge_npsh >= contraintes.marge_npsh_min)
+    )
+    if contraintes.surpression_max is not None:
+        admissible &= surpression <= contraintes.surpression_max
+
+    indices_admissibles = np.flatnonzero(admissible)
+    classement = indices_admissibles[np.argsort(cout_global[indices_admissibles], kind='stable')]
+
+    return ResultatsOptimisation(
+        diametre=D,
+        materiau=np.array(noms_materiaux, dtype=object)[indices_materiaux],
+        vitesse=vitesse,
+        coefficient_friction=f,
+        pertes_charge=pertes_charge,
+        hauteur_manometrique=hauteur_manometrique,
+        puissance_electrique=puissance_electrique,
+        cout_energie_annuel=cout_energie_annuel,
+        cout_investissement=cout_investissement,
+        cout_global=cout_global,
+        marge_npsh=marge_npsh,
+        surpression=surpression,
+        admissible=admissible,
+        classement=classement
+    )
@@ -0,0 +1,251 @@
+"""Fichier de projet : sauvegarde et restauration d'une étude complète.
+
+Un projet regroupe toutes les données d'entrée de la page : données de base,
+géométrie, tronçons, matériaux, fluides et coefficients singuliers personnalisés,
+registre des points singuliers et courbe de pompe importée. Le fichier est une
+archive zip qui contient :
+
+- ``projet.json`` : le manifeste (format, version, données scalaires, description des
+  tableaux et empreintes) ;
+- ``tableaux/<nom>`` : les colonnes numériques en binaire brut little-endian (entiers
+  64 bits 'q' ou flottants 64 bits 'd'), sans conversion texte.
+
+Le manifeste porte deux empreintes SHA-256 : ``empreinte``, calculée sur tout le
+contenu du fichier et vérifiée au chargement, et ``empreinte_calcul``, celle des
+données d'entrée du calcul. Cette dernière est la clé du cache des résultats, si
+bien que les résultats déjà calculés pour un projet rechargé sont repris tels quels.
+
+Exemple :
+    enregistrer_projet(projet, 'etude.ndc')
+    projet = charger_projet('etude.ndc')
+"""
+
+import hashlib
+import io
+import json
+import sys
+import zipfile
+from array import array
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from moteur_hydraulique import RegistreSinguliers
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+FORMAT_PROJET = 'ndc_pompage/projet'
+VERSION_PROJET = 1
+EXTENSION_PROJET = '.ndc'
+
+MANIFESTE = 'projet.json'
+REPERTOIRE_TABLEAUX = 'tableaux/'
+
+
+@dataclass
+class Projet:
+    """Données d'entrée d'une étude, au format de la session de la page"""
+    donnees_base: dict
+    geometrie: dict
+    materiaux: dict
+    fluides: dict
+    coefficients_singuliers: dict
+    points_singuliers: RegistreSinguliers = field(default_factory=RegistreSinguliers)
+    segments: list = field(default_factory=list)
+    donnees_pompe: 'pd.DataFrame | None' = None
+
+    def empreinte_calcul(self):
+        """Empreinte des données dont dépendent les résultats : clé du cache des résultats"""
+        from cache_calculs import empreinte
+
+        return empreinte(
+            self.donnees_base,
+            self.geometrie,
+            self.points_singuliers,
+            self.segments,
+            self.materiaux,
+            self.fluides,
+            self.coefficients_singuliers
+        )
+
+
+def _tableau(valeurs):
+    """Colonne numérique en tableau binaire ('q' si toutes entières, 'd' sinon) ; None si non numérique"""
+    valeurs = list(valeurs)
+    if not all(isinstance(valeur, (int, float)) and not isinstance(valeur, bool) for valeur in valeurs):
+        return None
+    if all(isinstance(valeur, int) for valeur in valeurs):
+        return array('q', valeurs)
+    return array('d', valeurs)
+
+
+def _octets(tableau):
+    """Octets little-endian d'un tableau"""
+    if sys.byteorder == 'big':
+        tableau = array(tableau.typecode, tableau)
+        tableau.byteswap()
+    return tableau.tobytes()
+
+
+def _depuis_octets(typecode, octets):
+    """Tableau relu depuis ses octets little-endian"""
+    if typecode not in ('q', 'd'):
+        raise ValueError(f"Type de tableau inconnu dans le projet : {typecode}")
+    tableau = array(typecode)
+    tableau.frombytes(octets)
+    if sys.byteorder == 'big':
+        tableau.byteswap()
+    return tableau
+
+
+class _Ecrivain:
+    """Répartit les colonnes entre le manifeste (texte) et les tableaux binaires"""
+
+    def __init__(self):
+        self.tableaux = {}  # nom -> array
+
+    def colonnes(self, prefixe, colonnes):
+        """Description de colonnes nom -> valeurs : tableau binaire si numérique, liste JSON sinon"""
+        description = {}
+        for nom, valeurs in colonnes.items():
+            tableau = _tableau(valeurs)
+            if tableau is None:
+                description[nom] = {'valeurs': list(valeurs)}
+            else:
+                cle = f"{prefixe}/{len(self.tableaux)}"
+                self.tableaux[cle] = tableau
+                description[nom] = {'tableau': cle, 'type': tableau.typecode}
+        return description
+
+
+def _empreinte_contenu(manifeste, tableaux):
+    """Empreinte SHA-256 du manifeste (hors empreinte) et des tableaux binaires"""
+    contenu = hashlib.sha256(json.dumps(
+        {cle: valeur for cle, valeur in manifeste.items() if cle != 'empreinte'},
+        sort_keys=True, ensure_ascii=False
+    ).encode('utf-8'))
+    for nom in sorted(tableaux):
+        contenu.update(nom.encode('utf-8'))
+        contenu.update(tableaux[nom])
+    return contenu.hexdigest()
+
+
+def projet_en_octets(projet):
+    """Sérialise un projet dans une archive zip ; retourne ses octets"""
+    ecrivain = _Ecrivain()
+    registre = projet.points_singuliers
+    segments = projet.segments
+    colonnes_segments = list(dict.fromkeys(cle for segment in segments for cle in segment))
+    manifeste = {
+        'format': FORMAT_PROJET,
+        'version': VERSION_PROJET,
+        'donnees_base': projet.donnees_base,
+        'geometrie': projet.geometrie,
+        'materiaux': projet.materiaux,
+        'fluides': projet.fluides,
+        'coefficients_singuliers': projet.coefficients_singuliers,
+        'points_singuliers': {
+            'types': registre.types,
+            'emplacements': registre.emplacements,
+            'colonnes': ecrivain.colonnes('points_singuliers', {
+                'codes_types': registre.codes_types.tolist(),
+                'quantites': registre.quantites.tolist(),
+                'codes_emplacements': registre.codes_emplacements.tolist()
+            })
+        },
+        'segments': {
+            'nombre': len(segments),
+            'colonnes': ecrivain.colonnes('segments', {
+                cle: [segment[cle] for segment in segments] for cle in colonnes_segments
+            })
+        },
+        'pompe': None if projet.donnees_pompe is None or projet.donnees_pompe.empty else {
+            'colonnes': ecrivain.colonnes('pompe', {
+                str(nom): projet.donnees_pompe[nom].tolist() for nom in projet.donnees_pompe.columns
+            })
+        },
+        'empreinte_calcul': projet.empreinte_calcul()
+    }
+    octets = {REPERTOIRE_TABLEAUX + nom: _octets(tableau) for nom, tableau in ecrivain.tableaux.items()}
+    manifeste['empreinte'] = _empreinte_contenu(manifeste, octets)
+
+    tampon = io.BytesIO()
+    with zipfile.ZipFile(tampon, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(MANIFESTE, json.dumps(manifeste, ensure_ascii=False, indent=1))
+        for nom, contenu in octets.items():
+            archive.writestr(nom, contenu)
+    return tampon.getvalue()
+
+
+def enregistrer_projet(projet, destination):
+    """Écrit un projet dans un fichier (chemin ou flux binaire)"""
+    octets = projet_en_octets(projet)
+    if hasattr(destination, 'write'):
+        destination.write(octets)
+    else:
+        with open(destination, 'wb') as fichier:
+            fichier.write(octets)
+
+
+def lire_manifeste(source):
+    """Manifeste et tableaux binaires d'un projet, après contrôle du format, de la version et de l'empreinte"""
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    try:
+        with zipfile.ZipFile(source) as archive:
+            manifeste = json.loads(archive.read(MANIFESTE).decode('utf-8'))
+            octets = {nom: archive.read(nom) for nom in archive.namelist() if nom.startswith(REPERTOIRE_TABLEAUX)}
+    except (zipfile.BadZipFile, KeyError) as e:
+        raise ValueError(f"Fichier de projet illisible : {e}") from None
+
+    if manifeste.get('format') != FORMAT_PROJET:
+        raise ValueError("Ce fichier n'est pas un projet de calcul de pompage")
+    if not isinstance(manifeste.get('version'), int) or manifeste['version'] > VERSION_PROJET:
+        raise ValueError(f"Version de projet {manifeste.get('version')} non prise en charge "
+                         f"(version {VERSION_PROJET} au plus)")
+    if manifeste.get('empreinte') != _empreinte_contenu(manifeste, octets):
+        raise ValueError("Empreinte du projet incorrecte : fichier modifié ou endommagé")
+    return manifeste, octets
+
+
+def charger_projet(source):
+    """Lit un fichier de projet (chemin, flux binaire ou octets) ; retourne un Projet"""
+    manifeste, octets = lire_manifeste(source)
+
+    def colonnes(description):
+        return {
+            nom: (_depuis_octets(colonne['type'], octets[REPERTOIRE_TABLEAUX + colonne['tableau']]).tolist()
+                  if 'tableau' in colonne else colonne['valeurs'])
+            for nom, colonne in description.items()
+        }
+
+    points = manifeste['points_singuliers']
+    codes = colonnes(points['colonnes'])
+    registre = RegistreSinguliers.depuis_tableaux(
+        points['types'], points['emplacements'],
+        codes['codes_types'], codes['quantites'], codes['codes_emplacements']
+    )
+
+    valeurs_segments = colonnes(manifeste['segments']['colonnes'])
+    segments = [
+        {cle: valeurs[i] for cle, valeurs in valeurs_segments.items()}
+        for i in range(manifeste['segments']['nombre'])
+    ]
+
+    donnees_pompe = None
+    if manifeste['pompe'] is not None:
+        import pandas as pd
+
+        donnees_pompe = pd.DataFrame(colonnes(manifeste['pompe']['colonnes']))
+
+    return Projet(
+        donnees_base=manifeste['donnees_base'],
+        geometrie=manifeste['geometrie'],
+        materiaux=manifeste['materiaux'],
+        fluides=manifeste['fluides'],
+        coefficients_singuliers=manifeste['coefficients_singuliers'],
+        points_singuliers=registre,
+        segments=segments,
+        donnees_pompe=donnees_pompe
+    )
@@ -0,0 +1,628 @@
+"""Rapports PDF d'analyse hydraulique, à l'unité ou en lot.
+
+Le rapport est construit sans Streamlit à partir d'une Installation et de ses
+résultats : la page l'utilise pour l'export unitaire, et la génération en lot
+répartit les rapports d'un fichier de cas sur un pool de processus. Chaque
+processus prépare une seule fois les styles de paragraphes et de tableaux, et le
+filigrane est dessiné une fois par document sous forme de formulaire PDF (XObject)
+rappelé sur chaque page. Les rapports sont écrits dans un répertoire ou dans une
+archive zip (fichier ou flux), au fil de leur production.
+
+Exemple :
+    python rapport_pdf.py cas.csv rapports.zip --processus 8
+    python rapport_pdf.py cas.csv rapports/ --sans-graphiques
+"""
+
+import argparse
+import io
+import multiprocessing
+import os
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from functools import lru_cache
+
+from moteur_hydraulique import MoteurHydraulique, FLUIDES, charger_fluides
+
+
+TEXTE_FILIGRANE = "By Viveleau 2025 - https://viveleau-services.com/ is the owner"
+
+# Couleurs (en-tête, fond, texte de l'en-tête) des tableaux du rapport
+COULEURS_TABLEAUX = {
+    'base': ('#1f77b4', '#f8f9fa', 'whitesmoke'),
+    'fluide': ('#28a745', '#e8f5e8', 'whitesmoke'),
+    'ecoulement': ('#17a2b8', '#e3f2fd', 'whitesmoke'),
+    'pertes': ('#ffc107', '#fff3cd', 'black'),
+    'puissances': ('#6f42c1', '#f0e6ff', 'whitesmoke'),
+    'npsh': ('#dc3545', '#f8d7da', 'whitesmoke'),
+    'belier': ('#fd7e14', '#ffe5d0', 'whitesmoke')
+}
+
+# Nombre maximal de symboles de points singuliers dessinés par côté sur le schéma
+SYMBOLES_SCHEMA_MAX = 20
+
+# Moteur et courbe de pompe propres à chaque processus de génération
+_moteur = None
+_courbe_pompe = None
+
+
+def tracer_schema_installation(installation, resultats):
+    """Dessine un schéma schématique de l'installation"""
+    # Import différé : matplotlib n'est chargé qu'au premier tracé
+    import matplotlib.pyplot as plt
+    import matplotlib.lines as mlines
+    from matplotlib.patches import Circle, Rectangle, Polygon
+
+    fig, ax = plt.subplots(figsize=(14, 6))
+
+    # Configuration du graphique
+    ax.set_xlim(0, 12)
+    ax.set_ylim(0, 8)
+    ax.set_aspect('equal')
+    ax.axis('off')
+
+    # Couleurs
+    couleur_conduite = '#4682B4'
+    couleur_reservoir = '#87CEEB'
+    couleur_pompe = '#FF6B6B'
+    couleur_vanne = '#32CD32'
+    couleur_clapet = '#FFA500'
+
+    # Réservoir amont (aspiration)
+    reservoir_amont = Rectangle((1, 2), 0.5, 2, facecolor=couleur_reservoir, edgecolor='black')
+    ax.add_patch(reservoir_amont)
+    ax.text(0.5, 3.5, 'Réservoir\nAspiration', ha='center', va='center', fontsize=10, weight='bold')
+
+    # Conduite d'aspiration
+    ax.plot([1.5, 3], [3, 3], color=couleur_conduite, linewidth=3)
+
+    # Points singuliers sur aspiration
+    x_aspiration = 2.0
+    nombre_aspiration = 0
+    for point in installation.points_singuliers:
+        if point.emplacement == 'aspiration':
+            nombre_aspiration += 1
+            if nombre_aspiration > SYMBOLES_SCHEMA_MAX:
+                continue
+            if 'vanne' in point.type.lower():
+                ax.plot([x_aspiration, x_aspiration], [2.8, 3.2], color=couleur_vanne, linewidth=3)
+                ax.text(x_aspiration, 2.5, 'V', ha='center', va='center', fontsize=8, weight='bold')
+            elif 'clapet' in point.type.lower():
+                triangle = Polygon([[x_aspiration, 2.8], [x_aspiration-0.2, 3.2], [x_aspiration+0.2, 3.2]],
+                                   facecolor=couleur_clapet)
+                ax.add_patch(triangle)
+                ax.text(x_aspiration, 2.5, 'C', ha='center', va='center', fontsize=8, weight='bold')
+            x_aspiration += 0.3
+    if nombre_aspiration > SYMBOLES_SCHEMA_MAX:
+        ax.text(x_aspiration, 3.4, f"+{nombre_aspiration - SYMBOLES_SCHEMA_MAX}", ha='left', va='center', fontsize=8)
+
+    # Pompe
+    cercle_pompe = Circle((3.5, 3), 0.4, facecolor=couleur_pompe, edgecolor='black')
+    ax.add_patch(cercle_pompe)
+    ax.text(3.5, 3, 'P', ha='center', va='center', fontsize=12, weight='bold', color='white')
+    ax.text(3.5, 2.3, 'POMPE', ha='center', va='center', fontsize=9, weight='bold')
+
+    # Conduite refoulement horizontale
+    ax.plot([3.9, 7], [3, 3], color=couleur_conduite, linewidth=3)
+
+    # Points singuliers sur refoulement
+    x_refoulement = 4.5
+    nombre_refoulement = 0
+    for point in installation.points_singuliers:
+        if point.emplacement == 'refoulement':
+            nombre_refoulement += 1
+            if nombre_refoulement > SYMBOLES_SCHEMA_MAX:
+                continue
+            if 'vanne' in point.type.lower():
+                ax.plot([x_refoulement, x_refoulement], [2.8, 3.2], color=couleur_vanne, linewidth=3)
+                ax.text(x_refoulement, 2.5, 'V', ha='center', va='center', fontsize=8, weight='bold')
+            elif 'clapet' in point.type.lower():
+                triangle = Polygon([[x_refoulement, 2.8], [x_refoulement-0.2, 3.2], [x_refoulement+0.2, 3.2]],
+                                   facecolor=couleur_clapet)
+                ax.add_patch(triangle)
+                ax.text(x_refoulement, 2.5, 'C', ha='center', va='center', fontsize=8, weight='bold')
+            elif 'coude' in point.type.lower():
+                ax.plot([x_refoulement, x_refoulement+0.2], [3, 3.2], color='red', linewidth=2)
+                ax.text(x_refoulement, 2.5, '⟳', ha='center', va='center', fontsize=10)
+            x_refoulement += 0.3
+    if nombre_refoulement > SYMBOLES_SCHEMA_MAX:
+        ax.text(x_refoulement, 3.4, f"+{nombre_refoulement - SYMBOLES_SCHEMA_MAX}", ha='left', va='center', fontsize=8)
+
+    # Montée vers réservoir aval
+    ax.plot([7, 7], [3, 5], color=couleur_conduite, linewidth=3)
+
+    # Réservoir aval (refoulement)
+    reservoir_aval = Rectangle((6.5, 5), 0.5, 2, facecolor=couleur_reservoir, edgecolor='black')
+    ax.add_patch(reservoir_aval)
+    ax.text(8, 6, 'Réservoir\nRefoulement', ha='center', va='center', fontsize=10, weight='bold')
+
+    # Flèches d'écoulement
+    ax.annotate('', xy=(2.5, 3), xytext=(2.0, 3),
+                arrowprops=dict(arrowstyle='->', color='red', lw=2))
+    ax.annotate('', xy=(5, 3), xytext=(4.5, 3),
+                arrowprops=dict(arrowstyle='->', color='red', lw=2))
+
+    # Textes informatifs
+    ax.text(5, 0.8, f"Débit: {installation.donnees_base.debit_m3h:.1f} m³/h",
+            ha='center', va='center', fontsize=11, weight='bold',
+            bbox=dict(boxstyle="round,pad=0.3", facecolor="lightblue"))
+    ax.text(5, 0.4, f"HMT: {resultats['hauteur_manometrique']:.1f} m",
+            ha='center', va='center', fontsize=11, weight='bold',
+            bbox=dict(boxstyle="round,pad=0.3", facecolor="lightgreen"))
+
+    ax.text(5, 7.5, "SCHEMA DE L'INSTALLATION",
+            ha='center', va='center', fontsize=14, weight='bold')
+
+    # Légende
+    legend_elements = [
+        mlines.Line2D([], [], color=couleur_conduite, linewidth=3, label='Conduite'),
+        mlines.Line2D([], [], color=couleur_vanne, linewidth=3, label='Vanne'),
+        mlines.Line2D([], [], color=couleur_clapet, marker='^', markersize=10, label='Clapet', linewidth=0),
+        mlines.Line2D([], [], color='red', marker='>', markersize=10, label='Sens écoulement', linewidth=0)
+    ]
+    ax.legend(handles=legend_elements, loc='upper left', bbox_to_anchor=(0, 1))
+
+    plt.tight_layout()
+    return fig
+
+
+def tracer_courbe_reseau_pompes(moteur, installation, resultats, courbe_pompe=None):
+    """Dessine la courbe du réseau avec les courbes de pompes"""
+    import matplotlib.pyplot as plt
+    import numpy as np
+
+    fig, ax = plt.subplots(figsize=(12, 8))
+
+    # Calcul de la courbe du réseau pour différents débits (friction et pertes singulières recalculées à chaque débit)
+    debit_m3h = installation.donnees_base.debit_m3h
+    debits = np.linspace(0.0, debit_m3h * 2, 200)
+    courbe_reseau = moteur.calculer_courbe_reseau(installation, debits)
+
+    # Courbe du réseau
+    ax.plot(courbe_reseau.debits_m3h, courbe_reseau.hauteur_manometrique, 'b-', linewidth=3, label='Courbe du réseau')
+
+    # Courbes de pompes si disponibles (courbe compilée à l'import, lois de similitude)
+    if courbe_pompe is not None:
+        frequences = [50, 45, 40, 35, 30, 25]
+        couleurs = ['red', 'orange', 'green', 'purple', 'brown', 'pink']
+
+        for freq, couleur in zip(frequences, couleurs):
+            debits_pompe = np.linspace(courbe_pompe.debits[0], courbe_pompe.debits[-1], 100) * freq / 50.0
+            ax.plot(debits_pompe, courbe_pompe.hauteur(debits_pompe, freq),
+                    color=couleur, linestyle='--', linewidth=2,
+                    label=f'Pompe {freq}Hz')
+
+        # Intersections réelles des courbes de pompe avec la courbe du réseau
+        points = moteur.calculer_points_fonctionnement(installation, courbe_pompe, frequences)
+        ax.plot(points.debit_m3h[points.trouve], points.hauteur_manometrique[points.trouve],
+                'kD', markersize=7, label='Points de fonctionnement (variateur)')
+
+    # Point de fonctionnement actuel
+    ax.plot(debit_m3h, resultats['hauteur_manometrique'], 'ro', markersize=10, label='Point de fonctionnement')
+
+    ax.set_xlabel('Débit (m³/h)', fontsize=12, weight='bold')
+    ax.set_ylabel('Hauteur Manométrique Totale (m)', fontsize=12, weight='bold')
+    ax.set_title('Courbe du Réseau et Courbes de Pompes', fontsize=14, weight='bold')
+    ax.grid(True, alpha=0.3)
+    ax.legend()
+
+    plt.tight_layout()
+    return fig
+
+
+def figure_en_png(fig, dpi=150):
+    """Rend une figure matplotlib en PNG et la ferme"""
+    import matplotlib.pyplot as plt
+
+    try:
+        img_buffer = io.BytesIO()
+        fig.savefig(img_buffer, format='png', dpi=dpi, bbox_inches='tight')
+        return img_buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+
+def reduire_png(png, largeur_max):
+    """Réduit une image PNG à largeur_max pixels de large (inchangée si déjà plus étroite)"""
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(png))
+    if image.width <= largeur_max:
+        return png
+    image = image.resize((largeur_max, round(image.height * largeur_max / image.width)), Image.LANCZOS)
+    img_buffer = io.BytesIO()
+    image.save(img_buffer, format='png')
+    return img_buffer.getvalue()
+
+
+@lru_cache(maxsize=None)
+def _ressources():
+    """Styles de paragraphes et de tableaux, préparés une seule fois par processus"""
+    # Import différé : reportlab n'est chargé qu'à la génération du premier rapport
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+
+    styles = getSampleStyleSheet()
+
+    # Créer un style personnalisé pour les titres
+    titre_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=16,
+        spaceAfter=30,
+        textColor=colors.HexColor('#1f77b4')
+    )
+
+    styles_tableaux = {}
+    for nom, (entete, fond, texte) in COULEURS_TABLEAUX.items():
+        commandes = [
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor(entete)),
+            ('TEXTCOLOR', (0, 0), (-1, 0), getattr(colors, texte)),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor(fond)),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]
+        if nom == 'base':
+            commandes += [
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 10),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                ('FONTSIZE', (0, 1), (-1, -1), 9)
+            ]
+        else:
+            commandes.append(('FONTSIZE', (0, 0), (-1, -1), 9))
+        styles_tableaux[nom] = TableStyle(commandes)
+
+    return styles, titre_style, styles_tableaux
+
+
+def _ajouter_filigrane(canvas, doc):
+    """Dessine le filigrane une fois par document dans un formulaire PDF, puis le rappelle sur la page"""
+    if not canvas.hasForm('filigrane'):
+        canvas.beginForm('filigrane')
+        canvas.saveState()
+
+        # Noir avec transparence, en diagonale, répété sur toute la page
+        canvas.setFillColorRGB(0, 0, 0, alpha=0.1)
+        canvas.setFont("Helvetica", 16)
+        canvas.rotate(45)
+        for i in range(-3, 4):
+            for j in range(-3, 4):
+                canvas.drawCentredString(x=100 + i * 200, y=100 + j * 150, text=TEXTE_FILIGRANE)
+
+        canvas.restoreState()
+        canvas.endForm()
+    canvas.doForm('filigrane')
+
+
+def construire_rapport(installation, resultats, images=(), date=None, erreur_graphiques=None):
+    """Construit le rapport PDF (bytes) d'une installation
+
+    resultats est le dictionnaire de ResultatsCalcul.en_dict() ; images est une suite de
+    (titre, PNG, hauteur en pouces) insérés dans la section des graphiques.
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Image, Spacer
+    from reportlab.lib.units import inch
+
+    styles, titre_style, styles_tableaux = _ressources()
+    donnees = installation.donnees_base
+    geometrie = installation.geometrie
+    date = date or datetime.now()
+
+    def tableau(lignes, style):
+        table = Table(lignes, colWidths=[200, 100, 50])
+        table.setStyle(styles_tableaux[style])
+        return table
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    story = []
+
+    # Titre principal
+    story.append(Paragraph("RAPPORT D'ANALYSE HYDRAULIQUE COMPLET", styles['Title']))
+    story.append(Spacer(1, 20))
+
+    # Date et informations générales
+    story.append(Paragraph(f"<b>Date du rapport:</b> {date.strftime('%d/%m/%Y %H:%M')}", styles['Normal']))
+    story.append(Spacer(1, 20))
+
+    # Section 1: Données de base
+    story.append(Paragraph("1. DONNÉES DE BASE DU SYSTÈME", titre_style))
+    story.append(tableau([
+        ['Paramètre', 'Valeur', 'Unité'],
+        ['Diamètre intérieur', f"{resultats['diametre']:.3f}", 'm'],
+        ['Matériau de la conduite', donnees.materiau, ''],
+        ['Débit nominal', f"{donnees.debit_m3h:.1f}", 'm³/h'],
+        ['Fluide', donnees.fluide, ''],
+        ['Température', f"{donnees.temperature:.1f}", '°C'],
+        ['Longueur totale conduite', f"{geometrie.longueur_totale:.1f}", 'm'],
+        ['Hauteur de montée', f"{geometrie.hauteur_montee:.1f}", 'm'],
+        ['Hauteur de descente', f"{geometrie.hauteur_descente:.1f}", 'm']
+    ], 'base'))
+    story.append(Spacer(1, 20))
+
+    # Section 2: Graphiques
+    if images or erreur_graphiques:
+        story.append(Paragraph("2. SCHÉMA ET COURBES CARACTÉRISTIQUES", titre_style))
+        for titre, png, hauteur in images:
+            story.append(Paragraph(f"<b>{titre}:</b>", styles['Normal']))
+            story.append(Image(io.BytesIO(png), width=6*inch, height=hauteur*inch))
+            story.append(Spacer(1, 10))
+        if erreur_graphiques:
+            story.append(Paragraph(f"<b>Erreur lors de la génération des graphiques:</b> {erreur_graphiques}",
+                                   styles['Normal']))
+        story.append(Spacer(1, 10))
+
+    # Section 3: Résultats détaillés
+    story.append(Paragraph("3. RÉSULTATS DES CALCULS DÉTAILLÉS", titre_style))
+
+    # Sous-section 3.1: Propriétés du fluide
+    story.append(Paragraph("3.1 Propriétés du fluide", styles['Heading2']))
+    story.append(tableau([
+        ['Paramètre', 'Valeur', 'Unité'],
+        ['Masse volumique', f"{resultats['proprietes_fluide']['masse_volumique']:.1f}", 'kg/m³'],
+        ['Viscosité cinématique', f"{resultats['proprietes_fluide']['viscosite_cinematique']:.2e}", 'm²/s'],
+        ['Pression de vapeur', f"{resultats['proprietes_fluide']['pression_vapeur']/1000:.1f}", 'kPa'],
+        ['Régime d\'écoulement', resultats['regime_ecoulement'], '']
+    ], 'fluide'))
+    story.append(Spacer(1, 10))
+
+    # Sous-section 3.2: Caractéristiques d'écoulement
+    story.append(Paragraph("3.2 Caractéristiques d'écoulement", styles['Heading2']))
+    story.append(tableau([
+        ['Paramètre', 'Valeur', 'Unité'],
+        ['Vitesse d\'écoulement', f"{resultats['vitesse']:.2f}", 'm/s'],
+        ['Section d\'écoulement', f"{resultats['section']*10000:.1f}", 'cm²'],
+        ['Nombre de Reynolds', f"{resultats['nombre_reynolds']:.0f}", ''],
+        ['Coefficient de friction', f"{resultats['coefficient_friction']:.4f}", '']
+    ], 'ecoulement'))
+    story.append(Spacer(1, 10))
+
+    # Sous-section 3.3: Pertes de charge
+    story.append(Paragraph("3.3 Pertes de charge", styles['Heading2']))
+    story.append(tableau([
+        ['Type de pertes', 'Valeur', 'Unité'],
+        ['Pertes linéaires totales', f"{resultats['pertes_lineaires']:.2f}", 'm'],
+        ['Pertes singulières totales', f"{resultats['pertes_singulieres']:.2f}", 'm'],
+        ['Pertes d\'aspiration', f"{resultats['pertes_aspiration']:.2f}", 'm'],
+        ['Pertes totales', f"{resultats['pertes_totales']:.2f}", 'm'],
+        ['Hauteur manométrique totale', f"{resultats['hauteur_manometrique']:.2f}", 'm']
+    ], 'pertes'))
+    story.append(Spacer(1, 10))
+
+    # Sous-section 3.4: Puissances
+    story.append(Paragraph("3.4 Calcul des puissances", styles['Heading2']))
+    story.append(tableau([
+        ['Type de puissance', 'Valeur', 'Unité'],
+        ['Puissance hydraulique', f"{resultats['puissances']['puissance_hydraulique']:.2f}", 'kW'],
+        ['Puissance mécanique', f"{resultats['puissances']['puissance_mecanique']:.2f}", 'kW'],
+        ['Puissance électrique', f"{resultats['puissances']['puissance_electrique']:.2f}", 'kW'],
+        ['Rendement mécanique', f"{donnees.rendement_mecanique*100:.1f}", '%'],
+        ['Rendement électrique', f"{donnees.rendement_electrique*100:.1f}", '%'],
+        ['Rendement global', f"{(donnees.rendement_mecanique * donnees.rendement_electrique)*100:.1f}", '%']
+    ], 'puissances'))
+    story.append(Spacer(1, 10))
+
+    # Sous-section 3.5: Analyse NPSH
+    story.append(Paragraph("3.5 Analyse NPSH", styles['Heading2']))
+    statut_npsh = "✅ SUFFISANT" if resultats['marge_npsh'] >= 0.5 else "⚠️ FAIBLE" if resultats['marge_npsh'] >= 0 else "❌ INSUFFISANT"
+    story.append(tableau([
+        ['Paramètre NPSH', 'Valeur', 'Unité'],
+        ['NPSH requis', f"{donnees.npsh_requis:.2f}", 'm'],
+        ['NPSH disponible', f"{resultats['npsh_disponible']:.2f}", 'm'],
+        ['Marge NPSH', f"{resultats['marge_npsh']:.2f}", 'm'],
+        ['Statut', statut_npsh, '']
+    ], 'npsh'))
+    story.append(Spacer(1, 10))
+
+    # Sous-section 3.6: Analyse coup de bélier
+    story.append(Paragraph("3.6 Analyse coup de bélier", styles['Heading2']))
+    surpression = resultats['coup_belier']['surpression_max']
+    risque_belier = "ÉLEVÉ" if surpression > 500000 else "MODÉRÉ" if surpression > 200000 else "FAIBLE"
+    story.append(tableau([
+        ['Paramètre coup de bélier', 'Valeur', 'Unité'],
+        ['Célérité de l\'onde', f"{resultats['coup_belier']['celerite_onde']:.0f}", 'm/s'],
+        ['Temps de parcours', f"{resultats['coup_belier']['temps_parcours']:.2f}", 's'],
+        ['Surpression maximale', f"{surpression/1000:.1f}", 'kPa'],
+        ['Dépression au réservoir', f"{resultats['coup_belier']['depression_reservoir']:.2f}", 'm'],
+        ['Niveau de risque', risque_belier, '']
+    ], 'belier'))
+
+    # Construire le document avec le filigrane
+    doc.build(story, onFirstPage=_ajouter_filigrane, onLaterPages=_ajouter_filigrane)
+    return buffer.getvalue()
+
+
+def images_rapport(moteur, installation, resultats, courbe_pompe=None, dpi=150):
+    """Images (titre, PNG, hauteur en pouces) du rapport : schéma et courbe du réseau"""
+    return [
+        ("Schéma de l'installation", figure_en_png(tracer_schema_installation(installation, resultats), dpi), 3),
+        ("Courbe du réseau et caractéristiques pompes",
+         figure_en_png(tracer_courbe_reseau_pompes(moteur, installation, resultats, courbe_pompe), dpi), 4)
+    ]
+
+
+def _initialiser_processus(materiaux, fluides, coefficients_singuliers, courbe_pompe):
+    """Crée le moteur et prépare les styles une fois par processus"""
+    global _moteur, _courbe_pompe
+    import matplotlib
+    matplotlib.use('Agg')
+
+    _moteur = MoteurHydraulique(materiaux, fluides, coefficients_singuliers)
+    _courbe_pompe = courbe_pompe
+    _ressources()
+
+
+# Caractères interdits dans un nom de fichier (séparateurs de chemin, réservés Windows, contrôle)
+CARACTERES_INTERDITS = re.compile(r'[<>:"/\\|?*\x00-\x1f\x7f]')
+
+# Noms de périphériques réservés par Windows, quelle que soit l'extension
+NOMS_RESERVES = {'CON', 'PRN', 'AUX', 'NUL', *(f'COM{i}' for i in range(1, 10)), *(f'LPT{i}' for i in range(1, 10))}
+
+
+def nom_rapport(numero, ligne):
+    """Nom du fichier de rapport d'un cas : colonne 'nom' si renseignée, sinon numéro de ligne
+
+    Le nom est réduit à un nom de fichier simple : séparateurs de chemin et caractères
+    réservés remplacés par '_', points et espaces de tête et de fin retirés ("../x"
+    donne "_x"), 150 caractères au plus. Un nom vide après nettoyage retombe sur le
+    numéro de ligne.
+    """
+    from lot_scenarios import valeur_renseignee
+
+    nom = ''
+    if valeur_renseignee(ligne.get('nom')):
+        nom = CARACTERES_INTERDITS.sub('_', str(ligne['nom'])).strip(' .')[:150].rstrip(' .')
+        if nom.split('.')[0].upper() in NOMS_RESERVES:
+            nom = f"_{nom}"
+    return f"{nom or f'rapport_{numero + 1:05d}'}.pdf"
+
+
+def generer_rapport(numero, ligne, graphiques=True, dpi=150):
+    """Calcule un cas et construit son rapport ; retourne (nom du fichier, PDF, erreur)"""
+    from lot_scenarios import installation_depuis_ligne
+
+    nom = nom_rapport(numero, ligne)
+    try:
+        moteur = _moteur or MoteurHydraulique()
+        installation = installation_depuis_ligne(ligne)
+        resultats = moteur.calculer_pertes_totales(installation).en_dict()
+        images = images_rapport(moteur, installation, resultats, _courbe_pompe, dpi) if graphiques else ()
+        return nom, construire_rapport(installation, resultats, images), ''
+    except Exception as e:
+        return nom, None, f"{type(e).__name__}: {e}"
+
+
+class DestinationRepertoire:
+    """Écriture des rapports dans un répertoire"""
+
+    def __init__(self, chemin):
+        self.chemin = chemin
+        os.makedirs(chemin, exist_ok=True)
+
+    def ecrire(self, nom, contenu):
+        with open(os.path.join(self.chemin, nom), 'wb') as fichier:
+            fichier.write(contenu)
+
+    def fermer(self):
+        pass
+
+
+class DestinationZip:
+    """Écriture des rapports dans une archive zip (chemin ou flux binaire)"""
+
+    def __init__(self, sortie):
+        self.archive = zipfile.ZipFile(sortie, 'w', compression=zipfile.ZIP_DEFLATED)
+
+    def ecrire(self, nom, contenu):
+        self.archive.writestr(nom, contenu)
+
+    def fermer(self):
+        self.archive.close()
+
+
+def generer_rapports(cas, sortie, processus=None, graphiques=True, moteur=None, courbe_pompe=None, dpi=150,
+                     rapport=sys.stderr):
+    """Construit les rapports d'une suite de cas (dictionnaires de lot_scenarios) en parallèle
+
+    sortie est un répertoire, un chemin .zip ou un flux binaire (archive zip). Deux cas
+    de même nom donnent des fichiers suffixés (nom_2.pdf...). Les processus sont lancés
+    par forkserver (spawn à défaut) et non par fork : l'appelant peut être un serveur
+    multithread (Streamlit). Retourne la liste des (nom, erreur) des cas en échec.
+    """
+    moteur = moteur or MoteurHydraulique()
+    processus = processus or os.cpu_count() or 1
+    if isinstance(sortie, str) and not sortie.lower().endswith('.zip'):
+        destination = DestinationRepertoire(sortie)
+    else:
+        destination = DestinationZip(sortie)
+
+    debut = time.perf_counter()
+    nombre = 0
+    erreurs = []
+    noms = set()
+
+    def nom_unique(nom):
+        base, extension = os.path.splitext(nom)
+        suffixe = 1
+        while nom in noms:
+            suffixe += 1
+            nom = f"{base}_{suffixe}{extension}"
+        noms.add(nom)
+        return nom
+
+    def enregistrer(nom, resultat):
+        nonlocal nombre
+        _, contenu, erreur = resultat
+        if erreur:
+            erreurs.append((nom, erreur))
+        else:
+            destination.ecrire(nom, contenu)
+        nombre += 1
+        duree = time.perf_counter() - debut
+        if rapport is not None:
+            print(f"\r{nombre} rapports - {nombre / max(duree, 1e-9):.1f} rapports/s",
+                  end='', file=rapport, flush=True)
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=processus,
+            mp_context=multiprocessing.get_context(
+                'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            ),
+            initializer=_initialiser_processus,
+            initargs=(moteur.materiaux, moteur.fluides, moteur.coefficients_singuliers, courbe_pompe)
+        ) as pool:
+            # Nombre de rapports en vol borné : la mémoire ne dépend pas du nombre de cas.
+            # Noms dédoublonnés dans l'ordre des cas, indépendamment de l'ordre de fin des calculs.
+            en_cours = {}
+            for numero, ligne in enumerate(cas):
+                if len(en_cours) >= 2 * processus:
+                    termines, _ = wait(en_cours, return_when=FIRST_COMPLETED)
+                    for futur in termines:
+                        enregistrer(en_cours.pop(futur), futur.result())
+                en_cours[pool.submit(generer_rapport, numero, ligne, graphiques, dpi)] = nom_unique(
+                    nom_rapport(numero, ligne)
+                )
+            for futur in wait(en_cours).done:
+                enregistrer(en_cours[futur], futur.result())
+    finally:
+        destination.fermer()
+
+    if rapport is not None:
+        duree = time.perf_counter() - debut
+        print(f"\n{nombre} rapports en {duree:.1f} s, {len(erreurs)} en erreur", file=rapport)
+    return erreurs
+
+
+def main(arguments=None):
+    """Point d'entrée en ligne de commande"""
+    from lot_scenarios import lire_cas
+
+    parser = argparse.ArgumentParser(description="Génération en lot des rapports PDF")
+    parser.add_argument('entree', help="Fichier de cas (.csv ou .parquet), colonne optionnelle 'nom'")
+    parser.add_argument('sortie', help="Répertoire ou archive .zip des rapports")
+    parser.add_argument('--processus', type=int, default=None,
+                        help="Nombre de processus (par défaut : nombre de cœurs)")
+    parser.add_argument('--sans-graphiques', action='store_true',
+                        help="Rapports sans schéma ni courbe du réseau")
+    parser.add_argument('--fluides', default=None,
+                        help="Fichier de fluides supplémentaires (.csv ou .json, tables en température)")
+    args = parser.parse_args(arguments)
+
+    moteur = MoteurHydraulique(fluides={**FLUIDES, **charger_fluides(args.fluides)}) if args.fluides else None
+    cas = (ligne for lot in lire_cas(args.entree, 500) for _, ligne in lot)
+    erreurs = generer_rapports(cas, args.sortie, processus=args.processus, graphiques=not args.sans_graphiques,
+                               moteur=moteur)
+    for nom, erreur in erreurs:
+        print(f"ÉCHEC - {nom} : {erreur}", file=sys.stderr)
+    return 1 if erreurs else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
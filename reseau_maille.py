@@ -0,0 +1,316 @@
+"""Calcul de réseaux maillés ou ramifiés par la méthode du gradient global (Todini-Pilati).
+
+Le réseau est un graphe de nœuds (jonctions avec demande, ou réservoirs à charge
+imposée) reliés par des conduites et des pompes. Les débits de tous les liens et les
+charges de tous les nœuds sont obtenus par itérations de Newton : à chaque itération,
+les pertes de charge des conduites (Darcy-Weisbach, Colebrook-White vectorisé du
+moteur, points singuliers) et les hauteurs des pompes (CourbePompe, lois de
+similitude) sont linéarisées, puis le système réduit aux charges
+
+    (A21·D⁻¹·A12)·dH = A21·D⁻¹·r1 - r2
+
+est résolu en matrice creuse. Les pompes sont munies d'un clapet : une pompe qui ne
+peut vaincre la charge à débit nul est fermée.
+"""
+
+from dataclasses import dataclass, field
+from math import pi
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+# Résistance (m par m³/s) d'une pompe fermée par son clapet
+RESISTANCE_FERMEE = 1e8
+
+# Débit (m³/s) en dessous duquel la perte de charge est linéarisée, pour éviter une dérivée nulle
+DEBIT_MINIMAL = 1e-7
+
+# Pente minimale (m par m³/s) retenue pour la linéarisation d'une pompe
+PENTE_MINIMALE = 1e-3
+
+
+@dataclass
+class Noeud:
+    """Nœud du réseau : jonction avec demande, ou réservoir si la charge est imposée"""
+    nom: str
+    altitude: float = 0.0
+    demande_m3h: float = 0.0
+    charge_imposee: float = None  # m
+
+
+@dataclass
+class Conduite:
+    """Conduite reliant deux nœuds, le débit positif allant de amont vers aval"""
+    nom: str
+    amont: str
+    aval: str
+    longueur: float
+    diametre: float
+    materiau: str = 'Acier'
+    points_singuliers: list = field(default_factory=list)
+
+
+@dataclass
+class PompeReseau:
+    """Pompe placée sur un lien, refoulant de amont vers aval"""
+    nom: str
+    amont: str
+    aval: str
+    courbe: object  # CourbePompe
+    frequence: float = 50.0
+
+
+@dataclass
+class Reseau:
+    """Nœuds, conduites et pompes d'un réseau"""
+    noeuds: list
+    conduites: list
+    pompes: list = field(default_factory=list)
+
+    @classmethod
+    def depuis_dataframes(cls, noeuds, liens, courbe_pompe=None):
+        """Construit le réseau à partir des tableaux importés
+
+        noeuds : nom, altitude, demande_m3h, charge_imposee (vide pour une jonction)
+        liens : nom, amont, aval, longueur, diametre, materiau, points_singuliers
+        (Type:quantité séparés par ';', comme dans les fichiers de cas) et, pour une
+        pompe, la colonne pompe renseignée avec sa fréquence (Hz)
+        """
+        import pandas as pd
+
+        from moteur_hydraulique import lire_points_singuliers
+
+        def valeur(ligne, nom, defaut):
+            resultat = getattr(ligne, nom, defaut)
+            return defaut if pd.isna(resultat) else resultat
+
+        liste_noeuds = [
+            Noeud(
+                nom=str(ligne.nom),
+                altitude=float(valeur(ligne, 'altitude', 0.0)),
+                demande_m3h=float(valeur(ligne, 'demande_m3h', 0.0)),
+                charge_imposee=valeur(ligne, 'charge_imposee', None)
+            )
+            for ligne in noeuds.itertuples(index=False)
+        ]
+
+        conduites = []
+        pompes = []
+        for ligne in liens.itertuples(index=False):
+            frequence = valeur(ligne, 'pompe', None)
+            if frequence is not None:
+                if courbe_pompe is None:
+                    raise ValueError(f"Le lien {ligne.nom} est une pompe mais aucune courbe de pompe n'est chargée")
+                pompes.append(PompeReseau(str(ligne.nom), str(ligne.amont), str(ligne.aval),
+                                          courbe_pompe, float(frequence)))
+            else:
+                try:
+                    points = lire_points_singuliers(valeur(ligne, 'points_singuliers', None))
+                except ValueError as e:
+                    raise ValueError(f"Points singuliers du lien {ligne.nom} : {e}") from None
+                conduites.append(Conduite(str(ligne.nom), str(ligne.amont), str(ligne.aval),
+                                          float(ligne.longueur), float(ligne.diametre),
+                                          str(valeur(ligne, 'materiau', 'Acier')), points))
+        return cls(liste_noeuds, conduites, pompes)
+
+
+@dataclass
+class ResultatsReseau:
+    """Charges aux nœuds et débits dans les liens (conduites puis pompes)"""
+    noms_noeuds: list
+    charges: 'np.ndarray'  # m
+    pressions: 'np.ndarray'  # m de colonne au-dessus de l'altitude du nœud
+    noms_liens: list
+    est_pompe: 'np.ndarray'
+    debits_m3h: 'np.ndarray'
+    vitesses: 'np.ndarray'  # m/s, NaN pour les pompes
+    pertes_charge: 'np.ndarray'  # m, charge amont - charge aval (négative pour une pompe en service)
+    pompe_fermee: 'np.ndarray'
+    iterations: int
+    converge: bool
+    ecart_relatif: float
+
+
+def coefficient_friction_continu(moteur, Re, rugosite_relative):
+    """Coefficient de friction continu en Reynolds ; retourne aussi le masque laminaire
+
+    Entre Re = 2000 et 4000, f est interpolé linéairement entre la valeur laminaire et
+    celle de Colebrook-White à Re = 4000 : sans cette continuité, les conduites à
+    faible débit basculent d'un régime à l'autre et les itérations ne convergent pas.
+    """
+    import numpy as np
+
+    laminaire = Re < 2000.0
+    f_turbulent = moteur.calculer_coefficient_friction_lot(np.maximum(Re, 4000.0), rugosite_relative)
+    poids = np.clip((Re - 2000.0) / 2000.0, 0.0, 1.0)
+    f = np.where(laminaire, 64.0 / np.maximum(Re, 1e-12), 0.032 + poids * (f_turbulent - 0.032))
+    return f, laminaire
+
+
+def resoudre_reseau(moteur, reseau, fluide='Eau', temperature=20.0, tolerance=1e-6, iterations_max=100, g=9.81):
+    """Calcule les débits et les charges d'un réseau maillé ou ramifié (gradient global)"""
+    import numpy as np
+    from scipy import sparse
+    from scipy.sparse.csgraph import connected_components
+    from scipy.sparse.linalg import spsolve
+
+    proprietes_fluide = moteur.calculer_proprietes_fluide(fluide, temperature)
+
+    # Nœuds : charges imposées et demandes
+    noms_noeuds = [noeud.nom for noeud in reseau.noeuds]
+    index = {nom: i for i, nom in enumerate(noms_noeuds)}
+    if len(index) != len(noms_noeuds):
+        raise ValueError("Le réseau contient des noms de nœuds en double")
+    nombre_noeuds = len(noms_noeuds)
+    charge_imposee = np.array([
+        np.nan if noeud.charge_imposee is None else noeud.charge_imposee for noeud in reseau.noeuds
+    ], dtype=float)
+    fixe = ~np.isnan(charge_imposee)
+    if not fixe.any():
+        raise ValueError("Le réseau doit comporter au moins un nœud à charge imposée (réservoir)")
+    inconnus = np.flatnonzero(~fixe)
+    altitude = np.array([noeud.altitude for noeud in reseau.noeuds], dtype=float)
+    demandes = np.array([noeud.demande_m3h for noeud in reseau.noeuds], dtype=float)[inconnus] / 3600.0
+
+    # Liens : conduites puis pompes
+    liens = list(reseau.conduites) + list(reseau.pompes)
+    nombre_conduites = len(reseau.conduites)
+    nombre_liens = len(liens)
+    try:
+        amont = np.array([index[lien.amont] for lien in liens], dtype=int)
+        aval = np.array([index[lien.aval] for lien in liens], dtype=int)
+    except KeyError as erreur:
+        raise ValueError(f"Lien relié à un nœud inconnu : {erreur.args[0]}") from None
+
+    # Chaque partie connexe du réseau doit contenir un réservoir, sinon ses charges sont indéterminées
+    graphe = sparse.coo_matrix((np.ones(nombre_liens), (amont, aval)), shape=(nombre_noeuds, nombre_noeuds))
+    nombre_composantes, composantes = connected_components(graphe, directed=False)
+    sans_reservoir = np.setdiff1d(np.arange(nombre_composantes), composantes[fixe])
+    if sans_reservoir.size:
+        isoles = [noms_noeuds[i] for i in np.flatnonzero(np.isin(composantes, sans_reservoir))[:5]]
+        raise ValueError(f"Nœuds sans liaison à un réservoir : {', '.join(isoles)}")
+
+    # Matrice d'incidence liens × nœuds (+1 à l'amont, -1 à l'aval), séparée en charges inconnues / imposées
+    lignes = np.concatenate([np.arange(nombre_liens), np.arange(nombre_liens)])
+    incidence = sparse.csr_matrix(
+        (np.concatenate([np.ones(nombre_liens), -np.ones(nombre_liens)]), (lignes, np.concatenate([amont, aval]))),
+        shape=(nombre_liens, nombre_noeuds)
+    )
+    A12 = incidence[:, inconnus].tocsr()
+    A21 = A12.T.tocsr()
+    terme_impose = incidence[:, np.flatnonzero(fixe)] @ charge_imposee[fixe]
+
+    # Conduites : h = r(Q)·Q·|Q| avec r = (f·L/D + ΣK) / (2g·A²)
+    conduites = reseau.conduites
+    L = np.array([conduite.longueur for conduite in conduites], dtype=float)
+    D = np.array([conduite.diametre for conduite in conduites], dtype=float)
+    if np.any(D <= 0):
+        raise ValueError("Chaque conduite doit avoir un diamètre strictement positif")
+    rugosite_relative = np.array([moteur.materiaux[conduite.materiau] for conduite in conduites], dtype=float) / D
+    coefficients = moteur.coefficients_singuliers
+    somme_K = np.array([
+        sum(coefficients.get(point.type, 0.0) * float(point.quantite) for point in conduite.points_singuliers)
+        for conduite in conduites
+    ], dtype=float)
+    section = pi * D**2 / 4.0
+    terme_cinetique = 1.0 / (2.0 * g * section**2)
+
+    # Pompes regroupées par courbe pour des évaluations vectorisées
+    groupes_pompes = {}
+    for i, pompe in enumerate(reseau.pompes):
+        groupes_pompes.setdefault(id(pompe.courbe), (pompe.courbe, []))[1].append(i)
+    groupes_pompes = [(courbe, np.array(indices)) for courbe, indices in groupes_pompes.values()]
+    frequences = np.array([pompe.frequence for pompe in reseau.pompes], dtype=float)
+    hauteur_arret = np.zeros(len(reseau.pompes))
+    for courbe, indices in groupes_pompes:
+        hauteur_arret[indices] = courbe.hauteur(0.0, frequences[indices])
+    pompe_fermee = np.zeros(len(reseau.pompes), dtype=bool)
+
+    def pertes_et_pentes(Q):
+        """Perte de charge de chaque lien et sa dérivée par rapport au débit"""
+        h = np.empty(nombre_liens)
+        pente = np.empty(nombre_liens)
+
+        q = np.maximum(np.abs(Q[:nombre_conduites]), DEBIT_MINIMAL)
+        nombre_reynolds = q / section * D / proprietes_fluide.viscosite_cinematique
+        f, laminaire = coefficient_friction_continu(moteur, nombre_reynolds, rugosite_relative)
+        terme_friction = f * L / D
+        h[:nombre_conduites] = (terme_friction + somme_K) * terme_cinetique * Q[:nombre_conduites] * q
+        # En laminaire f ∝ 1/Q : la perte par friction est linéaire en Q
+        pente[:nombre_conduites] = (
+            ((2.0 - laminaire) * terme_friction + 2.0 * somme_K) * terme_cinetique * q
+        )
+
+        # Pompes : h = -H_pompe(Q), la pente de la courbe étant négative
+        Q_pompes = Q[nombre_conduites:]
+        for courbe, indices in groupes_pompes:
+            debits_m3h = Q_pompes[indices] * 3600.0
+            h[nombre_conduites + indices] = -courbe.hauteur(debits_m3h, frequences[indices])
+            pente[nombre_conduites + indices] = np.maximum(
+                -courbe.pente_hauteur(debits_m3h, frequences[indices]) * 3600.0, PENTE_MINIMALE
+            )
+        fermees = nombre_conduites + np.flatnonzero(pompe_fermee)
+        h[fermees] = RESISTANCE_FERMEE * Q[fermees]
+        pente[fermees] = RESISTANCE_FERMEE
+        return h, pente
+
+    # Initialisation : 1 m/s dans les conduites, milieu de la courbe pour les pompes
+    Q = np.empty(nombre_liens)
+    Q[:nombre_conduites] = section
+    for courbe, indices in groupes_pompes:
+        Q[nombre_conduites + indices] = 0.5 * courbe.debit_max(frequences[indices]) / 3600.0
+    H = np.full(inconnus.size, float(np.max(charge_imposee[fixe])))
+
+    converge = False
+    ecart_relatif = np.inf
+    iteration = 0
+    for iteration in range(1, iterations_max + 1):
+        h, pente = pertes_et_pentes(Q)
+        r1 = h - (A12 @ H + terme_impose)  # Équilibre des charges sur chaque lien
+        r2 = A21 @ Q + demandes  # Conservation des débits à chaque nœud
+
+        inverse_pente = 1.0 / pente
+        S = (A21 @ sparse.diags(inverse_pente) @ A12).tocsc()
+        dH = spsolve(S, A21 @ (inverse_pente * r1) - r2)
+        dQ = (A12 @ dH - r1) * inverse_pente
+        Q += dQ
+        H += dH
+
+        # Clapets : une pompe est fermée tant qu'elle ne peut vaincre la charge à débit nul
+        etat_precedent = pompe_fermee.copy()
+        if len(reseau.pompes):
+            charges = np.empty(nombre_noeuds)
+            charges[inconnus] = H
+            charges[fixe] = charge_imposee[fixe]
+            indices_pompes = np.arange(nombre_conduites, nombre_liens)
+            gain_requis = charges[aval[indices_pompes]] - charges[amont[indices_pompes]]
+            pompe_fermee[:] = (gain_requis > hauteur_arret) & ((Q[indices_pompes] <= 0) | etat_precedent)
+
+        ecart_relatif = np.sum(np.abs(dQ)) / max(np.sum(np.abs(Q)), DEBIT_MINIMAL)
+        if ecart_relatif <= tolerance and np.array_equal(etat_precedent, pompe_fermee):
+            converge = True
+            break
+
+    charges = np.empty(nombre_noeuds)
+    charges[inconnus] = H
+    charges[fixe] = charge_imposee[fixe]
+    Q[nombre_conduites + np.flatnonzero(pompe_fermee)] = 0.0
+    vitesses = np.full(nombre_liens, np.nan)
+    vitesses[:nombre_conduites] = Q[:nombre_conduites] / section
+
+    return ResultatsReseau(
+        noms_noeuds=noms_noeuds,
+        charges=charges,
+        pressions=charges - altitude,
+        noms_liens=[lien.nom for lien in liens],
+        est_pompe=np.arange(nombre_liens) >= nombre_conduites,
+        debits_m3h=Q * 3600.0,
+        vitesses=vitesses,
+        pertes_charge=charges[amont] - charges[aval],
+        pompe_fermee=pompe_fermee,
+        iterations=iteration,
+        converge=converge,
+        ecart_relatif=float(ecart_relatif)
+    )
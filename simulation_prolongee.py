@@ -0,0 +1,203 @@
+"""Simulation sur une période prolongée (profil journalier ou annuel de demande).
+
+À chaque pas de temps, la demande (m³/h) et les niveaux des réservoirs fixent le point
+de fonctionnement requis : la HMT est lue sur la courbe du réseau, décalée de la
+variation de hauteur géométrique, et la fréquence du variateur est celle pour laquelle
+la pompe (CourbePompe, lois de similitude) fournit cette HMT au débit demandé. Tous
+les pas sont traités ensemble, en tableaux sur l'axe du temps : une passe vectorisée
+pour les pertes de charge et une recherche de fréquence menée simultanément sur tous
+les pas. Les énergies, coûts et marges NPSH sont ensuite cumulés sur la période.
+"""
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+# Coefficients horaires d'un profil de distribution journalier type (moyenne égale à 1)
+PROFIL_JOURNALIER_TYPE = (
+    0.45, 0.40, 0.38, 0.38, 0.42, 0.60, 1.05, 1.45, 1.50, 1.30, 1.15, 1.10,
+    1.20, 1.15, 1.00, 0.95, 1.00, 1.15, 1.40, 1.50, 1.35, 1.05, 0.80, 0.67
+)
+
+
+@dataclass
+class ResultatsPeriode:
+    """Points de fonctionnement pas à pas et cumuls sur la période
+
+    Les pas à demande nulle sont des arrêts de la pompe ; les pas non satisfaits (HMT
+    hors d'atteinte à la fréquence maximale) ont des puissances NaN et sont exclus des
+    cumuls.
+    """
+    temps_h: 'np.ndarray'
+    demande_m3h: 'np.ndarray'
+    hauteur_manometrique: 'np.ndarray'  # m, HMT requise par le réseau
+    frequence: 'np.ndarray'  # Hz (NaN sans courbe de pompe)
+    hauteur_pompe: 'np.ndarray'  # m, supérieure à la HMT si la pompe est bridée à la fréquence minimale
+    rendement: 'np.ndarray'
+    puissance_electrique: 'np.ndarray'  # kW
+    energie_kwh: 'np.ndarray'
+    cout: 'np.ndarray'  # €
+    npsh_disponible: 'np.ndarray'  # m
+    marge_npsh: 'np.ndarray'  # m
+    satisfait: 'np.ndarray'
+    pas_temps_h: float
+
+    @property
+    def energie_totale(self):
+        """Énergie électrique consommée sur la période (kWh)"""
+        import numpy as np
+        return float(np.nansum(self.energie_kwh))
+
+    @property
+    def cout_total(self):
+        """Coût de l'énergie sur la période (€)"""
+        import numpy as np
+        return float(np.nansum(self.cout))
+
+    @property
+    def volume_pompe(self):
+        """Volume pompé sur les pas satisfaits (m³)"""
+        return float((self.demande_m3h * self.satisfait).sum() * self.pas_temps_h)
+
+    @property
+    def energie_specifique(self):
+        """Énergie spécifique moyenne (Wh/m³)"""
+        volume = self.volume_pompe
+        return self.energie_totale / volume * 1000.0 if volume > 0 else float('nan')
+
+    @property
+    def marge_npsh_min(self):
+        """Plus faible marge NPSH sur les pas de fonctionnement (m)"""
+        import numpy as np
+        marches = ~np.isnan(self.marge_npsh)
+        return float(self.marge_npsh[marches].min()) if marches.any() else float('nan')
+
+    @property
+    def heures_deficit(self):
+        """Durée pendant laquelle la demande n'est pas satisfaite (h)"""
+        return float((~self.satisfait).sum() * self.pas_temps_h)
+
+
+def lire_profil(tableau):
+    """Extrait le profil d'un tableau importé : demande_m3h et, optionnellement, niveau_aval,
+    niveau_aspiration (m) et prix_energie (€/kWh), une ligne par pas de temps"""
+    if 'demande_m3h' not in tableau.columns:
+        raise ValueError("Colonne demande_m3h introuvable dans le profil")
+    return {
+        nom: tableau[nom].to_numpy(dtype=float)
+        for nom in ('demande_m3h', 'niveau_aval', 'niveau_aspiration', 'prix_energie')
+        if nom in tableau.columns
+    }
+
+
+def profil_type(debit_m3h, jours=1):
+    """Demande horaire (m³/h) du profil journalier type, répété sur le nombre de jours donné"""
+    import numpy as np
+    return debit_m3h * np.tile(PROFIL_JOURNALIER_TYPE, jours)
+
+
+def simuler_periode(moteur, installation, demande_m3h, courbe_pompe=None, niveau_aval=0.0, niveau_aspiration=0.0,
+                    prix_energie=0.15, pas_temps_h=1.0, frequence_min=25.0, frequence_max=50.0,
+                    tolerance=1e-9, iterations_max=60, g=9.81):
+    """Simule l'installation sur un profil de demande (m³/h), un pas de temps par élément
+
+    niveau_aval et niveau_aspiration (m, scalaires ou un élément par pas) décalent les
+    niveaux des réservoirs par rapport à la géométrie : le premier augmente la hauteur
+    géométrique, le second la diminue et augmente le NPSH disponible. prix_energie
+    (€/kWh) peut varier à chaque pas. Sans courbe de pompe, la pompe fournit exactement
+    la HMT avec le rendement mécanique de l'installation. Sous la fréquence minimale,
+    la pompe tourne à frequence_min et l'excédent de hauteur est laminé.
+    """
+    import numpy as np
+
+    donnees = installation.donnees_base
+    demande_m3h = np.asarray(demande_m3h, dtype=float)
+    if demande_m3h.ndim != 1 or np.any(demande_m3h < 0):
+        raise ValueError("La demande doit être un profil de débits positifs ou nuls")
+    niveau_aval = np.broadcast_to(np.asarray(niveau_aval, dtype=float), demande_m3h.shape)
+    niveau_aspiration = np.broadcast_to(np.asarray(niveau_aspiration, dtype=float), demande_m3h.shape)
+    prix_energie = np.broadcast_to(np.asarray(prix_energie, dtype=float), demande_m3h.shape)
+
+    # Réseau : une passe vectorisée sur tous les pas de temps
+    courbe = moteur.calculer_courbe_reseau(installation, demande_m3h, g=g)
+    hauteur_manometrique = courbe.hauteur_manometrique + niveau_aval - niveau_aspiration
+    proprietes_fluide = moteur.calculer_proprietes_fluide(donnees.fluide, donnees.temperature)
+    masse_volumique = proprietes_fluide.masse_volumique
+
+    marche = demande_m3h > 0
+    satisfait = np.ones(demande_m3h.shape, dtype=bool)
+    frequence = np.where(marche, np.nan, 0.0)
+    hauteur_pompe = np.where(marche, hauteur_manometrique, 0.0)
+    rendement = np.full(demande_m3h.shape, np.nan)
+
+    if courbe_pompe is not None:
+        # Fréquence donnant la HMT requise au débit demandé, entre les bornes du variateur
+        r_min, r_max = frequence_min / 50.0, frequence_max / 50.0
+
+        def ecart(ratio):
+            return courbe_pompe.hauteur(demande_m3h, ratio * 50.0) - hauteur_manometrique
+
+        ecart_min, ecart_max = ecart(np.full(demande_m3h.shape, r_min)), ecart(np.full(demande_m3h.shape, r_max))
+        bride = marche & (ecart_min >= 0)
+        satisfait = ~marche | (ecart_max >= 0)
+        recherche = marche & satisfait & ~bride
+
+        # Fausse position (variante Illinois), menée simultanément sur tous les pas
+        a, b = np.full(demande_m3h.shape, r_min), np.full(demande_m3h.shape, r_max)
+        fa, fb = np.where(recherche, ecart_min, -1.0), np.where(recherche, ecart_max, 1.0)
+        for i in range(iterations_max):
+            c = (a * fb - b * fa) / (fb - fa)
+            fc = np.where(recherche, ecart(c), 0.0)
+            encadre = fc * fb < 0
+            a = np.where(encadre, b, a)
+            fa = np.where(encadre, fb, fa * 0.5)
+            b, fb = c, fc
+            if np.all(np.abs(fc) <= tolerance * (1.0 + np.abs(hauteur_manometrique))):
+                break
+
+        fonctionne = recherche | bride
+        frequence_calcul = np.where(bride, r_min, b) * 50.0
+        frequence = np.where(fonctionne, frequence_calcul, np.where(marche, np.nan, 0.0))
+        hauteur_pompe = np.where(fonctionne, courbe_pompe.hauteur(demande_m3h, frequence_calcul),
+                                 np.where(marche, np.nan, 0.0))
+        if courbe_pompe.a_rendement:
+            rendement = np.where(fonctionne, courbe_pompe.rendement(demande_m3h, frequence_calcul), np.nan)
+
+    # Puissances, mêmes hypothèses que calculer_points_fonctionnement
+    puissance_hydraulique = masse_volumique * g * (demande_m3h / 3600.0) * hauteur_pompe / 1000.0
+    if courbe_pompe is not None and courbe_pompe.a_puissance:
+        puissance_absorbee = courbe_pompe.puissance(demande_m3h, frequence_calcul)
+    elif courbe_pompe is not None and courbe_pompe.a_rendement:
+        puissance_absorbee = puissance_hydraulique / np.where(rendement > 0, rendement, np.nan)
+    else:
+        puissance_absorbee = puissance_hydraulique / donnees.rendement_mecanique
+    puissance_electrique = np.where(marche, puissance_absorbee / donnees.rendement_electrique, 0.0)
+    puissance_electrique = np.where(satisfait, puissance_electrique, np.nan)
+    energie_kwh = puissance_electrique * pas_temps_h
+
+    # NPSH disponible, le niveau d'aspiration s'ajoutant à la hauteur géodésique
+    npsh_disponible = np.maximum(
+        (donnees.pression_amont - proprietes_fluide.pression_vapeur) / (masse_volumique * g)
+        + donnees.hauteur_geodesique_aspiration + niveau_aspiration - courbe.pertes_aspiration,
+        0.0
+    )
+    npsh_disponible = np.where(marche, npsh_disponible, np.nan)
+
+    return ResultatsPeriode(
+        temps_h=np.arange(demande_m3h.size) * pas_temps_h,
+        demande_m3h=demande_m3h,
+        hauteur_manometrique=hauteur_manometrique,
+        frequence=frequence,
+        hauteur_pompe=hauteur_pompe,
+        rendement=rendement,
+        puissance_electrique=puissance_electrique,
+        energie_kwh=energie_kwh,
+        cout=energie_kwh * prix_energie,
+        npsh_disponible=npsh_disponible,
+        marge_npsh=npsh_disponible - donnees.npsh_requis,
+        satisfait=satisfait,
+        pas_temps_h=pas_temps_h
+    )
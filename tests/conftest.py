@@ -0,0 +1,6 @@
+"""Les modules du calculateur sont à la racine du dépôt, hors paquet"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,48 @@
+"""Point de fonctionnement pompe / réseau à chaque fréquence du variateur"""
+
+import pytest
+
+from moteur_hydraulique import Installation, MoteurHydraulique
+
+
+def courbe_pompe():
+    from courbe_pompe import CourbePompe
+
+    return CourbePompe(
+        debits=[0, 10, 20, 30, 40, 50, 60],
+        hauteurs=[32, 31.5, 30, 27.5, 24, 19.5, 14],
+        rendements=[0, 0.38, 0.58, 0.69, 0.72, 0.68, 0.57]
+    )
+
+
+def test_point_de_fonctionnement_a_l_intersection_des_courbes():
+    np = pytest.importorskip('numpy')
+    moteur = MoteurHydraulique()
+    installation = Installation()
+    installation.geometrie.hauteur_montee = 20.0
+    pompe = courbe_pompe()
+    frequences = (50, 45, 40)
+
+    points = moteur.calculer_points_fonctionnement(installation, pompe, frequences)
+
+    assert points.trouve.all()
+    reseau = moteur.calculer_courbe_reseau(installation, points.debit_m3h).hauteur_manometrique
+    assert points.hauteur_manometrique == pytest.approx(reseau, rel=1e-7)
+    assert points.hauteur_manometrique == pytest.approx(pompe.hauteur(points.debit_m3h, np.array(frequences)))
+    # Moins de vitesse, moins de débit
+    assert np.all(np.diff(points.debit_m3h) < 0)
+    masse_volumique = moteur.calculer_proprietes_fluide('Eau', 20.0).masse_volumique
+    assert points.puissance_hydraulique == pytest.approx(
+        masse_volumique * 9.81 * points.debit_m3h / 3600.0 * points.hauteur_manometrique / 1000.0)
+
+
+def test_point_de_fonctionnement_absent_si_la_pompe_ne_vainc_pas_la_hauteur_statique():
+    np = pytest.importorskip('numpy')
+    moteur = MoteurHydraulique()
+    installation = Installation()
+    installation.geometrie.hauteur_montee = 40.0
+
+    points = moteur.calculer_points_fonctionnement(installation, courbe_pompe(), (50, 30))
+
+    assert not points.trouve.any()
+    assert np.isnan(points.debit_m3h).all()
@@ -0,0 +1,74 @@
+"""Export Excel en flux : cellules numériques mises en forme, aucun fichier pour un export en échec"""
+
+import io
+from dataclasses import replace
+
+import pytest
+
+pytest.importorskip('openpyxl')
+
+from openpyxl import load_workbook
+
+from export_excel import FORMATS_RESULTATS, exporter_resultats, rapport_excel
+from moteur_hydraulique import Installation, MoteurHydraulique, PointSingulier
+
+
+def test_exporter_resultats_ecrit_des_nombres():
+    moteur = MoteurHydraulique()
+    installation = Installation()
+    resultats = [
+        moteur.calculer_pertes_totales(replace(installation, donnees_base=replace(installation.donnees_base,
+                                                                                  debit_m3h=debit)))
+        for debit in (10.0, 36.0, 80.0)
+    ]
+    flux = io.BytesIO()
+
+    assert exporter_resultats(resultats, flux) == 3
+
+    feuille = load_workbook(io.BytesIO(flux.getvalue()))['Résultats']
+    colonnes = [cellule.value for cellule in feuille[1]]
+    for resultat, ligne in zip(resultats, feuille.iter_rows(min_row=2)):
+        cellules = dict(zip(colonnes, ligne))
+        assert isinstance(cellules['vitesse'].value, float)
+        assert cellules['vitesse'].value == pytest.approx(resultat.vitesse)
+        assert cellules['vitesse'].number_format == FORMATS_RESULTATS['vitesse']
+        assert cellules['pertes_totales'].number_format == '0.000'
+        assert cellules['regime_ecoulement'].value == resultat.regime_ecoulement
+
+
+def test_valeurs_non_finies_laissees_vides():
+    flux = io.BytesIO()
+    exporter_resultats([{'vitesse': float('nan'), 'surpression_max': float('inf'), 'ligne': 1}], flux)
+
+    ligne = next(load_workbook(io.BytesIO(flux.getvalue()))['Résultats'].iter_rows(min_row=2, values_only=True))
+    assert ligne == (None, None, 1)
+
+
+def test_rapport_excel_numerique_avec_un_format_par_ligne():
+    moteur = MoteurHydraulique()
+    installation = Installation(points_singuliers=[PointSingulier('Clapet anti-retour', 1, 'refoulement')])
+    resultats = moteur.calculer_pertes_totales(installation).en_dict()
+    flux = io.BytesIO()
+
+    rapport_excel(installation, resultats, flux)
+
+    classeur = load_workbook(io.BytesIO(flux.getvalue()))
+    lignes = {parametre.value: valeur for parametre, valeur in classeur['Résultats Principaux'].iter_rows(min_row=2)}
+    assert lignes['Vitesse d\'écoulement (m/s)'].value == pytest.approx(resultats['vitesse'])
+    assert lignes['Vitesse d\'écoulement (m/s)'].number_format == '0.00'
+    assert lignes['Nombre de Reynolds'].number_format == '0'
+    assert lignes['Matériau'].value == 'Acier'
+    points = list(classeur['Points Singuliers'].iter_rows(min_row=2, values_only=True))
+    assert points[0][:2] == ('Clapet anti-retour (x1)', 'refoulement')
+    assert isinstance(points[0][3], float)
+
+
+def test_export_en_echec_n_ecrit_aucun_fichier(tmp_path):
+    def enregistrements():
+        yield {'ligne': 1}
+        raise RuntimeError("calcul interrompu")
+
+    chemin = tmp_path / 'resultats.xlsx'
+    with pytest.raises(RuntimeError):
+        exporter_resultats(enregistrements(), str(chemin))
+    assert not chemin.exists()
@@ -0,0 +1,32 @@
+"""Monte-Carlo : retour au calcul nominal sans dispersion, indépendance au nombre de processus"""
+
+import pytest
+
+from incertitudes import GRANDEURS, Incertitudes, Loi, analyser_incertitudes
+from moteur_hydraulique import Installation, MoteurHydraulique
+
+
+def test_dispersion_nulle_redonne_le_calcul_nominal():
+    pytest.importorskip('numpy')
+    incertitudes = Incertitudes(
+        rugosite=Loi('lognormale', 0.0), debit=Loi('normale', 0.0),
+        temperature=Loi('normale', 0.0, absolu=True), npsh_requis=Loi('normale', 0.0)
+    )
+    analyse = analyser_incertitudes(
+        MoteurHydraulique(), Installation(), incertitudes, nombre_echantillons=1000, taille_bloc=400
+    )
+
+    for grandeur in GRANDEURS:
+        assert analyse.distributions[grandeur].moyenne == pytest.approx(analyse.nominal[grandeur], rel=1e-6)
+    assert analyse.nombre_cavitation == (1000 if analyse.nominal['marge_npsh'] < 0 else 0)
+
+
+def test_resultats_independants_du_nombre_de_processus():
+    pytest.importorskip('numpy')
+    moteur = MoteurHydraulique()
+    sequentiel = analyser_incertitudes(moteur, Installation(), nombre_echantillons=3000, taille_bloc=1000)
+    parallele = analyser_incertitudes(moteur, Installation(), nombre_echantillons=3000, taille_bloc=1000, processus=2)
+
+    for grandeur in GRANDEURS:
+        assert parallele.distributions[grandeur].moyenne == pytest.approx(sequentiel.distributions[grandeur].moyenne)
+    assert parallele.nombre_cavitation == sequentiel.nombre_cavitation
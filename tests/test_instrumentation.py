@@ -0,0 +1,41 @@
+"""Journal des performances : lecture de la fin du fichier et rotation"""
+
+import json
+
+import instrumentation
+from instrumentation import Chronometre, _dernieres_lignes, statistiques_journal
+
+
+def journaliser(chemin, duree_ms):
+    chronometre = Chronometre()
+    chronometre.ajouter('calcul', duree_ms / 1000.0)
+    chronometre.terminer()
+    chronometre.duree_totale = duree_ms
+    chronometre.journaliser(str(chemin))
+
+
+def test_dernieres_lignes_lues_depuis_la_fin(tmp_path):
+    chemin = tmp_path / 'journal.jsonl'
+    chemin.write_text(''.join(f'{{"n": {i}}}\n' for i in range(1000)), encoding='utf-8')
+
+    for taille_bloc in (7, 64, 1 << 16):
+        lignes = _dernieres_lignes(str(chemin), 10, taille_bloc)
+        assert [json.loads(ligne)['n'] for ligne in lignes] == list(range(990, 1000))
+    assert len(_dernieres_lignes(str(chemin), 5000, 64)) == 1000
+
+
+def test_journal_borne_et_statistiques_sur_deux_generations(tmp_path, monkeypatch):
+    chemin = tmp_path / 'journal.jsonl'
+    monkeypatch.setattr(instrumentation, 'TAILLE_MAX_JOURNAL', 2000)
+
+    for duree in range(1, 101):
+        journaliser(chemin, float(duree))
+
+    assert chemin.stat().st_size <= 2000
+    assert (tmp_path / 'journal.jsonl.1').stat().st_size <= 2000 + 200
+    assert not (tmp_path / 'journal.jsonl.2').exists()
+
+    # Les 10 dernières exécutions, à cheval sur les deux fichiers si besoin
+    statistiques = statistiques_journal(str(chemin), dernieres=10)
+    assert statistiques['total']['executions'] == 10
+    assert statistiques['total']['p50'] == 95.5
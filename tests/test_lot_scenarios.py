@@ -0,0 +1,46 @@
+"""Calcul en lot : lecture des points singuliers et calcul d'un fichier de cas"""
+
+import csv
+import io
+
+import pytest
+
+from lot_scenarios import aplatir_resultats, executer, installation_depuis_ligne
+from moteur_hydraulique import MoteurHydraulique, PointSingulier, lire_points_singuliers
+
+
+def test_lire_points_singuliers():
+    assert lire_points_singuliers('Coude 90° standard:2.0:tronçon 2; Vanne:1') == [
+        PointSingulier(type='Coude 90° standard', quantite=2, emplacement=1),
+        PointSingulier(type='Vanne', quantite=1, emplacement='aspiration')
+    ]
+    for quantite in ('2.5', '-1', 'deux'):
+        with pytest.raises(ValueError, match="Quantité invalide"):
+            lire_points_singuliers(f'Coude 90° standard:{quantite}')
+
+
+def test_executer_calcule_chaque_ligne(tmp_path):
+    pytest.importorskip('pandas')
+    entree = tmp_path / 'cas.csv'
+    entree.write_text(
+        'debit_m3h,materiau,points_singuliers\n'
+        '40,,\n'
+        '60,PVC,Coude 90° standard:3:refoulement\n'
+        '50,,Coude 90° standard:2.5:refoulement\n',
+        encoding='utf-8'
+    )
+    sortie = tmp_path / 'resultats.csv'
+
+    assert executer(str(entree), str(sortie), processus=2, taille_lot=2, rapport=io.StringIO()) == 3
+
+    with open(sortie, encoding='utf-8', newline='') as fichier:
+        lignes = sorted(csv.DictReader(fichier), key=lambda ligne: int(ligne['ligne']))
+    moteur = MoteurHydraulique()
+    for ligne, cas in zip(lignes[:2], [
+        {'debit_m3h': 40.0},
+        {'debit_m3h': 60.0, 'materiau': 'PVC', 'points_singuliers': 'Coude 90° standard:3:refoulement'}
+    ]):
+        attendu = aplatir_resultats(moteur.calculer_pertes_totales(installation_depuis_ligne(cas)))
+        assert ligne['erreur'] == ''
+        assert float(ligne['pertes_totales']) == pytest.approx(attendu['pertes_totales'])
+    assert lignes[2]['erreur'].startswith('ValueError: Quantité invalide')
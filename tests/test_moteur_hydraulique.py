@@ -0,0 +1,225 @@
+"""Moteur hydraulique : tables de fluides, calcul en tableaux et points singuliers"""
+
+import json
+
+import pytest
+
+from moteur_hydraulique import (
+    MoteurHydraulique, Installation, Segment, PointSingulier, RegistreSinguliers, FLUIDES, COEFFICIENTS_SINGULIERS,
+    charger_fluides, charger_nomenclature, lire_nomenclature
+)
+
+
+def test_table_fluide_lignes_exactes_et_interpolation_logarithmique():
+    moteur = MoteurHydraulique()
+    table = FLUIDES['Eau']['table']
+
+    for temperature, pression_vapeur in zip(table['temperature'], table['pression_vapeur']):
+        assert moteur.calculer_proprietes_fluide('Eau', temperature).pression_vapeur == pytest.approx(pression_vapeur)
+    # Entre deux lignes, la pression de vapeur est interpolée en logarithme (moyenne géométrique au milieu)
+    milieu = moteur.calculer_proprietes_fluide('Eau', 95.0).pression_vapeur
+    assert milieu == pytest.approx((70140.0 * 101325.0) ** 0.5)
+
+
+def test_table_fluide_hors_plage_refusee():
+    moteur = MoteurHydraulique()
+
+    with pytest.raises(ValueError, match="hors de la table"):
+        moteur.calculer_proprietes_fluide('Eau', 200.0)
+    with pytest.raises(ValueError, match="hors de la table"):
+        moteur.calculer_proprietes_fluide('Ammoniac', -50.0)
+
+
+def test_table_fluide_en_tableau_identique_au_scalaire():
+    np = pytest.importorskip('numpy')
+    moteur = MoteurHydraulique()
+    temperatures = np.linspace(0.0, 150.0, 31)
+
+    lot = moteur.calculer_proprietes_fluide('Eau', temperatures)
+    for i, temperature in enumerate(temperatures):
+        scalaire = moteur.calculer_proprietes_fluide('Eau', float(temperature))
+        assert lot.masse_volumique[i] == pytest.approx(scalaire.masse_volumique)
+        assert lot.viscosite_cinematique[i] == pytest.approx(scalaire.viscosite_cinematique)
+        assert lot.pression_vapeur[i] == pytest.approx(scalaire.pression_vapeur)
+    with pytest.raises(ValueError, match="hors de la table"):
+        moteur.calculer_proprietes_fluide('Eau', np.array([20.0, 151.0]))
+
+
+def test_charger_fluides_json_et_csv(tmp_path):
+    pytest.importorskip('pandas')
+    table = {
+        'temperature': [0.0, 50.0],
+        'masse_volumique': [1000.0, 990.0],
+        'viscosite_cinematique': [2e-6, 1e-6],
+        'pression_vapeur': [1000.0, 4000.0],
+        'module_elasticite': [2e9, 2e9]
+    }
+    chemin_json = tmp_path / 'fluides.json'
+    chemin_json.write_text(json.dumps({'Saumure': table}), encoding='utf-8')
+    chemin_csv = tmp_path / 'fluides.csv'
+    chemin_csv.write_text(
+        'fluide,' + ','.join(table) + '\n'
+        + '\n'.join('Saumure,' + ','.join(str(table[colonne][i]) for colonne in table) for i in range(2)) + '\n',
+        encoding='utf-8'
+    )
+
+    for chemin in (chemin_json, chemin_csv):
+        fluides = charger_fluides(str(chemin))
+        moteur = MoteurHydraulique(fluides=fluides)
+        assert fluides['Saumure'].plage_temperatures == (0.0, 50.0)
+        assert fluides['Saumure'].masse_volumique_20c == pytest.approx(996.0)
+        assert moteur.calculer_proprietes_fluide('Saumure', 25.0).pression_vapeur == pytest.approx(2000.0)
+
+
+def test_friction_lot_identique_au_calcul_scalaire():
+    np = pytest.importorskip('numpy')
+    moteur = MoteurHydraulique()
+    Re = np.array([0.0, 500.0, 1999.0, 2000.0, 1e4, 1e5, 1e6, 1e7])
+    rugosites = np.array([0.0, 1e-5, 1e-4, 1e-3, 1e-2, 5e-2, 0.0, 1e-4])
+
+    lot = moteur.calculer_coefficient_friction_lot(Re, rugosites)
+    scalaire = [moteur.calculer_coefficient_friction(re, rugosite) for re, rugosite in zip(Re, rugosites)]
+    assert lot == pytest.approx(scalaire, rel=1e-7)
+
+    # En turbulent, le résultat vérifie l'équation de Colebrook-White
+    turbulent = Re > 4000
+    residu = 1 / np.sqrt(lot[turbulent]) + 2 * np.log10(
+        rugosites[turbulent] / 3.7 + 2.51 / (Re[turbulent] * np.sqrt(lot[turbulent])))
+    assert np.abs(residu).max() < 1e-6
+
+
+def test_registre_et_liste_donnent_les_memes_resultats():
+    moteur = MoteurHydraulique()
+    types = list(COEFFICIENTS_SINGULIERS)
+    points = [PointSingulier(types[i % len(types)], 1 + i % 3, ('aspiration', 'refoulement')[i % 2])
+              for i in range(40)]
+    registre = RegistreSinguliers(points)
+
+    par_liste = moteur.calculer_pertes_totales(Installation(points_singuliers=points))
+    par_registre = moteur.calculer_pertes_totales(Installation(points_singuliers=registre))
+
+    assert par_registre.pertes_singulieres == pytest.approx(par_liste.pertes_singulieres)
+    assert par_registre.pertes_aspiration == pytest.approx(par_liste.pertes_aspiration)
+    for emplacement, total in par_liste.totaux_singuliers.items():
+        assert par_registre.totaux_singuliers[emplacement] == pytest.approx(total)
+    assert len(par_registre.details_singuliers) == len(par_liste.details_singuliers) == 40
+    assert sum(detail.perte for detail in par_registre.details_singuliers) == pytest.approx(
+        par_liste.pertes_singulieres)
+
+    # Les résultats sont un instantané : le registre modifié ensuite ne les change pas
+    registre.ajouter(types[0], 5, 'refoulement')
+    assert len(par_registre.details_singuliers) == 40
+
+
+def test_quantite_non_entiere_refusee():
+    moteur = MoteurHydraulique()
+
+    with pytest.raises(ValueError, match="Quantité invalide"):
+        moteur.calculer_pertes_totales(Installation(points_singuliers=[PointSingulier('Coudes 45°', 2.5)]))
+
+
+def test_troncon_hors_installation_refuse_en_numerotation_utilisateur():
+    moteur = MoteurHydraulique()
+    registre = RegistreSinguliers()
+    registre.ajouter(next(iter(COEFFICIENTS_SINGULIERS)), 1, 3)
+    installation = Installation(points_singuliers=registre, segments=[Segment(50.0, 0.1, 'Acier', 'refoulement')])
+
+    with pytest.raises(ValueError, match="tronçon 4"):
+        moteur.calculer_pertes_totales(installation)
+
+
+def test_troncon_refuse_sans_troncons_explicites():
+    moteur = MoteurHydraulique()
+    registre = RegistreSinguliers()
+    registre.ajouter(next(iter(COEFFICIENTS_SINGULIERS)), 1, 1)
+
+    with pytest.raises(ValueError, match="pas décrite par tronçons"):
+        moteur.calculer_pertes_totales(Installation(points_singuliers=registre))
+
+
+@pytest.mark.parametrize('segments', [[], [
+    Segment(5.0, 0.15, 'Acier', 'aspiration'),
+    Segment(60.0, 0.1, 'PVC', 'refoulement'),
+    Segment(40.0, 0.08, 'PEHD', 'refoulement')
+]])
+def test_courbe_reseau_identique_au_calcul_point_par_point(segments):
+    np = pytest.importorskip('numpy')
+    moteur = MoteurHydraulique()
+    points = [PointSingulier('Coudes 45°', 3, 'refoulement'), PointSingulier('Coudes 45°', 2, 'aspiration')]
+    installation = Installation(points_singuliers=points, segments=segments)
+    debits = np.array([0.0, 5.0, 40.0, 80.0])
+
+    courbe = moteur.calculer_courbe_reseau(installation, debits)
+
+    geometrie = installation.geometrie
+    assert courbe.hauteur_manometrique[0] == pytest.approx(geometrie.hauteur_montee - geometrie.hauteur_descente)
+    for i, debit in enumerate(debits[1:], start=1):
+        installation.donnees_base.debit_m3h = float(debit)
+        resultats = moteur.calculer_pertes_totales(installation)
+        assert courbe.hauteur_manometrique[i] == pytest.approx(resultats.hauteur_manometrique)
+        assert courbe.pertes_aspiration[i] == pytest.approx(resultats.pertes_aspiration)
+        assert courbe.pertes_singulieres[i] == pytest.approx(resultats.pertes_singulieres)
+
+
+def test_pertes_aspiration_limitees_aux_troncons_et_points_d_aspiration():
+    moteur = MoteurHydraulique()
+    types = list(COEFFICIENTS_SINGULIERS)
+    aspiration = [PointSingulier(types[0], 2, 'aspiration')]
+    refoulement = [PointSingulier(types[1], 3, 'refoulement')]
+
+    seul = moteur.calculer_pertes_totales(Installation(points_singuliers=aspiration))
+    complet = moteur.calculer_pertes_totales(Installation(points_singuliers=aspiration + refoulement))
+
+    # Les points du refoulement augmentent la HMT, pas les pertes à l'aspiration
+    assert complet.pertes_totales > seul.pertes_totales
+    assert complet.pertes_aspiration == pytest.approx(seul.pertes_aspiration)
+    assert complet.npsh_disponible == pytest.approx(seul.npsh_disponible)
+
+    # Aspiration : 5 m des 100 m de conduite et ses seuls points singuliers
+    hauteur_cinetique = seul.vitesse**2 / (2 * 9.81)
+    attendu = (seul.pertes_lineaires * 5.0 / 100.0
+               + 2 * COEFFICIENTS_SINGULIERS[types[0]] * hauteur_cinetique)
+    assert seul.pertes_aspiration == pytest.approx(attendu)
+    proprietes = moteur.calculer_proprietes_fluide('Eau', 20.0)
+    assert complet.npsh_disponible == pytest.approx(
+        (101325.0 - proprietes.pression_vapeur) / (proprietes.masse_volumique * 9.81) + 2.0 - attendu)
+
+
+def test_charger_nomenclature_csv_et_excel(tmp_path):
+    pd = pytest.importorskip('pandas')
+    pytest.importorskip('openpyxl')
+    lignes = [
+        ('Coudes 90° standard', 4, 'refoulement'),
+        ('Clapet anti-retour', None, None),
+        (None, None, None),
+        ('Coudes 90° standard', 2, 'tronçon 2'),
+        ('Vanne pleine ouverture', 1, 'Aspiration')
+    ]
+    chemin_csv = tmp_path / 'nomenclature.csv'
+    chemin_csv.write_text(
+        'Désignation;Qté;Emplacement\n'
+        + ''.join(';'.join('' if valeur is None else str(valeur) for valeur in ligne) + '\n' for ligne in lignes),
+        encoding='utf-8'
+    )
+    chemin_excel = tmp_path / 'nomenclature.xlsx'
+    pd.DataFrame(lignes, columns=['Accessoire', 'Nombre', 'Position']).to_excel(chemin_excel, index=False)
+
+    for chemin in (chemin_csv, chemin_excel):
+        registre = charger_nomenclature(str(chemin), COEFFICIENTS_SINGULIERS)
+        assert len(registre) == 4
+        assert registre.totaux == {
+            'refoulement': {'Coudes 90° standard': 4},
+            'aspiration': {'Clapet anti-retour': 1, 'Vanne pleine ouverture': 1},
+            1: {'Coudes 90° standard': 2}
+        }
+
+
+def test_nomenclature_ligne_invalide_signalee():
+    pd = pytest.importorskip('pandas')
+
+    with pytest.raises(ValueError, match="Ligne 2 de la nomenclature : Type de point singulier inconnu"):
+        lire_nomenclature(pd.DataFrame({'type': ['Clapet anti-retour', 'Coude exotique']}), COEFFICIENTS_SINGULIERS)
+    with pytest.raises(ValueError, match="Ligne 1 de la nomenclature : Quantité invalide"):
+        lire_nomenclature(pd.DataFrame({'type': ['Clapet anti-retour'], 'quantite': [1.5]}))
+    with pytest.raises(ValueError, match="Ligne 1 de la nomenclature"):
+        lire_nomenclature(pd.DataFrame({'type': ['Clapet anti-retour'], 'emplacement': ['bâche']}))
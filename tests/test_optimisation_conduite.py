@@ -0,0 +1,58 @@
+"""Optimisation diamètre × matériau : cohérence avec le calcul détaillé, contraintes et paroi par matériau"""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from moteur_hydraulique import MoteurHydraulique, Installation, Segment
+from optimisation_conduite import optimiser_conduite, Contraintes
+
+
+def candidat(resultats, diametre, materiau):
+    return int(np.flatnonzero((resultats.materiau == materiau) & np.isclose(resultats.diametre, diametre))[0])
+
+
+def test_candidat_identique_au_calcul_detaille():
+    moteur = MoteurHydraulique()
+    installation = Installation()
+    donnees = installation.donnees_base
+
+    resultats = optimiser_conduite(moteur, installation, diametres=(donnees.diametre,))
+    detaille = moteur.calculer_pertes_totales(installation)
+
+    i = candidat(resultats, donnees.diametre, donnees.materiau)
+    assert resultats.hauteur_manometrique[i] == pytest.approx(detaille.hauteur_manometrique, rel=1e-6)
+    assert resultats.marge_npsh[i] == pytest.approx(detaille.marge_npsh, rel=1e-6)
+
+
+def test_classement_par_cout_global_et_contraintes():
+    contraintes = Contraintes(vitesse_min=0.8, vitesse_max=2.0, marge_npsh_min=1.0)
+
+    resultats = optimiser_conduite(MoteurHydraulique(), Installation(), contraintes=contraintes)
+
+    couts = resultats.cout_global[resultats.classement]
+    assert list(couts) == sorted(couts)
+    assert set(resultats.classement) == set(np.flatnonzero(resultats.admissible))
+    retenus = resultats.vitesse[resultats.classement]
+    assert retenus.min() >= 0.8 and retenus.max() <= 2.0
+
+
+def test_surpression_selon_la_paroi_du_materiau():
+    installation = Installation()
+
+    resultats = optimiser_conduite(MoteurHydraulique(), installation, diametres=(0.1023,))
+
+    acier, pvc, pehd = (candidat(resultats, 0.1023, materiau) for materiau in ('Acier', 'PVC', 'PEHD'))
+    # Même vitesse : la surpression suit la célérité, bien plus faible dans une paroi plastique
+    assert resultats.surpression[pehd] < resultats.surpression[pvc] < 0.5 * resultats.surpression[acier]
+    # Matériau sans paroi connue : module et épaisseur de l'installation
+    seul = optimiser_conduite(MoteurHydraulique(), installation, diametres=(0.1023,),
+                              materiaux={'Inox': 1.5e-5}, modules_young={}, rapports_epaisseur={})
+    assert seul.surpression[0] > resultats.surpression[pvc]
+
+
+def test_installation_par_troncons_refusee():
+    installation = Installation(segments=[Segment(100.0, 0.1, 'Acier', 'refoulement')])
+
+    with pytest.raises(ValueError, match="conduite simple"):
+        optimiser_conduite(MoteurHydraulique(), installation)
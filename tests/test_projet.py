@@ -0,0 +1,81 @@
+"""Fichier de projet : aller-retour sans perte, fichiers modifiés ou de version future refusés"""
+
+import io
+import json
+import zipfile
+from dataclasses import asdict
+
+import pytest
+
+from moteur_hydraulique import (
+    DonneesBase, Geometrie, RegistreSinguliers, MATERIAUX, FLUIDES, COEFFICIENTS_SINGULIERS
+)
+from projet import MANIFESTE, VERSION_PROJET, Projet, projet_en_octets, charger_projet
+
+
+def projet_exemple():
+    types = list(COEFFICIENTS_SINGULIERS)
+    registre = RegistreSinguliers()
+    registre.ajouter(types[0], 2, 'aspiration')
+    registre.ajouter(types[1], 1, 'refoulement')
+    registre.ajouter(types[2], 3, 1)
+    return Projet(
+        donnees_base=asdict(DonneesBase()),
+        geometrie=asdict(Geometrie()),
+        materiaux=MATERIAUX,
+        fluides=FLUIDES,
+        coefficients_singuliers=COEFFICIENTS_SINGULIERS,
+        points_singuliers=registre,
+        segments=[
+            {'longueur': 5.0, 'diametre': 0.1, 'materiau': 'Acier', 'emplacement': 'aspiration'},
+            {'longueur': 120.5, 'diametre': 0.1, 'materiau': 'PVC', 'emplacement': 'refoulement'}
+        ]
+    )
+
+
+def test_aller_retour_conserve_les_empreintes():
+    projet = projet_exemple()
+
+    relu = charger_projet(projet_en_octets(projet))
+
+    assert relu.empreinte_calcul() == projet.empreinte_calcul()
+    assert relu.points_singuliers.empreinte_contenu() == projet.points_singuliers.empreinte_contenu()
+    assert relu.segments == projet.segments
+
+
+def test_fichier_modifie_refuse():
+    octets = bytearray(projet_en_octets(projet_exemple()))
+    octets[len(octets) // 2] ^= 0xFF
+
+    with pytest.raises(ValueError):
+        charger_projet(bytes(octets))
+
+
+def test_courbe_de_pompe_relue_a_l_identique():
+    pd = pytest.importorskip('pandas')
+    projet = projet_exemple()
+    projet.donnees_pompe = pd.DataFrame({
+        'Débit (m³/h)': [0.0, 20.0, 40.0, 60.0],
+        'HMT (m)': [32.0, 30.0, 24.0, 14.0],
+        'Rendement (%)': [0.0, 58.0, 72.0, 57.0]
+    })
+
+    relu = charger_projet(projet_en_octets(projet))
+
+    pd.testing.assert_frame_equal(relu.donnees_pompe, projet.donnees_pompe)
+
+
+def test_version_future_refusee():
+    octets = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(projet_en_octets(projet_exemple()))) as source, \
+            zipfile.ZipFile(octets, 'w') as archive:
+        for nom in source.namelist():
+            contenu = source.read(nom)
+            if nom == MANIFESTE:
+                manifeste = json.loads(contenu)
+                manifeste['version'] = VERSION_PROJET + 1
+                contenu = json.dumps(manifeste).encode('utf-8')
+            archive.writestr(nom, contenu)
+
+    with pytest.raises(ValueError, match="non prise en charge"):
+        charger_projet(octets.getvalue())
@@ -0,0 +1,14 @@
+"""Rapports PDF en lot : noms de fichiers"""
+
+from rapport_pdf import nom_rapport
+
+
+def test_nom_rapport_reste_dans_le_repertoire_de_sortie():
+    assert nom_rapport(0, {'nom': 'Pompe P-1'}) == 'Pompe P-1.pdf'
+    assert nom_rapport(0, {'nom': '../x'}) == '_x.pdf'
+    assert nom_rapport(0, {'nom': '/etc/passwd'}) == '_etc_passwd.pdf'
+    assert nom_rapport(0, {'nom': 'a\\b:c?'}) == 'a_b_c_.pdf'
+    assert nom_rapport(0, {'nom': 'CON'}) == '_CON.pdf'
+    assert nom_rapport(4, {'nom': '..'}) == 'rapport_00005.pdf'
+    assert nom_rapport(4, {'nom': float('nan')}) == 'rapport_00005.pdf'
+    assert len(nom_rapport(0, {'nom': 'x' * 500})) == 154
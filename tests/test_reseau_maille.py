@@ -0,0 +1,22 @@
+"""Réseau maillé : résolution par l'algorithme du gradient (GGA)"""
+
+import pytest
+
+from moteur_hydraulique import MoteurHydraulique
+from reseau_maille import Conduite, Noeud, Reseau, resoudre_reseau
+
+
+def test_deux_reservoirs_en_serie():
+    pytest.importorskip('scipy')
+    reseau = Reseau(
+        [Noeud('A', charge_imposee=30.0), Noeud('M'), Noeud('B', charge_imposee=10.0)],
+        [Conduite('c1', 'A', 'M', 500.0, 0.2), Conduite('c2', 'M', 'B', 500.0, 0.2)]
+    )
+    resultat = resoudre_reseau(MoteurHydraulique(), reseau)
+
+    assert resultat.converge
+    # Deux conduites identiques : la charge intermédiaire est à mi-chemin
+    assert resultat.charges[1] == pytest.approx(20.0, abs=1e-4)
+    assert resultat.debits_m3h[0] == pytest.approx(resultat.debits_m3h[1])
+    assert resultat.debits_m3h[0] > 0
+    assert sum(resultat.pertes_charge) == pytest.approx(20.0, abs=1e-4)
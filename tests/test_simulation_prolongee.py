@@ -0,0 +1,64 @@
+"""Simulation sur une période prolongée : cohérence pas à pas avec le calcul détaillé, variateur et cumuls"""
+
+import pytest
+
+pytest.importorskip('numpy')
+
+import numpy as np
+
+from moteur_hydraulique import Installation, MoteurHydraulique
+from simulation_prolongee import simuler_periode
+
+
+def courbe_pompe():
+    from courbe_pompe import CourbePompe
+
+    return CourbePompe(
+        debits=[0, 10, 20, 30, 40, 50, 60],
+        hauteurs=[32, 31.5, 30, 27.5, 24, 19.5, 14],
+        rendements=[0, 0.38, 0.58, 0.69, 0.72, 0.68, 0.57]
+    )
+
+
+def test_pas_de_temps_identiques_au_calcul_detaille():
+    moteur = MoteurHydraulique()
+    installation = Installation()
+    demande = np.array([0.0, 12.0, 36.0, 50.0])
+    prix = np.array([0.1, 0.1, 0.2, 0.3])
+
+    periode = simuler_periode(moteur, installation, demande, prix_energie=prix, pas_temps_h=0.5)
+
+    assert periode.puissance_electrique[0] == 0.0
+    assert np.isnan(periode.npsh_disponible[0])
+    for i in range(1, demande.size):
+        installation.donnees_base.debit_m3h = float(demande[i])
+        resultats = moteur.calculer_pertes_totales(installation)
+        assert periode.hauteur_manometrique[i] == pytest.approx(resultats.hauteur_manometrique)
+        assert periode.puissance_electrique[i] == pytest.approx(resultats.puissances.puissance_electrique)
+        assert periode.npsh_disponible[i] == pytest.approx(resultats.npsh_disponible)
+    assert periode.energie_totale == pytest.approx(0.5 * periode.puissance_electrique.sum())
+    assert periode.cout_total == pytest.approx(0.5 * (periode.puissance_electrique * prix).sum())
+    assert periode.volume_pompe == pytest.approx(0.5 * demande.sum())
+    assert periode.heures_deficit == 0.0
+
+
+def test_frequence_du_variateur_bornee_et_pas_non_satisfaits():
+    moteur = MoteurHydraulique()
+    installation = Installation()
+    installation.geometrie.hauteur_montee = 20.0
+    pompe = courbe_pompe()
+    # Demande courante, demande hors d'atteinte à 50 Hz, faible HMT (aspiration haute) sous 25 Hz
+    demande = np.array([30.0, 60.0, 5.0])
+    niveau_aspiration = np.array([0.0, 0.0, 12.0])
+
+    periode = simuler_periode(moteur, installation, demande, pompe, niveau_aspiration=niveau_aspiration)
+
+    assert periode.satisfait.tolist() == [True, False, True]
+    assert 25.0 < periode.frequence[0] < 50.0
+    assert pompe.hauteur(30.0, periode.frequence[0]) == pytest.approx(periode.hauteur_manometrique[0])
+    assert np.isnan(periode.puissance_electrique[1])
+    assert periode.heures_deficit == 1.0
+    # Bridée à la fréquence minimale, la pompe fournit plus que la HMT requise
+    assert periode.frequence[2] == 25.0
+    assert periode.hauteur_pompe[2] > periode.hauteur_manometrique[2]
+    assert periode.energie_totale == pytest.approx(np.nansum(periode.puissance_electrique))
@@ -0,0 +1,78 @@
+"""Méthode des caractéristiques : fermeture instantanée comparée à Joukowsky, arrêt de pompe"""
+
+from math import pi
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from moteur_hydraulique import MoteurHydraulique, Installation
+from transitoire import simuler_fermeture_vanne, simuler_arret_pompe, LoiFermeture, ClapetAntiRetour
+
+
+def test_fermeture_instantanee_joukowsky():
+    moteur = MoteurHydraulique()
+    installation = Installation()
+    resultats = moteur.calculer_pertes_totales(installation)
+
+    transitoire = simuler_fermeture_vanne(moteur, installation, LoiFermeture(duree=0.0))
+
+    # ΔH = a·Δv/g ; le frottement (compactage de ligne) ajoute un peu à la surpression
+    joukowsky = resultats.coup_belier.celerite_onde * resultats.vitesse / 9.81
+    assert transitoire.surpression_max == pytest.approx(joukowsky, rel=0.02)
+
+
+def installation_refoulement():
+    installation = Installation()
+    installation.geometrie.hauteur_montee = 20.0
+    installation.geometrie.longueur_totale = 1000.0
+    return installation
+
+
+def courbe_pompe():
+    from courbe_pompe import CourbePompe
+
+    return CourbePompe(
+        debits=[0, 10, 20, 30, 40, 50, 60],
+        hauteurs=[32, 31.5, 30, 27.5, 24, 19.5, 14],
+        rendements=[0, 0.38, 0.58, 0.69, 0.72, 0.68, 0.57]
+    )
+
+
+def test_arret_pompe_balayage_d_inerties_identique_aux_calculs_separes():
+    np = pytest.importorskip('numpy')
+    moteur = MoteurHydraulique()
+    installation = installation_refoulement()
+    inerties = [0.05, 0.2, 0.5]
+
+    balayage = simuler_arret_pompe(moteur, installation, courbe_pompe(), inerties, nombre_troncons=20)
+
+    for i, inertie in enumerate(inerties):
+        seul = simuler_arret_pompe(moteur, installation, courbe_pompe(), inertie, nombre_troncons=20,
+                                   duree=balayage.temps[-1])
+        assert balayage.surpression_max[i] == pytest.approx(seul.surpression_max)
+        assert balayage.pression_minimale[i] == pytest.approx(seul.pression_minimale)
+        assert balayage.temps_fermeture_clapet[i] == pytest.approx(seul.temps_fermeture_clapet)
+    # Plus d'inertie : ralentissement plus lent, clapet fermé plus tard, surpression plus faible
+    assert np.all(np.diff(balayage.temps_fermeture_clapet) > 0)
+    assert np.all(np.diff(balayage.surpression_max) < 0)
+    # Clapet idéal : ni débit inverse ni rotation inverse, la pompe ne fait que ralentir
+    assert balayage.debit_pompe_m3h.min() >= 0.0
+    assert balayage.vitesse_rotation[:, 0] == pytest.approx(1450.0)
+    assert np.all(np.diff(balayage.vitesse_rotation, axis=-1) <= 0)
+
+
+def test_claquement_de_clapet_lent():
+    moteur = MoteurHydraulique()
+    installation = installation_refoulement()
+
+    ideal = simuler_arret_pompe(moteur, installation, courbe_pompe(), 0.5, nombre_troncons=20)
+    lent = simuler_arret_pompe(moteur, installation, courbe_pompe(), 0.5, clapet=ClapetAntiRetour(delai_fermeture=1.0),
+                                nombre_troncons=20)
+
+    # Le clapet lent arrête brutalement un débit inverse établi : surpression de Joukowsky sur ce débit
+    assert lent.debit_inversion_m3h > 10.0
+    vitesse_inverse = lent.debit_inversion_m3h / 3600.0 / (pi / 4.0 * 0.1**2)
+    celerite = moteur.calculer_pertes_totales(installation).coup_belier.celerite_onde
+    assert lent.surpression_max > 0.9 * celerite * vitesse_inverse / 9.81
+    assert lent.surpression_max > 5 * ideal.surpression_max
@@ -0,0 +1,492 @@
+"""Simulation des régimes transitoires (coup de bélier) par la méthode des caractéristiques.
+
+La conduite de refoulement est découpée en N tronçons de longueur Δx = L/N, parcourus
+par l'onde en un pas de temps Δt = Δx/a (a : célérité d'Allievi). À chaque pas, les
+invariants de Riemann issus des nœuds voisins donnent la charge et le débit de tous
+les nœuds intérieurs en quelques opérations NumPy sur des tableaux préalloués :
+
+    CP = H[i-1] + B·Q[i-1] - R·Q[i-1]·|Q[i-1]|     CM = H[i+1] - B·Q[i+1] + R·Q[i+1]·|Q[i+1]|
+    H[i] = (CP + CM) / 2                           Q[i] = (CP - CM) / (2B)
+
+avec B = a/(g·A) et R = f·Δx/(2g·D·A²). Les extrémités sont traitées par des conditions
+aux limites (réservoir, extrémité fermée, vanne suivant une loi de fermeture, pompe en
+ralentissement après disjonction avec son clapet) et les enveloppes de charge maximale
+et minimale sont relevées en chaque nœud. Plusieurs variantes (par exemple plusieurs
+inerties de groupe) peuvent être intégrées ensemble sur un axe supplémentaire.
+"""
+
+from dataclasses import dataclass
+from math import ceil, pi, sqrt
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+@dataclass
+class LoiFermeture:
+    """Ouverture relative τ(t) de la vanne : loi τ = (1 - t/durée)^exposant, ou tableau (temps, ouvertures)"""
+    duree: float = 5.0  # s
+    exposant: float = 1.0
+    temps: list = None
+    ouvertures: list = None
+
+    def ouverture(self, t):
+        """Ouverture relative (1 : ouverte, 0 : fermée) à l'instant t"""
+        if self.temps is not None:
+            import numpy as np
+            return float(np.interp(t, self.temps, self.ouvertures))
+        if t >= self.duree:
+            return 0.0
+        return (1.0 - t / self.duree) ** self.exposant
+
+    @property
+    def duree_fermeture(self):
+        return self.temps[-1] if self.temps is not None else self.duree
+
+
+class ConditionLimite:
+    """Condition aux limites d'une extrémité de la conduite
+
+    amont(t, CM, B) et aval(t, CP, B) retournent (charge, débit) au nœud d'extrémité à
+    partir de l'invariant de Riemann qui y arrive ; initialiser reçoit l'état permanent.
+    """
+
+    def initialiser(self, charge, debit):
+        pass
+
+    def amont(self, t, CM, B):
+        raise ValueError(f"{type(self).__name__} ne peut pas être placé à l'amont")
+
+    def aval(self, t, CP, B):
+        raise ValueError(f"{type(self).__name__} ne peut pas être placé à l'aval")
+
+
+class Reservoir(ConditionLimite):
+    """Réservoir à niveau constant (charge du régime permanent)"""
+
+    def initialiser(self, charge, debit):
+        self.charge = charge
+
+    def amont(self, t, CM, B):
+        return self.charge, (self.charge - CM) / B
+
+    def aval(self, t, CP, B):
+        return self.charge, (CP - self.charge) / B
+
+
+class ExtremiteFermee(ConditionLimite):
+    """Extrémité fermée (débit nul dès l'instant initial)"""
+
+    def amont(self, t, CM, B):
+        return CM, 0.0
+
+    def aval(self, t, CP, B):
+        return CP, 0.0
+
+
+class Vanne(ConditionLimite):
+    """Vanne aval débitant vers une charge constante, fermée suivant une loi de fermeture
+
+    Le débit suit Q·|Q| = Cv·τ(t)²·(H - charge_aval), Cv étant calé sur le régime permanent.
+    """
+
+    def __init__(self, loi_fermeture, charge_aval=0.0):
+        self.loi_fermeture = loi_fermeture
+        self.charge_aval = charge_aval
+
+    def initialiser(self, charge, debit):
+        perte = charge - self.charge_aval
+        if perte <= 0:
+            raise ValueError("La charge à la vanne doit dépasser la charge aval en régime permanent")
+        self.coefficient = debit * abs(debit) / perte
+
+    def aval(self, t, CP, B):
+        c = self.coefficient * self.loi_fermeture.ouverture(t) ** 2
+        ecart = CP - self.charge_aval
+        if ecart >= 0:
+            Q = 0.5 * (-c * B + sqrt((c * B) ** 2 + 4.0 * c * ecart))
+        else:
+            Q = 0.5 * (c * B - sqrt((c * B) ** 2 - 4.0 * c * ecart))
+        return CP - B * Q, Q
+
+
+def _par_variante(valeurs):
+    """Flottant pour une simulation unique, tableau (un élément par variante) sinon"""
+    return float(valeurs) if valeurs.ndim == 0 else valeurs
+
+
+@dataclass
+class ResultatsTransitoire:
+    """Enveloppes de charge le long de la conduite et historiques aux extrémités"""
+    positions: 'np.ndarray'  # m depuis l'amont
+    charge_initiale: 'np.ndarray'  # m
+    charge_max: 'np.ndarray'
+    charge_min: 'np.ndarray'
+    temps: 'np.ndarray'  # s
+    charge_amont: 'np.ndarray'
+    charge_aval: 'np.ndarray'
+    debit_amont: 'np.ndarray'  # m³/s
+    debit_aval: 'np.ndarray'
+    pas_temps: float
+    celerite: float
+
+    @property
+    def surpression_max(self):
+        """Plus forte élévation de charge (m) par rapport au régime permanent, par variante"""
+        return _par_variante((self.charge_max - self.charge_initiale).max(axis=-1))
+
+    @property
+    def depression_max(self):
+        """Plus forte baisse de charge (m) par rapport au régime permanent, par variante"""
+        return _par_variante((self.charge_initiale - self.charge_min).max(axis=-1))
+
+
+def simuler_caracteristiques(longueur, diametre, celerite, coefficient_friction, debit_initial, charge_amont,
+                             limite_amont, limite_aval, nombre_troncons=100, duree=None, g=9.81, nombre_lots=None):
+    """Intègre le régime transitoire d'une conduite par la méthode des caractéristiques
+
+    Avec nombre_lots, autant de variantes de la même conduite sont intégrées ensemble
+    (premier axe des tableaux) ; les conditions aux limites reçoivent alors des tableaux
+    d'un élément par variante et doivent être vectorisées (Reservoir, ExtremiteFermee,
+    PompeArret).
+    """
+    import numpy as np
+
+    if longueur <= 0 or diametre <= 0 or celerite <= 0:
+        raise ValueError("Longueur, diamètre et célérité doivent être strictement positifs")
+    N = int(nombre_troncons)
+    dx = longueur / N
+    dt = dx / celerite
+    section = pi * diametre**2 / 4.0
+    B = celerite / (g * section)
+    R = coefficient_friction * dx / (2.0 * g * diametre * section**2)
+    if duree is None:
+        duree = 10.0 * longueur / celerite
+    nombre_pas = max(int(ceil(duree / dt)), 1)
+    forme = (N + 1,) if nombre_lots is None else (int(nombre_lots), N + 1)
+
+    # Régime permanent : débit uniforme, charge décroissant linéairement par frottement
+    Q = np.full(forme, float(debit_initial))
+    H = np.broadcast_to(charge_amont - R * debit_initial * abs(debit_initial) * np.arange(N + 1), forme).copy()
+    charge_initiale = H.copy()
+    # Vues transposées : H_t[0] est la charge amont (scalaire, ou une par variante)
+    H_t, Q_t = H.T, Q.T
+    limite_amont.initialiser(H_t[0].copy(), Q_t[0].copy())
+    limite_aval.initialiser(H_t[-1].copy(), Q_t[-1].copy())
+
+    charge_max = H.copy()
+    charge_min = H.copy()
+    historique = np.empty((4,) + forme[:-1] + (nombre_pas + 1,))
+    historique_pas = np.moveaxis(historique, -1, 0)
+    historique_pas[0] = H_t[0], H_t[-1], Q_t[0], Q_t[-1]
+
+    # Tampons préalloués : W = Q·(B - R·|Q|), d'où CP = H + W et CM = H - W
+    W = np.empty(forme)
+    CP = np.empty(forme[:-1] + (N,))
+    CM = np.empty(forme[:-1] + (N,))
+    CP_t, CM_t = CP.T, CM.T
+    H_amont, H_aval, H_interieur = H[..., :-1], H[..., 1:], H[..., 1:-1]
+    W_amont, W_aval = W[..., :-1], W[..., 1:]
+    CP_interieur, CM_interieur = CP[..., :-1], CM[..., 1:]
+    Q_interieur = Q[..., 1:-1]
+    inverse_2B = 0.5 / B
+
+    for n in range(1, nombre_pas + 1):
+        t = n * dt
+        np.abs(Q, out=W)
+        W *= -R
+        W += B
+        W *= Q
+        np.add(H_amont, W_amont, out=CP)
+        np.subtract(H_aval, W_aval, out=CM)
+
+        # Nœuds intérieurs
+        np.add(CP_interieur, CM_interieur, out=H_interieur)
+        H_interieur *= 0.5
+        np.subtract(CP_interieur, CM_interieur, out=Q_interieur)
+        Q_interieur *= inverse_2B
+
+        # Extrémités
+        H_t[0], Q_t[0] = limite_amont.amont(t, CM_t[0], B)
+        H_t[-1], Q_t[-1] = limite_aval.aval(t, CP_t[-1], B)
+
+        np.maximum(charge_max, H, out=charge_max)
+        np.minimum(charge_min, H, out=charge_min)
+        historique_pas[n] = H_t[0], H_t[-1], Q_t[0], Q_t[-1]
+
+    return ResultatsTransitoire(
+        positions=np.linspace(0.0, longueur, N + 1),
+        charge_initiale=charge_initiale,
+        charge_max=charge_max,
+        charge_min=charge_min,
+        temps=np.arange(nombre_pas + 1) * dt,
+        charge_amont=historique[0],
+        charge_aval=historique[1],
+        debit_amont=historique[2],
+        debit_aval=historique[3],
+        pas_temps=dt,
+        celerite=celerite
+    )
+
+
+def simuler_fermeture_vanne(moteur, installation, loi_fermeture, nombre_troncons=100, duree=None,
+                            extremite_aval='vanne', g=9.81):
+    """Simule la fermeture d'une vanne en bout de refoulement, la pompe étant assimilée à une charge constante"""
+    resultats = moteur.calculer_pertes_totales(installation)
+    geometrie = installation.geometrie
+    coup_belier = resultats.coup_belier
+    longueur = moteur.longueur_refoulement(installation)
+    diametre = resultats.diametre
+    f = resultats.coefficient_friction
+    debit = resultats.debit_m3s
+
+    # Charge à la vanne : niveau aval plus la perte du régime permanent de la vanne ouverte
+    charge_sortie = geometrie.hauteur_montee - geometrie.hauteur_descente
+    perte_vanne = moteur.coefficients_singuliers.get('Vanne pleine ouverture', 0.2) * resultats.vitesse**2 / (2.0 * g)
+    pertes_frottement = f * longueur / diametre * resultats.vitesse**2 / (2.0 * g)
+    charge_amont = charge_sortie + perte_vanne + pertes_frottement
+
+    limites_aval = {
+        'vanne': lambda: Vanne(loi_fermeture, charge_sortie),
+        'reservoir': Reservoir,
+        'fermee': ExtremiteFermee
+    }
+    if extremite_aval not in limites_aval:
+        raise ValueError(f"Extrémité aval inconnue : {extremite_aval}")
+    if duree is None:
+        duree = loi_fermeture.duree_fermeture + 5.0 * coup_belier.temps_parcours
+
+    return simuler_caracteristiques(
+        longueur, diametre, coup_belier.celerite_onde, f, debit, charge_amont,
+        Reservoir(), limites_aval[extremite_aval](), nombre_troncons, duree, g
+    )
+
+
+# Rendement en dessous duquel un point de la courbe n'est pas retenu pour le couple
+# (P = ρ·g·Q·H/η est indéterminé près du débit nul)
+RENDEMENT_MINIMAL_COUPLE = 0.1
+
+
+@dataclass
+class ClapetAntiRetour:
+    """Clapet de refoulement : se ferme delai_fermeture secondes après l'inversion du débit
+
+    Un délai nul représente un clapet idéal (aucun débit inverse) ; un délai positif laisse
+    s'établir un débit inverse dont l'arrêt brutal à la fermeture provoque le claquement.
+    """
+    delai_fermeture: float = 0.0  # s
+
+
+class PompeArret(ConditionLimite):
+    """Pompe en tête de refoulement après disjonction du moteur, avec clapet anti-retour
+
+    La hauteur et le couple suivent la forme homologue de degré 2, H = a·r² + b·r·Q + c·Q²
+    et C = α·r² + β·r·Q + γ·Q² avec r = ω/ω50, ajustée sur la courbe à 50 Hz et calée sur
+    le point de fonctionnement ; le débit à la pompe est alors la racine d'un trinôme à
+    chaque pas. Le couple est tiré de la courbe de puissance, à défaut du rendement (points
+    de rendement supérieur à RENDEMENT_MINIMAL_COUPLE), à défaut de rendement_defaut. Le
+    ralentissement I·dω/dt = -C est intégré par la méthode des trapèzes ; la pompe ne
+    tourne pas en sens inverse. inertie peut être un tableau (une variante par valeur).
+    """
+
+    def __init__(self, courbe_pompe, inertie, charge_aspiration, masse_volumique, debit_initial,
+                 vitesse_nominale=1450.0, frequence=50.0, clapet=None, rendement_defaut=0.75, points=64, g=9.81):
+        import numpy as np
+
+        self.inertie = np.asarray(inertie, dtype=float)
+        if np.any(self.inertie <= 0):
+            raise ValueError("L'inertie du groupe doit être strictement positive")
+        self.charge_aspiration = charge_aspiration
+        self.vitesse_initiale = frequence / 50.0
+        self.omega_nominale = 2.0 * pi * vitesse_nominale / 60.0
+        self.clapet = ClapetAntiRetour() if clapet is None else clapet
+
+        # Caractéristiques à 50 Hz échantillonnées (débits en m³/s, couple en N·m)
+        debits_m3h = np.linspace(courbe_pompe.debits[0], courbe_pompe.debits[-1], points)
+        debits = debits_m3h / 3600.0
+        hauteurs = courbe_pompe.hauteur(debits_m3h)
+        puissance_hydraulique = masse_volumique * g * debits * hauteurs
+        if courbe_pompe.a_puissance:
+            couples = courbe_pompe.puissance(debits_m3h) * 1000.0 / self.omega_nominale
+            debits_couple = debits
+        elif courbe_pompe.a_rendement:
+            rendement = courbe_pompe.rendement(debits_m3h)
+            valides = rendement >= RENDEMENT_MINIMAL_COUPLE
+            if valides.sum() < 3:
+                raise ValueError("Rendement de la courbe de pompe insuffisant pour en déduire le couple")
+            couples = puissance_hydraulique[valides] / rendement[valides] / self.omega_nominale
+            debits_couple = debits[valides]
+        else:
+            couples = puissance_hydraulique / rendement_defaut / self.omega_nominale
+            debits_couple = debits
+
+        self.a, self.b, self.c = np.polynomial.polynomial.polyfit(debits, hauteurs, 2)
+        self.alpha, self.beta, self.gamma = np.polynomial.polynomial.polyfit(debits_couple, couples, 2)
+
+        # Calage de la hauteur à vanne fermée sur le point de fonctionnement de la courbe
+        r = self.vitesse_initiale
+        hauteur_initiale = float(courbe_pompe.hauteur(debit_initial * 3600.0, frequence))
+        self.a += (hauteur_initiale - self.hauteur(debit_initial, r)) / r**2
+
+    def hauteur(self, debit, vitesse):
+        """Hauteur (m) de la pompe au débit (m³/s) et à la vitesse relative donnés"""
+        return (self.a * vitesse + self.b * debit) * vitesse + self.c * debit**2
+
+    def couple(self, debit, vitesse):
+        """Couple résistant (N·m) de la pompe au débit (m³/s) et à la vitesse relative donnés"""
+        return (self.alpha * vitesse + self.beta * debit) * vitesse + self.gamma * debit**2
+
+    def _resoudre(self, CM, B, vitesse):
+        """Débit au refoulement : charge aspiration + H(Q, r) = CM + B·Q, racine proche de la solution linéaire"""
+        import numpy as np
+        lineaire = self.b * vitesse - B
+        constante = self.charge_aspiration + self.a * vitesse**2 - CM
+        discriminant = np.maximum(lineaire**2 - 4.0 * self.c * constante, 0.0)
+        return -2.0 * constante / (lineaire - np.sqrt(discriminant))
+
+    def initialiser(self, charge, debit):
+        import numpy as np
+
+        forme = np.broadcast_shapes(self.inertie.shape, np.shape(debit))
+        self.t = 0.0
+        self.Q = np.broadcast_to(debit, forme).astype(float)
+        self.vitesse = np.full(forme, self.vitesse_initiale)
+        self.ouvert = np.ones(forme, dtype=bool)
+        self.temps_inversion = np.full(forme, np.nan)
+        self.temps_fermeture = np.full(forme, np.nan)
+        self.debit_inversion = np.zeros(forme)
+        self.couple_precedent = self.couple(self.Q, self.vitesse)
+        self.historique_vitesse = [self.vitesse.copy()]
+        self.historique_debit = [self.Q.copy()]
+
+    def amont(self, t, CM, B):
+        import numpy as np
+
+        dt = t - self.t
+        self.t = t
+        inertie_omega = self.inertie * self.omega_nominale
+
+        # Prédicteur (couple du pas précédent) puis correcteur (trapèzes)
+        vitesse = np.maximum(self.vitesse - dt * self.couple_precedent / inertie_omega, 0.0)
+        Q = np.where(self.ouvert, self._resoudre(CM, B, vitesse), 0.0)
+        couple = self.couple(Q, vitesse)
+        vitesse = np.maximum(self.vitesse - 0.5 * dt * (self.couple_precedent + couple) / inertie_omega, 0.0)
+        Q = self._resoudre(CM, B, vitesse)
+
+        # Clapet : fermeture delai_fermeture après l'inversion du débit, définitive
+        inversion = self.ouvert & (Q < 0) & np.isnan(self.temps_inversion)
+        self.temps_inversion = np.where(inversion, t, self.temps_inversion)
+        fermeture = self.ouvert & (t - self.temps_inversion >= self.clapet.delai_fermeture)
+        self.temps_fermeture = np.where(fermeture, t, self.temps_fermeture)
+        self.debit_inversion = np.where(fermeture, np.maximum(-Q, 0.0), self.debit_inversion)
+        self.ouvert = self.ouvert & ~fermeture
+        Q = np.where(self.ouvert, Q, 0.0)
+
+        self.Q = Q
+        self.vitesse = vitesse
+        self.couple_precedent = self.couple(Q, vitesse)
+        self.historique_vitesse.append(vitesse)
+        self.historique_debit.append(Q)
+        return CM + B * Q, Q
+
+
+@dataclass
+class ResultatsArretPompe:
+    """Ralentissement de la pompe, enveloppes de charge et risque de cavitation après disjonction
+
+    Les tableaux ont un premier axe par valeur d'inertie lorsque plusieurs inerties sont
+    simulées ensemble. Les charges et pressions sont relatives à l'axe de la pompe (m).
+    """
+    ligne: ResultatsTransitoire
+    inertie: 'np.ndarray'  # kg·m²
+    temps: 'np.ndarray'  # s
+    vitesse_rotation: 'np.ndarray'  # tr/min
+    debit_pompe_m3h: 'np.ndarray'
+    altitudes: 'np.ndarray'  # m, profil de la conduite
+    pression_min: 'np.ndarray'  # m de colonne relative, enveloppe le long de la conduite
+    pression_vaporisation: float  # m de colonne relative
+    temps_fermeture_clapet: 'np.ndarray'  # s (NaN si le clapet ne se ferme pas)
+    debit_inversion_m3h: 'np.ndarray'  # débit inverse arrêté par le clapet
+
+    @property
+    def surpression_max(self):
+        """Plus forte élévation de charge (m) par rapport au régime permanent"""
+        return self.ligne.surpression_max
+
+    @property
+    def pression_minimale(self):
+        """Plus faible pression relative (m) le long de la conduite"""
+        return _par_variante(self.pression_min.min(axis=-1))
+
+    @property
+    def separation_colonne(self):
+        """Vrai si la pression atteint la tension de vapeur (rupture de la veine liquide)"""
+        import numpy as np
+        valeurs = self.pression_min.min(axis=-1) <= self.pression_vaporisation
+        return bool(valeurs) if np.ndim(valeurs) == 0 else valeurs
+
+
+def simuler_arret_pompe(moteur, installation, courbe_pompe, inertie, vitesse_nominale=1450.0, clapet=None,
+                        frequence=50.0, nombre_troncons=100, duree=None, profil=None, g=9.81):
+    """Simule la disjonction de la pompe (CourbePompe) au point de fonctionnement de la fréquence donnée
+
+    Le refoulement débite dans un réservoir aval à niveau constant et l'aspiration est à
+    charge constante. inertie (kg·m², moteur et roue) peut être un tableau pour balayer
+    plusieurs valeurs en une seule intégration. profil = (positions, altitudes) décrit la
+    conduite ; à défaut, elle monte linéairement de l'axe de la pompe jusqu'à la sortie.
+    """
+    import numpy as np
+    from dataclasses import replace
+
+    points = moteur.calculer_points_fonctionnement(installation, courbe_pompe, [frequence])
+    if not points.trouve[0]:
+        raise ValueError(f"Aucun point de fonctionnement de la pompe à {frequence:g} Hz")
+    debit_m3h = float(points.debit_m3h[0])
+    hauteur_pompe = float(points.hauteur_manometrique[0])
+
+    installation = replace(installation, donnees_base=replace(installation.donnees_base, debit_m3h=debit_m3h))
+    resultats = moteur.calculer_pertes_totales(installation)
+    donnees = installation.donnees_base
+    geometrie = installation.geometrie
+    proprietes = resultats.proprietes_fluide
+    longueur = moteur.longueur_refoulement(installation)
+    celerite = resultats.coup_belier.celerite_onde
+
+    inertie = np.asarray(inertie, dtype=float)
+    charge_aspiration = donnees.hauteur_geodesique_aspiration - resultats.pertes_aspiration
+    pompe = PompeArret(courbe_pompe, inertie, charge_aspiration, proprietes.masse_volumique, resultats.debit_m3s,
+                       vitesse_nominale, frequence, clapet, donnees.rendement_mecanique, g=g)
+
+    if duree is None:
+        # 20 allers-retours de l'onde, ou trois fois le temps de ralentissement du groupe (I·ω²/P)
+        # et de la veine liquide (L·V/(g·HMT)) si plus long
+        vitesse_initiale = frequence / 50.0
+        omega = pompe.omega_nominale * vitesse_initiale
+        puissance = float(pompe.couple(resultats.debit_m3s, vitesse_initiale)) * omega
+        ralentissement = (float(inertie.max()) * omega**2 / puissance
+                          + longueur * resultats.vitesse / (g * hauteur_pompe))
+        duree = max(40.0 * longueur / celerite, 3.0 * ralentissement)
+
+    ligne = simuler_caracteristiques(
+        longueur, resultats.diametre, celerite, resultats.coefficient_friction, resultats.debit_m3s,
+        charge_aspiration + hauteur_pompe, pompe, Reservoir(), nombre_troncons, duree, g,
+        nombre_lots=None if inertie.ndim == 0 else inertie.size
+    )
+
+    if profil is None:
+        profil = ((0.0, longueur), (0.0, geometrie.hauteur_montee - geometrie.hauteur_descente))
+    altitudes = np.interp(ligne.positions, profil[0], profil[1])
+
+    return ResultatsArretPompe(
+        ligne=ligne,
+        inertie=inertie,
+        temps=ligne.temps,
+        vitesse_rotation=np.moveaxis(np.array(pompe.historique_vitesse), 0, -1) * vitesse_nominale,
+        debit_pompe_m3h=np.moveaxis(np.array(pompe.historique_debit), 0, -1) * 3600.0,
+        altitudes=altitudes,
+        pression_min=ligne.charge_min - altitudes,
+        pression_vaporisation=(proprietes.pression_vapeur - donnees.pression_amont) / (proprietes.masse_volumique * g),
+        temps_fermeture_clapet=_par_variante(pompe.temps_fermeture),
+        debit_inversion_m3h=_par_variante(pompe.debit_inversion * 3600.0)
+    )
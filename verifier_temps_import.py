@@ -0,0 +1,133 @@
+"""Contrôle du budget de temps d'import au démarrage.
+
+Chaque module surveillé est importé dans un processus neuf avec ``-X importtime`` ;
+le contrôle échoue (code de sortie 1) si le temps d'import cumulé dépasse le budget
+ou si un module volumineux dont l'import doit rester différé (reportlab, matplotlib...)
+est chargé dès le démarrage.
+
+Exemple :
+    python verifier_temps_import.py
+    python verifier_temps_import.py --module moteur_hydraulique --budget-ms 50
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+
+# Budget (ms) et modules dont l'import doit rester différé, par module surveillé
+BUDGETS = {
+    'calcul_pertes_charges2': {
+        'budget_ms': 1500.0,
+        'differes': ('reportlab', 'matplotlib')
+    },
+    'moteur_hydraulique': {
+        'budget_ms': 100.0,
+        'differes': ('numpy', 'pandas', 'streamlit')
+    },
+    'lot_scenarios': {
+        'budget_ms': 150.0,
+        'differes': ('numpy', 'pandas', 'pyarrow', 'streamlit')
+    },
+    'reseau_maille': {
+        'budget_ms': 100.0,
+        'differes': ('numpy', 'scipy', 'pandas')
+    },
+    'transitoire': {
+        'budget_ms': 100.0,
+        'differes': ('numpy',)
+    },
+    'simulation_prolongee': {
+        'budget_ms': 100.0,
+        'differes': ('numpy', 'pandas')
+    },
+    'rapport_pdf': {
+        'budget_ms': 100.0,
+        'differes': ('numpy', 'pandas', 'matplotlib', 'reportlab')
+    },
+    'export_excel': {
+        'budget_ms': 50.0,
+        'differes': ('openpyxl', 'numpy', 'pandas')
+    },
+    'instrumentation': {
+        'budget_ms': 50.0,
+        'differes': ('numpy', 'pandas', 'streamlit')
+    },
+    'incertitudes': {
+        'budget_ms': 100.0,
+        'differes': ('numpy', 'pandas')
+    },
+    'projet': {
+        'budget_ms': 100.0,
+        'differes': ('numpy', 'pandas', 'streamlit')
+    }
+}
+
+
+def mesurer_import(module):
+    """Importe le module dans un processus neuf ; retourne (temps cumulé en ms, modules importés)"""
+    repertoire = os.path.dirname(os.path.abspath(__file__))
+    processus = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=repertoire, capture_output=True, text=True
+    )
+    if processus.returncode != 0:
+        raise RuntimeError(f"Échec de l'import de {module} :\n{processus.stderr}")
+
+    temps_ms = None
+    modules = set()
+    for ligne in processus.stderr.splitlines():
+        if not ligne.startswith('import time:') or '|' not in ligne:
+            continue
+        _, cumul, nom = ligne[len('import time:'):].split('|')
+        if not cumul.strip().isdigit():
+            continue  # Ligne d'en-tête
+        nom = nom.strip()
+        modules.add(nom)
+        if nom == module:
+            temps_ms = int(cumul) / 1000.0
+    return temps_ms, modules
+
+
+def verifier(module, budget_ms, differes=(), repetitions=3):
+    """Vérifie un module ; retourne la liste des dépassements constatés"""
+    # Le minimum de plusieurs mesures écarte le bruit (cache disque, charge machine)
+    mesures = [mesurer_import(module) for i in range(repetitions)]
+    temps_ms = min(temps for temps, _ in mesures)
+    modules = mesures[0][1]
+
+    problemes = []
+    if temps_ms > budget_ms:
+        problemes.append(f"{module} : {temps_ms:.0f} ms > budget {budget_ms:.0f} ms")
+    for nom in differes:
+        if nom in modules:
+            problemes.append(f"{module} : '{nom}' est importé au démarrage")
+
+    print(f"{module} : {temps_ms:.0f} ms (budget {budget_ms:.0f} ms)")
+    return problemes
+
+
+def main(arguments=None):
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Contrôle du temps d'import au démarrage")
+    parser.add_argument('--module', action='append',
+                        help="Module à contrôler (par défaut : tous les modules de BUDGETS)")
+    parser.add_argument('--budget-ms', type=float, default=None,
+                        help="Budget en ms, remplace celui de BUDGETS")
+    parser.add_argument('--repetitions', type=int, default=3)
+    args = parser.parse_args(arguments)
+
+    problemes = []
+    for module in args.module or list(BUDGETS):
+        parametres = BUDGETS.get(module, {'budget_ms': 1000.0, 'differes': ()})
+        budget_ms = args.budget_ms if args.budget_ms is not None else parametres['budget_ms']
+        problemes += verifier(module, budget_ms, parametres['differes'], args.repetitions)
+
+    for probleme in problemes:
+        print(f"ÉCHEC - {probleme}", file=sys.stderr)
+    return 1 if problemes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())